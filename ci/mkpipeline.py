@@ -21,23 +21,27 @@ pipeline.template.yml and the docstring on `trim_tests_pipeline` below.
 
 import argparse
 import copy
+import fnmatch
 import hashlib
+import json
 import os
-import subprocess
+import re
 import sys
 import threading
 import traceback
 from collections import OrderedDict
 from collections.abc import Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
+from functools import cache
 from pathlib import Path
 from typing import Any
 
 import requests
 import yaml
 
-from materialize import mzbuild, spawn, ui
+from materialize import MZ_ROOT, mzbuild, spawn, ui
 from materialize.buildkite_insights.buildkite_api import generic_api
 from materialize.mz_version import MzVersion
 from materialize.mzcompose.composition import Composition
@@ -61,6 +65,10 @@ CI_GLUE_GLOBS = ["bin", "ci", "misc/python/materialize/cli/ci_annotate_errors.py
 
 DEFAULT_AGENT = "hetzner-aarch64-4cpu-8gb"
 
+# Imported files and images of the compositions, which are expensive to
+# determine because the mzcompose.py files have to be loaded.
+COMPOSITION_CACHE_PATH = MZ_ROOT / "target" / "mkpipeline" / "compositions.json"
+
 
 def steps(pipeline: Any) -> Iterator[dict[str, Any]]:
     for step in pipeline["steps"]:
@@ -235,13 +243,6 @@ class PipelineStep:
         self.image_dependencies: set[mzbuild.ResolvedImage] = set()
         self.step_dependencies: set[str] = set()
 
-    def inputs(self) -> set[str]:
-        inputs = set()
-        inputs.update(self.extra_inputs)
-        for image in self.image_dependencies:
-            inputs.update(image.inputs(transitive=True))
-        return inputs
-
 
 def prioritize_pipeline(pipeline: Any, priority: int) -> None:
     """Prioritize builds against main or release branches"""
@@ -745,7 +746,7 @@ def trim_tests_pipeline(
 
     steps = OrderedDict()
 
-    composition_paths: set[str] = set()
+    composition_names: set[str] = set()
 
     for config in pipeline["steps"]:
         if "plugins" in config:
@@ -753,8 +754,7 @@ def trim_tests_pipeline(
                 for plugin_name, plugin_config in plugin.items():
                     if plugin_name != "./ci/plugins/mzcompose":
                         continue
-                    name = plugin_config["composition"]
-                    composition_paths.add(str(repo.compositions[name]))
+                    composition_names.add(plugin_config["composition"])
         if "group" in config:
             for inner_config in config.get("steps", []):
                 if not "plugins" in inner_config:
@@ -763,22 +763,9 @@ def trim_tests_pipeline(
                     for plugin_name, plugin_config in plugin.items():
                         if plugin_name != "./ci/plugins/mzcompose":
                             continue
-                        name = plugin_config["composition"]
-                        composition_paths.add(str(repo.compositions[name]))
+                        composition_names.add(plugin_config["composition"])
 
-    imported_files: dict[str, list[str]] = {}
-
-    with ThreadPoolExecutor(max_workers=len(composition_paths)) as executor:
-        futures = {
-            executor.submit(get_imported_files, path): path
-            for path in composition_paths
-        }
-        for future in futures:
-            path = futures[future]
-            files = future.result()
-            imported_files[path] = files
-
-    compositions: dict[str, Composition] = {}
+    composition_infos = get_composition_infos(repo, composition_names)
 
     def to_step(config: dict[str, Any]) -> PipelineStep | None:
         if "wait" in config or "group" in config:
@@ -800,14 +787,14 @@ def trim_tests_pipeline(
                 for plugin_name, plugin_config in plugin.items():
                     if plugin_name == "./ci/plugins/mzcompose":
                         name = plugin_config["composition"]
-                        if name not in compositions:
-                            compositions[name] = Composition(repo, name)
-                        for dep in compositions[name].dependencies:
-                            step.image_dependencies.add(dep)
-                        composition_path = str(repo.compositions[name])
-                        step.extra_inputs.add(composition_path)
+                        composition_info = composition_infos[name]
+                        for image_name in composition_info.images:
+                            step.image_dependencies.add(deps[image_name])
+                        step.extra_inputs.add(
+                            str(repo.compositions[name].relative_to(MZ_ROOT))
+                        )
                         # All (transitively) imported python modules are also implicitly dependencies
-                        for file in imported_files[composition_path]:
+                        for file in composition_info.imported_files:
                             step.extra_inputs.add(file)
                     elif plugin_name == "./ci/plugins/cloudtest":
                         step.image_dependencies.add(deps["environmentd"])
@@ -823,17 +810,24 @@ def trim_tests_pipeline(
                 if inner_step := to_step(inner_config):
                     steps[inner_step.id] = inner_step
 
-    # Find all the steps whose inputs have changed with respect to main.
-    # We delegate this hard work to Git.
+    # Find all the steps whose inputs have changed with respect to main. The
+    # changed files are determined once, and the inputs of each image are only
+    # matched against them once, even if many steps depend on the image.
+    changed_files = get_changed_files()
+    changed_images: dict[str, bool] = {}
+
+    def has_image_changed(image: mzbuild.ResolvedImage) -> bool:
+        if image.name not in changed_images:
+            changed_images[image.name] = changed_files.match(
+                image.inputs(transitive=True)
+            )
+        return changed_images[image.name]
+
     changed = set()
     for step in steps.values():
-        inputs = step.inputs()
-        if not inputs:
-            # No inputs means there is no way this step can be considered
-            # changed, but `git diff` with no pathspecs means "diff everything",
-            # not "diff nothing", so explicitly skip.
-            continue
-        if have_paths_changed(inputs):
+        if changed_files.match(step.extra_inputs) or any(
+            has_image_changed(image) for image in step.image_dependencies
+        ):
             changed.add(step.id)
 
     # Then collect all changed steps, and all the steps that those changed steps
@@ -991,32 +985,66 @@ def trim_builds(
                 step["skip"] = True
 
 
-_github_changed_files: set[str] | None = None
+class ChangedFiles:
+    """The files that have diverged from origin/main.
 
+    Globs are matched in memory, with the semantics of git pathspecs: a glob
+    without wildcards matches a file or a directory containing files, a
+    wildcard also matches slashes. Absolute globs within the repository are
+    matched relative to its root, like git does.
 
-def have_paths_changed(globs: Iterable[str]) -> bool:
-    """Reports whether the specified globs have diverged from origin/main."""
-    global _github_changed_files
-    try:
-        if not _github_changed_files:
-            head = spawn.capture(["git", "rev-parse", "HEAD"]).strip()
-            headers = {"Accept": "application/vnd.github+json"}
-            if token := os.getenv("GITHUB_TOKEN"):
-                headers["Authorization"] = f"Bearer {token}"
-
-            resp = requests.get(
-                f"https://api.github.com/repos/materializeinc/materialize/compare/main...{head}",
-                headers=headers,
-            )
-            resp.raise_for_status()
-            _github_changed_files = {
-                f["filename"] for f in resp.json().get("files", [])
-            }
+    >>> changed_files = ChangedFiles(["test/kafka/mzcompose.py"])
+    >>> changed_files.match(["test/kafka"])
+    True
+    >>> changed_files.match([str(MZ_ROOT / "test" / "kafka")])
+    True
+    >>> changed_files.match(["test/*.py"])
+    True
+    >>> changed_files.match(["test/kafka-auth", "src/**/*.rs"])
+    False
+    """
 
-        for file in spawn.capture(["git", "ls-files", *globs]).splitlines():
-            if file in _github_changed_files:
+    def __init__(self, files: Iterable[str]):
+        self.files = set(files)
+        # The changed files and all their parent directories, so that a glob
+        # without wildcards is matched with a single lookup.
+        self.paths: set[str] = set()
+        for file in self.files:
+            parts = file.split("/")
+            for i in range(1, len(parts) + 1):
+                self.paths.add("/".join(parts[:i]))
+
+    def match(self, globs: Iterable[str]) -> bool:
+        patterns = []
+        for glob in globs:
+            glob = glob.removeprefix(f"{MZ_ROOT}/")
+            if any(char in glob for char in "*?["):
+                patterns.append(_compile_glob(glob))
+            elif glob.rstrip("/") in self.paths:
                 return True
-        return False
+
+        return any(pattern.match(file) for pattern in patterns for file in self.files)
+
+
+@cache
+def _compile_glob(glob: str) -> re.Pattern[str]:
+    return re.compile(fnmatch.translate(glob))
+
+
+@cache
+def get_changed_files() -> ChangedFiles:
+    try:
+        head = spawn.capture(["git", "rev-parse", "HEAD"]).strip()
+        headers = {"Accept": "application/vnd.github+json"}
+        if token := os.getenv("GITHUB_TOKEN"):
+            headers["Authorization"] = f"Bearer {token}"
+
+        resp = requests.get(
+            f"https://api.github.com/repos/materializeinc/materialize/compare/main...{head}",
+            headers=headers,
+        )
+        resp.raise_for_status()
+        return ChangedFiles(f["filename"] for f in resp.json().get("files", []))
     except Exception as e:
         # Try locally if Github is down or the change has not been pushed yet when running locally
         print(f"Failed to get changed files from Github, running locally: {e}")
@@ -1027,16 +1055,91 @@ def have_paths_changed(globs: Iterable[str]) -> bool:
             command.append("--unshallow")
         spawn.runv(command + ["origin", "main"])
 
-        diff = subprocess.run(
-            ["git", "diff", "--no-patch", "--quiet", "origin/main...", "--", *globs]
+        return ChangedFiles(
+            spawn.capture(
+                ["git", "diff", "--name-only", "--no-renames", "origin/main..."]
+            ).splitlines()
         )
-        if diff.returncode == 0:
-            return False
-        elif diff.returncode == 1:
-            return True
-        else:
-            diff.check_returncode()
-            raise RuntimeError("unreachable")
+
+
+def have_paths_changed(globs: Iterable[str]) -> bool:
+    """Reports whether the specified globs have diverged from origin/main."""
+    return get_changed_files().match(globs)
+
+
+@dataclass
+class CompositionInfo:
+    imported_files: list[str]
+    images: list[str]
+    # Hashes of the mzcompose.py file and the imported files, which determine
+    # whether the cached info is still valid
+    file_hashes: dict[str, str]
+
+
+@cache
+def _hash_file(path: str) -> str | None:
+    try:
+        with open(MZ_ROOT / path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _hash_files(paths: Iterable[str]) -> dict[str, str]:
+    return {path: _hash_file(path) or "" for path in paths}
+
+
+def get_composition_infos(
+    repo: mzbuild.Repository, names: set[str]
+) -> dict[str, CompositionInfo]:
+    """Determine the imported files and the mzbuild images of the compositions.
+
+    Loading a composition is expensive, so the results are cached on disk and
+    reused as long as the composition's mzcompose.py and the files it imports
+    are unchanged.
+    """
+    try:
+        with open(COMPOSITION_CACHE_PATH) as f:
+            cached = {
+                name: CompositionInfo(**info) for name, info in json.load(f).items()
+            }
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        cached = {}
+
+    infos: dict[str, CompositionInfo] = {}
+    for name in names:
+        info = cached.get(name)
+        if (
+            info is not None
+            and _hash_files(info.file_hashes) == info.file_hashes
+            and all(image in repo.images for image in info.images)
+        ):
+            infos[name] = info
+
+    missing = sorted(names - infos.keys())
+    if missing:
+        print(f"Loading compositions: {' '.join(missing)}")
+        paths = {name: str(repo.compositions[name]) for name in missing}
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            imported_files = dict(
+                zip(missing, executor.map(get_imported_files, paths.values()))
+            )
+        for name in missing:
+            composition = Composition(repo, name)
+            infos[name] = CompositionInfo(
+                imported_files=imported_files[name],
+                images=sorted(image.name for image in composition.dependencies),
+                file_hashes=_hash_files(
+                    [f"{paths[name]}/mzcompose.py", *imported_files[name]]
+                ),
+            )
+
+        cached.update(infos)
+        COMPOSITION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(COMPOSITION_CACHE_PATH, "w") as f:
+            json.dump({name: asdict(info) for name, info in cached.items()}, f)
+
+    return infos
 
 
 def remove_mz_specific_keys(pipeline: Any) -> None:
@@ -0,0 +1,78 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Fingerprint every mzbuild image in the repository, and report how long it
+takes with a cold and a warm file digest cache.
+
+Run with `bin/pyactivate -m materialize.benches.mzbuild_fingerprint`."""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from materialize import MZ_ROOT, git, mzbuild
+
+
+def fingerprint_all(cache_path: Path) -> tuple[float, mzbuild.FileDigestCache]:
+    # Start from a clean slate, as if this were a fresh process.
+    git.expand_globs.cache_clear()
+    git.clean_blob_ids.cache_clear()
+    git._sorted_worktree_files.cache_clear()
+
+    start_time = time.monotonic()
+    repo = mzbuild.Repository(MZ_ROOT)
+    repo.rd.file_digests = mzbuild.FileDigestCache(MZ_ROOT, cache_path)
+    resolved: dict[str, mzbuild.ResolvedImage] = {}
+    for image in repo:
+        _resolve(repo, image, resolved)
+    for image in resolved.values():
+        image.fingerprint()
+    repo.rd.file_digests.save()
+    return time.monotonic() - start_time, repo.rd.file_digests
+
+
+def _resolve(
+    repo: mzbuild.Repository,
+    image: mzbuild.Image,
+    resolved: dict[str, mzbuild.ResolvedImage],
+) -> mzbuild.ResolvedImage:
+    # Resolve images by hand, as `DependencySet` also queries the local
+    # Docker daemon, which is not what we want to measure.
+    if image.name not in resolved:
+        resolved[image.name] = mzbuild.ResolvedImage(
+            image,
+            (_resolve(repo, repo.images[d], resolved) for d in image.depends_on),
+        )
+    return resolved[image.name]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="mzbuild_fingerprint",
+        description="Benchmark fingerprinting of all mzbuild images.",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="number of warm runs to measure"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = Path(tmp_dir) / "file-digests.json"
+        duration, cache = fingerprint_all(cache_path)
+        print(f"cold: {duration:.3f}s ({cache.hits} hits, {cache.misses} misses)")
+        for i in range(args.runs):
+            duration, cache = fingerprint_all(cache_path)
+            print(
+                f"warm #{i + 1}: {duration:.3f}s ({cache.hits} hits, {cache.misses} misses)"
+            )
+
+
+if __name__ == "__main__":
+    main()
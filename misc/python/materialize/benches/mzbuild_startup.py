@@ -0,0 +1,74 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Discover the mzbuild images and compositions of the repository, as every
+`bin/mzcompose` invocation does on startup, and report how long it takes by
+walking the filesystem and with a cold and a warm repository manifest.
+
+Run with `bin/pyactivate -m materialize.benches.mzbuild_startup`."""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from materialize import MZ_ROOT, mzbuild
+
+
+def discover(
+    repo: mzbuild.Repository, manifest_path: Path | None
+) -> tuple[float, mzbuild.RepositoryManifest | None]:
+    repo.images = {}
+    repo.compositions = {}
+
+    start_time = time.monotonic()
+    if manifest_path is None:
+        repo._walk()
+        manifest = None
+    else:
+        manifest = repo.rd.manifest = mzbuild.RepositoryManifest(MZ_ROOT, manifest_path)
+        repo._discover()
+    return time.monotonic() - start_time, manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="mzbuild_startup",
+        description="Benchmark the discovery of mzbuild images and compositions.",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="number of warm runs to measure"
+    )
+    args = parser.parse_args()
+
+    start_time = time.monotonic()
+    repo = mzbuild.Repository(MZ_ROOT)
+    print(f"repository: {time.monotonic() - start_time:.3f}s")
+
+    duration, _ = discover(repo, None)
+    print(
+        f"walk: {duration:.3f}s ({len(repo.images)} images,"
+        f" {len(repo.compositions)} compositions)"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest_path = Path(tmp_dir) / "manifest.json"
+        duration, manifest = discover(repo, manifest_path)
+        assert manifest is not None
+        print(f"cold: {duration:.3f}s ({manifest.hits} hits, {manifest.misses} misses)")
+        for i in range(args.runs):
+            duration, manifest = discover(repo, manifest_path)
+            assert manifest is not None
+            print(
+                f"warm #{i + 1}: {duration:.3f}s ({manifest.hits} hits, {manifest.misses} misses)"
+            )
+
+
+if __name__ == "__main__":
+    main()
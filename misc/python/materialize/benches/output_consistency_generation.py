@@ -0,0 +1,108 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Generate, filter and render output consistency queries in dry-run mode,
+and report how many expressions per second are processed.
+
+Run with `bin/pyactivate -m materialize.benches.output_consistency_generation`."""
+
+import argparse
+import contextlib
+import io
+import time
+
+from psycopg import Connection
+
+from materialize.output_consistency.common.configuration import (
+    ConsistencyTestConfiguration,
+)
+from materialize.output_consistency.execution.query_output_mode import QueryOutputMode
+from materialize.output_consistency.execution.sql_executors import SqlExecutors
+from materialize.output_consistency.output.output_printer import OutputPrinter
+from materialize.output_consistency.output_consistency_test import (
+    OutputConsistencyTest,
+)
+from materialize.postgres_consistency.execution.pg_sql_executors import (
+    PgSqlExecutors,
+)
+from materialize.postgres_consistency.postgres_consistency_test import (
+    PostgresConsistencyTest,
+)
+
+
+class DryRunPostgresConsistencyTest(PostgresConsistencyTest):
+    """Uses the Postgres ignore filter, which is more expensive to evaluate,
+    without requiring a Postgres connection."""
+
+    def create_sql_executors(
+        self,
+        config: ConsistencyTestConfiguration,
+        default_connection: Connection,
+        mz_system_connection: Connection,
+        output_printer: OutputPrinter,
+    ) -> SqlExecutors:
+        return PgSqlExecutors(
+            self.create_sql_executor(
+                config, default_connection, mz_system_connection, output_printer, "mz"
+            ),
+            self.create_sql_executor(
+                config, default_connection, None, output_printer, "pg", is_mz=False
+            ),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="output_consistency_generation",
+        description="Benchmark the generation of output consistency queries.",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=30000, help="number of expressions"
+    )
+    parser.add_argument("--seed", type=str, default="0")
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="use the ignore filter of the postgres consistency test",
+    )
+    args = parser.parse_args()
+
+    test = DryRunPostgresConsistencyTest() if args.postgres else OutputConsistencyTest()
+
+    output = io.StringIO()
+    start_time = time.monotonic()
+    with contextlib.redirect_stdout(output):
+        summary = test._run_output_consistency_tests_internal(
+            default_connection=None,  # type: ignore
+            mz_system_connection=None,  # type: ignore
+            random_seed=args.seed,
+            dry_run=True,
+            fail_fast=False,
+            verbose_output=False,
+            max_cols_per_query=20,
+            max_runtime_in_sec=0,
+            max_iterations=args.iterations,
+            max_failures_until_abort=15,
+            avoid_expressions_expecting_db_error=False,
+            disable_predefined_queries=True,
+            parallel_strategy_execution=False,
+            query_output_mode=QueryOutputMode.SELECT,
+        )
+    duration = time.monotonic() - start_time
+
+    print(
+        f"{summary.count_generated_select_expressions} expressions in {duration:.3f}s"
+        f" ({summary.count_generated_select_expressions / duration:.0f}/s),"
+        f" {summary.count_executed_query_templates} queries"
+        f" ({summary.count_executed_query_templates / duration:.0f}/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,10 +19,12 @@ from materialize.buildkite_insights.annotation_search.buildkite_search_source im
 from materialize.buildkite_insights.buildkite_api.buildkite_config import (
     MZ_PIPELINES_WITH_WILDCARD,
 )
+from materialize.buildkite_insights.cache.build_store import BuildStore
 from materialize.buildkite_insights.cache.cache_constants import (
     FETCH_MODE_CHOICES,
     FetchMode,
 )
+from materialize.buildkite_insights.cache.search_index import SearchIndex
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -93,11 +95,23 @@ if __name__ == "__main__":
         "--use-regex",
         action="store_true",
     )
+    parser.add_argument(
+        "--use-store",
+        action="store_true",
+        help="Sync the builds incrementally into a local SQLite store and query them from there.",
+    )
+    parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Index the annotations of new builds in the local SQLite store and only search builds with possible matches. Implies --use-store.",
+    )
     args = parser.parse_args()
 
     if args.short and args.oneline:
         print("Note: --oneline will be ignored if --short is set")
 
+    build_store = BuildStore() if args.use_store or args.use_index else None
+
     source = BuildkiteDataSource(
         fetch_builds_mode=args.fetch_builds,
         fetch_annotations_mode=args.fetch_annotations,
@@ -105,6 +119,12 @@ if __name__ == "__main__":
         first_build_page_to_fetch=args.first_build_page_to_fetch,
         only_failed_builds=args.only_failed_builds,
         only_failed_build_step_keys=args.only_failed_build_step_key,
+        build_store=build_store,
+        search_index=(
+            SearchIndex(build_store)
+            if args.use_index and build_store is not None
+            else None
+        ),
     )
 
     annotation_search_logic.start_search(
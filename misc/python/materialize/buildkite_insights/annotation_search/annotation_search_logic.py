@@ -102,11 +102,19 @@ def start_search(
 
     builds = search_source.fetch_builds(pipeline=pipeline_slug, branch=branch)
 
+    try:
+        builds_to_search = search_source.filter_builds_with_possible_matches(
+            builds, pattern, use_regex
+        )
+    except RateLimitExceeded:
+        print("Aborting due to exceeded rate limit!")
+        return
+
     print_before_search_results()
 
     count_matches = 0
 
-    for build in builds:
+    for build in builds_to_search:
         max_entries_to_print = max(0, max_results - count_matches)
         if max_entries_to_print == 0:
             break
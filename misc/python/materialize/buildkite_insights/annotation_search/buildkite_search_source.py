@@ -17,13 +17,16 @@ from materialize.buildkite_insights.buildkite_api.buildkite_constants import (
     BUILDKITE_RELEVANT_FAILED_BUILD_STEP_STATES,
 )
 from materialize.buildkite_insights.cache import annotations_cache, builds_cache
+from materialize.buildkite_insights.cache.build_store import ITEMS_PER_PAGE, BuildStore
 from materialize.buildkite_insights.cache.cache_constants import FetchMode
+from materialize.buildkite_insights.cache.search_index import SearchIndex
 from materialize.buildkite_insights.data.build_annotation import BuildAnnotation
 from materialize.buildkite_insights.data.build_info import Build
 from materialize.buildkite_insights.data.build_step import BuildStepMatcher
 from materialize.buildkite_insights.util.build_step_utils import (
     extract_build_step_outcomes,
 )
+from materialize.buildkite_insights.util.search_utility import strip_html_tags
 
 ANY_PIPELINE_VALUE = "*"
 ANY_BRANCH_VALUE = "*"
@@ -39,6 +42,8 @@ class BuildkiteDataSource:
         first_build_page_to_fetch: int,
         only_failed_builds: bool,
         only_failed_build_step_keys: list[str],
+        build_store: BuildStore | None = None,
+        search_index: SearchIndex | None = None,
     ):
         self.fetch_builds_mode = fetch_builds_mode
         self.fetch_annotations_mode = fetch_annotations_mode
@@ -46,6 +51,8 @@ class BuildkiteDataSource:
         self.first_build_page_to_fetch = first_build_page_to_fetch
         self.only_failed_builds = only_failed_builds
         self.only_failed_build_step_keys = only_failed_build_step_keys
+        self.build_store = build_store
+        self.search_index = search_index
 
     def fetch_builds(self, pipeline: str, branch: str | None) -> list[Build]:
         if self.only_failed_builds:
@@ -55,7 +62,9 @@ class BuildkiteDataSource:
 
         # do not try to continue with incomplete data in case of an exceeded rate limit because fetching the annotations
         # will anyway most likely fail
-        if pipeline == ANY_PIPELINE_VALUE:
+        if self.build_store is not None:
+            raw_builds = self._fetch_builds_from_store(pipeline, branch, build_states)
+        elif pipeline == ANY_PIPELINE_VALUE:
             raw_builds = builds_cache.get_or_query_builds_for_all_pipelines(
                 self.fetch_builds_mode,
                 self.max_build_fetches,
@@ -92,6 +101,32 @@ class BuildkiteDataSource:
 
         return builds
 
+    def _fetch_builds_from_store(
+        self, pipeline: str, branch: str | None, build_states: list[str]
+    ) -> list[Any]:
+        assert self.build_store is not None
+        pipeline_slug = None if pipeline == ANY_PIPELINE_VALUE else pipeline
+
+        self.build_store.sync_builds(
+            pipeline_slug,
+            self.fetch_builds_mode,
+            max_initial_fetches=self.first_build_page_to_fetch
+            + self.max_build_fetches
+            - 1,
+        )
+
+        # only the jobs of the failed build steps are needed for filtering
+        return list(
+            self.build_store.iterate_builds(
+                pipeline_slug,
+                branch=branch,
+                build_states=build_states,
+                step_keys=self.only_failed_build_step_keys,
+                limit=self.max_build_fetches * ITEMS_PER_PAGE,
+                offset=(self.first_build_page_to_fetch - 1) * ITEMS_PER_PAGE,
+            )
+        )
+
     def filter_builds(
         self,
         builds_data: list[Any],
@@ -122,18 +157,37 @@ class BuildkiteDataSource:
         ]
         return filtered_builds
 
+    def filter_builds_with_possible_matches(
+        self, builds: list[Build], search_value: str, use_regex: bool
+    ) -> list[Build]:
+        if self.search_index is None:
+            return builds
+
+        self.search_index.index_annotations(builds)
+        return self.search_index.filter_builds_with_possible_annotation_matches(
+            builds, search_value, use_regex
+        )
+
     def fetch_annotations(
         self, build: Build, verbose: bool = False
     ) -> list[BuildAnnotation]:
         is_completed_build_state = build.state in BUILDKITE_COMPLETED_BUILD_STATES
 
-        raw_annotations = annotations_cache.get_or_query_annotations(
-            fetch_mode=self.fetch_annotations_mode,
-            pipeline_slug=build.pipeline,
-            build_number=build.number,
-            add_to_cache_if_not_present=is_completed_build_state,
-            quiet_mode=not verbose,
-        )
+        if self.build_store is not None:
+            raw_annotations = self.build_store.get_or_query_annotations(
+                fetch_mode=self.fetch_annotations_mode,
+                pipeline_slug=build.pipeline,
+                build_number=int(build.number),
+                add_to_store_if_not_present=is_completed_build_state,
+            )
+        else:
+            raw_annotations = annotations_cache.get_or_query_annotations(
+                fetch_mode=self.fetch_annotations_mode,
+                pipeline_slug=build.pipeline,
+                build_number=build.number,
+                add_to_cache_if_not_present=is_completed_build_state,
+                quiet_mode=not verbose,
+            )
 
         result = []
         for raw_annotation in raw_annotations:
@@ -150,7 +204,7 @@ class BuildkiteDataSource:
         return result
 
     def clean_annotation_text(self, annotation_html: str) -> str:
-        return re.sub(r"<[^>]+>", "", annotation_html)
+        return strip_html_tags(annotation_html)
 
     def try_extracting_title_from_annotation_html(
         self, annotation_html: str
@@ -19,16 +19,25 @@ from materialize.buildkite_insights.artifact_search.artifact_search_presentation
     print_summary,
 )
 from materialize.buildkite_insights.buildkite_api.buildkite_config import MZ_PIPELINES
+from materialize.buildkite_insights.buildkite_api.buildkite_constants import (
+    BUILDKITE_COMPLETED_BUILD_STATES,
+)
 from materialize.buildkite_insights.buildkite_api.generic_api import RateLimitExceeded
 from materialize.buildkite_insights.cache import (
     artifacts_cache,
     builds_cache,
     logs_cache,
 )
+from materialize.buildkite_insights.cache.build_store import BuildStore
 from materialize.buildkite_insights.cache.cache_constants import (
     FETCH_MODE_CHOICES,
     FetchMode,
 )
+from materialize.buildkite_insights.cache.search_index import (
+    JOB_LOG_FILE_NAME,
+    IndexableFile,
+    SearchIndex,
+)
 from materialize.buildkite_insights.util.build_step_utils import (
     extract_build_step_names_by_job_id,
 )
@@ -52,6 +61,8 @@ def main(
     file_name_regex: str | None,
     include_zst_files: bool,
     search_logs_instead_of_artifacts: bool,
+    build_store: BuildStore | None = None,
+    search_index: SearchIndex | None = None,
 ) -> None:
     assert len(pattern) > 0, "pattern must not be empty"
 
@@ -64,6 +75,13 @@ def main(
         )
         build_step_name_by_job_id = extract_build_step_names_by_job_id(build)
 
+        if (
+            search_index is not None
+            and build["state"] not in BUILDKITE_COMPLETED_BUILD_STATES
+        ):
+            print("Not using the index because the build is not completed.")
+            search_index = None
+
     try:
         (
             count_matches,
@@ -79,6 +97,7 @@ def main(
                 max_results=max_results,
                 use_regex=use_regex,
                 build_step_name_by_job_id=build_step_name_by_job_id,
+                search_index=search_index,
             )
             if search_logs_instead_of_artifacts
             else _search_artifacts(
@@ -91,6 +110,8 @@ def main(
                 file_name_regex=file_name_regex,
                 include_zst_files=include_zst_files,
                 build_step_name_by_job_id=build_step_name_by_job_id,
+                build_store=build_store,
+                search_index=search_index,
             )
         )
 
@@ -119,15 +140,40 @@ def _search_artifacts(
     file_name_regex: str | None,
     include_zst_files: bool,
     build_step_name_by_job_id: dict[str, str],
+    build_store: BuildStore | None = None,
+    search_index: SearchIndex | None = None,
 ) -> tuple[int, int, set[str], bool]:
     """
     :return: count_matches, count_all_artifacts, ignored_file_names, max_search_results_hit
     """
     artifact_list_by_job_id: dict[str, list[Any]] = dict()
     for job_id in build_step_name_by_job_id.keys():
-        artifact_list_by_job_id[job_id] = (
-            artifacts_cache.get_or_query_job_artifact_list(
-                pipeline_slug, fetch, build_number=build_number, job_id=job_id
+        if build_store is not None:
+            artifact_list_by_job_id[job_id] = (
+                build_store.get_or_query_job_artifact_list(
+                    pipeline_slug, fetch, build_number=build_number, job_id=job_id
+                )
+            )
+        else:
+            artifact_list_by_job_id[job_id] = (
+                artifacts_cache.get_or_query_job_artifact_list(
+                    pipeline_slug, fetch, build_number=build_number, job_id=job_id
+                )
+            )
+
+    if search_index is not None:
+        files = [
+            IndexableFile(
+                job_id=job_id, file_id=artifact["id"], file_name=artifact["filename"]
+            )
+            for job_id, artifact_list in artifact_list_by_job_id.items()
+            for artifact in _filter_artifact_list(artifact_list, file_name_regex)
+            if _can_search_artifact(artifact["filename"], include_zst_files)
+        ]
+        search_index.index_files(pipeline_slug, build_number, files)
+        file_ids_with_possible_matches = (
+            search_index.filter_files_with_possible_matches(
+                [file.file_id for file in files], pattern, use_regex
             )
         )
 
@@ -166,14 +212,21 @@ def _search_artifacts(
                 ignored_file_names.add(artifact_file_name)
                 continue
 
-            artifact_content = artifacts_cache.get_or_download_artifact(
-                pipeline_slug,
-                fetch,
-                build_number=build_number,
-                job_id=job_id,
-                artifact_id=artifact_id,
-                is_zst_compressed=is_zst_file(artifact_file_name),
-            )
+            if search_index is not None:
+                if artifact_id not in file_ids_with_possible_matches:
+                    continue
+
+                artifact_content = search_index.get_file_content(artifact_id)
+                assert artifact_content is not None
+            else:
+                artifact_content = artifacts_cache.get_or_download_artifact(
+                    pipeline_slug,
+                    fetch,
+                    build_number=build_number,
+                    job_id=job_id,
+                    artifact_id=artifact_id,
+                    is_zst_compressed=is_zst_file(artifact_file_name),
+                )
 
             matches_in_artifact, max_search_results_hit = _search_artifact_content(
                 artifact_file_name=artifact_file_name,
@@ -217,11 +270,27 @@ def _search_logs(
     max_results: int,
     use_regex: bool,
     build_step_name_by_job_id: dict[str, str],
+    search_index: SearchIndex | None = None,
 ) -> tuple[int, int, set[str], bool]:
     """
     :return: count_matches, count_all_artifacts, ignored_file_names, max_search_results_hit
     """
 
+    if search_index is not None:
+        search_index.index_files(
+            pipeline_slug,
+            build_number,
+            [
+                IndexableFile(
+                    job_id=job_id, file_id=job_id, file_name=JOB_LOG_FILE_NAME
+                )
+                for job_id in build_step_name_by_job_id.keys()
+            ],
+        )
+        job_ids_with_possible_matches = search_index.filter_files_with_possible_matches(
+            list(build_step_name_by_job_id.keys()), pattern, use_regex
+        )
+
     print_before_search_results()
 
     count_matches = 0
@@ -238,12 +307,19 @@ def _search_logs(
             max_search_results_hit = True
             break
 
-        log_content = logs_cache.get_or_download_log(
-            pipeline_slug,
-            fetch,
-            build_number=build_number,
-            job_id=job_id,
-        )
+        if search_index is not None:
+            if job_id not in job_ids_with_possible_matches:
+                continue
+
+            log_content = search_index.get_file_content(job_id)
+            assert log_content is not None
+        else:
+            log_content = logs_cache.get_or_download_log(
+                pipeline_slug,
+                fetch,
+                build_number=build_number,
+                job_id=job_id,
+            )
 
         matches_in_log, max_search_results_hit = _search_artifact_content(
             artifact_file_name="log",
@@ -367,9 +443,21 @@ if __name__ == "__main__":
         default=FetchMode.AUTO,
         help="Whether to fetch fresh builds from Buildkite.",
     )
+    parser.add_argument(
+        "--use-store",
+        action="store_true",
+        help="Keep the artifact lists in the local SQLite store.",
+    )
+    parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Index the logs or artifacts in the local SQLite store and only search those with possible matches. Implies --use-store.",
+    )
 
     args = parser.parse_args()
 
+    build_store = BuildStore() if args.use_store or args.use_index else None
+
     main(
         args.pipeline,
         args.buildnumber,
@@ -381,4 +469,10 @@ if __name__ == "__main__":
         args.file_name_regex,
         args.include_zst_files,
         args.search_logs_instead_of_artifacts,
+        build_store,
+        (
+            SearchIndex(build_store)
+            if args.use_index and build_store is not None
+            else None
+        ),
     )
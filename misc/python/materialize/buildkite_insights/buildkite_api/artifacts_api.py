@@ -26,6 +26,13 @@ def download_artifact(
     return generic_api.get(request_path, {}, as_json=False)
 
 
+def download_artifact_content(
+    pipeline_slug: str, build_number: int, job_id: str, artifact_id: str
+) -> bytes:
+    request_path = f"organizations/materialize/pipelines/{pipeline_slug}/builds/{build_number}/jobs/{job_id}/artifacts/{artifact_id}/download"
+    return generic_api.get_content(request_path, {})
+
+
 def download_artifact_to_file(
     pipeline_slug: str, build_number: int, job_id: str, artifact_id: str, file_path: str
 ) -> str:
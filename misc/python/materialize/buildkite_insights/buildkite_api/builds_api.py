@@ -28,6 +28,7 @@ def get_builds(
     items_per_page: int = 100,
     include_retries: bool = True,
     first_page: int = 1,
+    created_from: str | None = None,
 ) -> list[Any]:
     request_path = f"organizations/materialize/pipelines/{pipeline_slug}/builds"
     params = _get_params(
@@ -35,6 +36,7 @@ def get_builds(
         build_states=build_states,
         items_per_page=items_per_page,
         include_retries=include_retries,
+        created_from=created_from,
     )
 
     return generic_api.get_multiple(
@@ -49,12 +51,14 @@ def get_builds_of_all_pipelines(
     items_per_page: int = 100,
     include_retries: bool = True,
     first_page: int = 1,
+    created_from: str | None = None,
 ) -> list[Any]:
     params = _get_params(
         branch=branch,
         build_states=build_states,
         items_per_page=items_per_page,
         include_retries=include_retries,
+        created_from=created_from,
     )
 
     return generic_api.get_multiple(
@@ -75,6 +79,7 @@ def _get_params(
     build_states: list[str] | None,
     items_per_page: int = 100,
     include_retries: bool = True,
+    created_from: str | None = None,
 ) -> dict[str, Any]:
     params: dict[str, Any] = {
         "include_retried_jobs": str(include_retries).lower(),
@@ -87,4 +92,7 @@ def _get_params(
     if build_states is not None and len(build_states) > 0:
         params["state[]"] = build_states
 
+    if created_from is not None:
+        params["created_from"] = created_from
+
     return params
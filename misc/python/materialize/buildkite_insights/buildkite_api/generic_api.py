@@ -8,15 +8,24 @@
 # by the Apache License, Version 2.0.
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 
 BUILDKITE_API_URL = "https://api.buildkite.com/v2"
 
 STATUS_CODE_RATE_LIMIT_EXCEEDED = 429
 
+# number of pages that are requested at the same time, kept low to stay within the rate limit of the API
+MAX_PARALLEL_FETCHES = 4
+
+# reuse connections across requests instead of opening a new one per request
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=MAX_PARALLEL_FETCHES))
+
 
 class RateLimitExceeded(Exception):
     def __init__(self, partial_result: list[Any]):
@@ -32,47 +41,64 @@ def get(request_path: str, params: dict[str, Any], as_json: bool = True) -> Any:
         return response.text
 
 
+def get_content(request_path: str, params: dict[str, Any]) -> bytes:
+    return _perform_get_request(request_path, params).content
+
+
 def get_multiple(
     request_path: str,
     params: dict[str, Any],
     max_fetches: int | None,
     first_page: int = 1,
+    max_parallel_fetches: int = MAX_PARALLEL_FETCHES,
 ) -> list[Any]:
+    """
+    Fetches the pages in batches of up to `max_parallel_fetches` concurrent requests. Pages following an empty page
+    are discarded.
+    """
     results = []
 
     print(f"Starting to fetch data from Buildkite: {request_path}")
     params["per_page"] = 100
-    params["page"] = str(first_page)
+    page = first_page
 
     fetch_count = 0
-    while True:
-        try:
-            result = get(request_path, params)
-        except RateLimitExceeded:
-            raise RateLimitExceeded(partial_result=results)
+    with ThreadPoolExecutor(max_workers=max_parallel_fetches) as executor:
+        while True:
+            batch_size = max_parallel_fetches
+            if max_fetches is not None:
+                batch_size = min(batch_size, max_fetches - fetch_count)
 
-        fetch_count += 1
+            futures = [
+                executor.submit(get, request_path, {**params, "page": str(page + i)})
+                for i in range(batch_size)
+            ]
+            page += batch_size
 
-        if not result:
-            print("No further results.")
-            break
+            for future in futures:
+                try:
+                    result = future.result()
+                except RateLimitExceeded:
+                    raise RateLimitExceeded(partial_result=results)
 
-        if isinstance(result, dict) and result.get("message"):
-            raise RuntimeError(f"Something went wrong! ({result['message']})")
+                fetch_count += 1
 
-        params["page"] = str(int(params["page"]) + 1)
+                if not result:
+                    print("No further results.")
+                    return results
 
-        entry_count = len(result)
-        created_at = result[-1]["created_at"]
-        print(f"Fetched {entry_count} entries, created at {created_at}.")
+                if isinstance(result, dict) and result.get("message"):
+                    raise RuntimeError(f"Something went wrong! ({result['message']})")
 
-        results.extend(result)
+                entry_count = len(result)
+                created_at = result[-1]["created_at"]
+                print(f"Fetched {entry_count} entries, created at {created_at}.")
 
-        if max_fetches is not None and fetch_count >= max_fetches:
-            print("Max fetches reached.")
-            break
+                results.extend(result)
 
-    return results
+            if max_fetches is not None and fetch_count >= max_fetches:
+                print("Max fetches reached.")
+                return results
 
 
 def get_and_download_to_file(
@@ -94,7 +120,7 @@ def _perform_get_request(request_path: str, params: dict[str, Any]) -> Response:
         print("Authentication token is not specified or empty!")
 
     url = f"{BUILDKITE_API_URL}/{request_path}"
-    response = requests.get(headers=headers, url=url, params=params)
+    response = _session.get(headers=headers, url=url, params=params)
 
     if response.status_code == STATUS_CODE_RATE_LIMIT_EXCEEDED:
         raise RateLimitExceeded([])
@@ -0,0 +1,411 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""
+A local SQLite store of builds, jobs, annotations and artifact lists.
+
+In contrast to the file cache, the builds are synced incrementally: only builds created after the cursor of the
+previous sync are fetched, the cursor being held back by builds that were still running. The stored data can be
+queried with SQL, so that it does not need to be loaded into memory as a whole.
+"""
+
+import json
+import sqlite3
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+
+from materialize.buildkite_insights.buildkite_api import (
+    annotations_api,
+    artifacts_api,
+    builds_api,
+)
+from materialize.buildkite_insights.buildkite_api.generic_api import RateLimitExceeded
+from materialize.buildkite_insights.cache.cache_constants import FetchMode
+from materialize.buildkite_insights.cache.generic_cache import PATH_TO_CACHE_DIR
+from materialize.util import ensure_dir_exists
+
+PATH_TO_BUILD_STORE = PATH_TO_CACHE_DIR / "buildkite.sqlite"
+
+# cursor key for syncs of the builds of all pipelines
+ALL_PIPELINES_KEY = "all"
+
+# number of builds per fetched page
+ITEMS_PER_PAGE = 100
+
+# builds still running after this time are no longer refreshed, so that they do not hold back the cursor forever
+MAX_BUILD_DURATION_IN_HOURS = 24
+
+BUILDKITE_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id TEXT PRIMARY KEY,
+    pipeline_slug TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    branch TEXT,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_by_pipeline ON builds (pipeline_slug, created_at);
+CREATE INDEX IF NOT EXISTS builds_by_created_at ON builds (created_at);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    build_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    step_key TEXT,
+    state TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_build ON jobs (build_id, position);
+
+CREATE TABLE IF NOT EXISTS annotations (
+    pipeline_slug TEXT NOT NULL,
+    build_number INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (pipeline_slug, build_number, position)
+);
+CREATE TABLE IF NOT EXISTS synced_annotations (
+    pipeline_slug TEXT NOT NULL,
+    build_number INTEGER NOT NULL,
+    PRIMARY KEY (pipeline_slug, build_number)
+);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+CREATE TABLE IF NOT EXISTS synced_artifacts (
+    job_id TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    pipeline_key TEXT PRIMARY KEY,
+    created_from TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+class BuildStore:
+    def __init__(self, path: str = str(PATH_TO_BUILD_STORE)):
+        ensure_dir_exists(str(PATH_TO_CACHE_DIR))
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def sync_builds(
+        self,
+        pipeline_slug: str | None,
+        fetch_mode: FetchMode,
+        max_initial_fetches: int | None,
+    ) -> None:
+        """
+        Fetches the builds of a pipeline (or of all pipelines if `pipeline_slug` is None) that were created since the
+        previous sync. Without a previous sync, the most recent `max_initial_fetches` pages of builds are fetched.
+        In case of an exceeded rate limit, the partial result is stored but the cursor is not advanced.
+        """
+        pipeline_key = pipeline_slug or ALL_PIPELINES_KEY
+        created_from = self._get_cursor(pipeline_key)
+
+        if fetch_mode == FetchMode.NEVER or (
+            fetch_mode == FetchMode.AVOID and created_from is not None
+        ):
+            return
+
+        if created_from is None:
+            print(f"Initially syncing builds of {pipeline_key} into {self.path}")
+        else:
+            print(f"Syncing builds of {pipeline_key} created from {created_from}")
+
+        synced_at = datetime.utcnow().strftime(BUILDKITE_TIMESTAMP_FORMAT)
+        max_fetches = max_initial_fetches if created_from is None else None
+
+        try:
+            if pipeline_slug is None:
+                builds = builds_api.get_builds_of_all_pipelines(
+                    max_fetches=max_fetches,
+                    branch=None,
+                    items_per_page=ITEMS_PER_PAGE,
+                    created_from=created_from,
+                )
+            else:
+                builds = builds_api.get_builds(
+                    pipeline_slug,
+                    max_fetches=max_fetches,
+                    branch=None,
+                    build_states=None,
+                    items_per_page=ITEMS_PER_PAGE,
+                    created_from=created_from,
+                )
+        except RateLimitExceeded as e:
+            self._store_builds(e.partial_result)
+            raise
+
+        self._store_builds(builds)
+        self._advance_cursor(pipeline_slug, pipeline_key, synced_at)
+
+    def iterate_builds(
+        self,
+        pipeline_slug: str | None,
+        branch: str | None = None,
+        build_states: list[str] | None = None,
+        step_keys: list[str] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[Any]:
+        """
+        Yields the stored builds, most recent first, in the format of the Buildkite API.
+        :param step_keys: only include the jobs of these build steps, all jobs if None
+        """
+        conditions = []
+        params: list[Any] = []
+
+        if pipeline_slug is not None:
+            conditions.append("pipeline_slug = ?")
+            params.append(pipeline_slug)
+
+        if branch is not None:
+            conditions.append("branch = ?")
+            params.append(branch)
+
+        if build_states:
+            conditions.append(f"state IN ({_placeholders(build_states)})")
+            params.extend(build_states)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT id, data FROM builds {where_clause} ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+
+        job_query = "SELECT data FROM jobs WHERE build_id = ?"
+        if step_keys is not None:
+            job_query += f" AND step_key IN ({_placeholders(step_keys)})"
+        job_query += " ORDER BY position"
+
+        for build_id, data in self.connection.execute(query, params):
+            build = json.loads(data)
+            build["jobs"] = [
+                json.loads(job_data)
+                for (job_data,) in self.connection.execute(
+                    job_query, [build_id, *(step_keys or [])]
+                )
+            ]
+            yield build
+
+    def get_or_query_annotations(
+        self,
+        fetch_mode: FetchMode,
+        pipeline_slug: str,
+        build_number: int,
+        add_to_store_if_not_present: bool,
+    ) -> list[Any]:
+        stored_annotations = self.get_stored_annotations(pipeline_slug, build_number)
+
+        if fetch_mode == FetchMode.NEVER and stored_annotations is None:
+            raise RuntimeError(
+                f"Annotations of build #{build_number} of {pipeline_slug} missing in store"
+            )
+
+        if stored_annotations is not None and fetch_mode != FetchMode.ALWAYS:
+            return stored_annotations
+
+        annotations = annotations_api.get_annotations(
+            pipeline_slug=pipeline_slug, build_number=str(build_number)
+        )
+
+        if add_to_store_if_not_present:
+            self.store_annotations(pipeline_slug, build_number, annotations)
+
+        return annotations
+
+    def get_stored_annotations(
+        self, pipeline_slug: str, build_number: int
+    ) -> list[Any] | None:
+        if not self._exists(
+            "SELECT 1 FROM synced_annotations WHERE pipeline_slug = ? AND build_number = ?",
+            [pipeline_slug, build_number],
+        ):
+            return None
+
+        return [
+            json.loads(data)
+            for (data,) in self.connection.execute(
+                "SELECT data FROM annotations WHERE pipeline_slug = ? AND build_number = ? ORDER BY position",
+                [pipeline_slug, build_number],
+            )
+        ]
+
+    def store_annotations(
+        self, pipeline_slug: str, build_number: int, annotations: list[Any]
+    ) -> None:
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM annotations WHERE pipeline_slug = ? AND build_number = ?",
+                [pipeline_slug, build_number],
+            )
+            self.connection.executemany(
+                "INSERT INTO annotations (pipeline_slug, build_number, position, data) VALUES (?, ?, ?, ?)",
+                [
+                    (pipeline_slug, build_number, position, json.dumps(annotation))
+                    for position, annotation in enumerate(annotations)
+                ],
+            )
+            self.connection.execute(
+                "INSERT OR IGNORE INTO synced_annotations (pipeline_slug, build_number) VALUES (?, ?)",
+                [pipeline_slug, build_number],
+            )
+
+    def get_or_query_job_artifact_list(
+        self,
+        pipeline_slug: str,
+        fetch_mode: FetchMode,
+        build_number: int,
+        job_id: str,
+    ) -> list[Any]:
+        is_stored = self._exists(
+            "SELECT 1 FROM synced_artifacts WHERE job_id = ?", [job_id]
+        )
+
+        if fetch_mode == FetchMode.NEVER and not is_stored:
+            raise RuntimeError(f"Artifacts of job {job_id} missing in store")
+
+        if is_stored and fetch_mode != FetchMode.ALWAYS:
+            return [
+                json.loads(data)
+                for (data,) in self.connection.execute(
+                    "SELECT data FROM artifacts WHERE job_id = ? ORDER BY position",
+                    [job_id],
+                )
+            ]
+
+        artifacts = artifacts_api.get_build_job_artifact_list(
+            pipeline_slug=pipeline_slug, build_number=build_number, job_id=job_id
+        )
+
+        with self.connection:
+            self.connection.execute("DELETE FROM artifacts WHERE job_id = ?", [job_id])
+            self.connection.executemany(
+                "INSERT INTO artifacts (job_id, position, data) VALUES (?, ?, ?)",
+                [
+                    (job_id, position, json.dumps(artifact))
+                    for position, artifact in enumerate(artifacts)
+                ],
+            )
+            self.connection.execute(
+                "INSERT OR IGNORE INTO synced_artifacts (job_id) VALUES (?)", [job_id]
+            )
+
+        return artifacts
+
+    def _store_builds(self, builds: list[Any]) -> None:
+        with self.connection:
+            for build in builds:
+                build = dict(build)
+                jobs = build.pop("jobs", [])
+                self.connection.execute(
+                    """
+                    INSERT INTO builds (id, pipeline_slug, number, branch, state, created_at, finished_at, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        state = excluded.state, finished_at = excluded.finished_at, data = excluded.data
+                    """,
+                    (
+                        build["id"],
+                        build["pipeline"]["slug"],
+                        build["number"],
+                        build["branch"],
+                        build["state"],
+                        build["created_at"],
+                        build["finished_at"],
+                        json.dumps(build),
+                    ),
+                )
+                self.connection.executemany(
+                    """
+                    INSERT INTO jobs (id, build_id, position, step_key, state, data) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        position = excluded.position, state = excluded.state, data = excluded.data
+                    """,
+                    [
+                        (
+                            job["id"],
+                            build["id"],
+                            position,
+                            job.get("step_key"),
+                            job.get("state"),
+                            json.dumps(job),
+                        )
+                        for position, job in enumerate(jobs)
+                    ],
+                )
+
+    def _get_cursor(self, pipeline_key: str) -> str | None:
+        row = self.connection.execute(
+            "SELECT created_from FROM sync_cursors WHERE pipeline_key = ?",
+            [pipeline_key],
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _advance_cursor(
+        self, pipeline_slug: str | None, pipeline_key: str, synced_at: str
+    ) -> None:
+        pipeline_condition = "pipeline_slug = ?" if pipeline_slug is not None else "1"
+        pipeline_params = [pipeline_slug] if pipeline_slug is not None else []
+
+        (newest_created_at,) = self.connection.execute(
+            f"SELECT MAX(created_at) FROM builds WHERE {pipeline_condition}",
+            pipeline_params,
+        ).fetchone()
+
+        if newest_created_at is None:
+            return
+
+        min_created_at_of_running_build = (
+            datetime.strptime(newest_created_at, BUILDKITE_TIMESTAMP_FORMAT)
+            - timedelta(hours=MAX_BUILD_DURATION_IN_HOURS)
+        ).strftime(BUILDKITE_TIMESTAMP_FORMAT)
+
+        (oldest_running_created_at,) = self.connection.execute(
+            f"""
+            SELECT MIN(created_at) FROM builds
+            WHERE {pipeline_condition} AND finished_at IS NULL AND created_at >= ?
+            """,
+            [*pipeline_params, min_created_at_of_running_build],
+        ).fetchone()
+
+        created_from = min(
+            newest_created_at, oldest_running_created_at or newest_created_at
+        )
+
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO sync_cursors (pipeline_key, created_from, synced_at) VALUES (?, ?, ?)
+                ON CONFLICT (pipeline_key) DO UPDATE SET
+                    created_from = excluded.created_from, synced_at = excluded.synced_at
+                """,
+                [pipeline_key, created_from, synced_at],
+            )
+
+    def _exists(self, query: str, params: list[Any]) -> bool:
+        return self.connection.execute(query, params).fetchone() is not None
+
+
+def _placeholders(values: list[Any]) -> str:
+    return ", ".join("?" for _ in values)
@@ -0,0 +1,290 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""
+A full-text index of annotations, job logs and artifacts, kept in the build store.
+
+The texts are tokenized into trigrams (SQLite FTS5), which allows looking up the texts containing the literals of a
+search value before the actual search with a regex. Only texts that are not indexed yet are downloaded, concurrently.
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import zstandard
+
+from materialize.buildkite_insights.buildkite_api import (
+    annotations_api,
+    artifacts_api,
+    logs_api,
+)
+from materialize.buildkite_insights.buildkite_api.buildkite_constants import (
+    BUILDKITE_COMPLETED_BUILD_STATES,
+)
+from materialize.buildkite_insights.buildkite_api.generic_api import (
+    MAX_PARALLEL_FETCHES,
+)
+from materialize.buildkite_insights.cache.build_store import BuildStore
+from materialize.buildkite_insights.data.build_info import Build
+from materialize.buildkite_insights.util.search_utility import (
+    required_literals,
+    strip_html_tags,
+)
+
+JOB_LOG_FILE_NAME = "log"
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS annotation_texts USING fts5 (
+    pipeline_slug UNINDEXED,
+    build_number UNINDEXED,
+    content,
+    tokenize = 'trigram'
+);
+CREATE TABLE IF NOT EXISTS indexed_annotations (
+    pipeline_slug TEXT NOT NULL,
+    build_number INTEGER NOT NULL,
+    PRIMARY KEY (pipeline_slug, build_number)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS file_texts USING fts5 (
+    content,
+    tokenize = 'trigram'
+);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    file_id TEXT PRIMARY KEY,
+    text_rowid INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class IndexableFile:
+    job_id: str
+    # the job id for the log of a job, the artifact id otherwise
+    file_id: str
+    file_name: str
+
+    def is_job_log(self) -> bool:
+        return self.file_name == JOB_LOG_FILE_NAME and self.file_id == self.job_id
+
+
+class SearchIndex:
+    def __init__(self, build_store: BuildStore):
+        self.build_store = build_store
+        self.connection = build_store.connection
+        self.connection.executescript(SCHEMA)
+
+    def index_annotations(self, builds: list[Build]) -> None:
+        """
+        Indexes the annotations of completed builds that are not indexed yet. Annotations that are not in the build
+        store yet are fetched concurrently and added to it.
+        """
+        indexed_builds = self._get_indexed_builds()
+        builds_to_index = [
+            build
+            for build in builds
+            if build.state in BUILDKITE_COMPLETED_BUILD_STATES
+            and (build.pipeline, int(build.number)) not in indexed_builds
+        ]
+
+        if len(builds_to_index) == 0:
+            return
+
+        print(f"Indexing annotations of {len(builds_to_index)} builds")
+
+        builds_to_fetch = []
+        for build in builds_to_index:
+            stored_annotations = self.build_store.get_stored_annotations(
+                build.pipeline, int(build.number)
+            )
+            if stored_annotations is None:
+                builds_to_fetch.append(build)
+            else:
+                self._index_annotations_of_build(build, stored_annotations)
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_FETCHES) as executor:
+            # the annotations are written in this thread because the connection must not be shared across threads
+            for build, annotations in zip(
+                builds_to_fetch,
+                executor.map(
+                    lambda build: annotations_api.get_annotations(
+                        pipeline_slug=build.pipeline, build_number=str(build.number)
+                    ),
+                    builds_to_fetch,
+                ),
+            ):
+                self.build_store.store_annotations(
+                    build.pipeline, int(build.number), annotations
+                )
+                self._index_annotations_of_build(build, annotations)
+
+    def filter_builds_with_possible_annotation_matches(
+        self, builds: list[Build], search_value: str, use_regex: bool
+    ) -> list[Build]:
+        """
+        :return: the builds that are not indexed or have an annotation containing all required literals of the
+                 search value
+        """
+        match_query = _to_match_query(search_value, use_regex)
+
+        if match_query is None:
+            return builds
+
+        indexed_builds = self._get_indexed_builds()
+        builds_with_possible_matches = set(
+            self.connection.execute(
+                "SELECT pipeline_slug, build_number FROM annotation_texts WHERE annotation_texts MATCH ?",
+                [match_query],
+            )
+        )
+
+        return [
+            build
+            for build in builds
+            if (build.pipeline, int(build.number)) not in indexed_builds
+            or (build.pipeline, int(build.number)) in builds_with_possible_matches
+        ]
+
+    def index_files(
+        self, pipeline_slug: str, build_number: int, files: list[IndexableFile]
+    ) -> None:
+        """Downloads, decompresses and indexes the files that are not indexed yet concurrently."""
+        files_to_index = [
+            file for file in files if not self._is_file_indexed(file.file_id)
+        ]
+
+        if len(files_to_index) == 0:
+            return
+
+        print(f"Indexing {len(files_to_index)} files")
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_FETCHES) as executor:
+            for file, content in zip(
+                files_to_index,
+                executor.map(
+                    lambda file: _download_file(pipeline_slug, build_number, file),
+                    files_to_index,
+                ),
+            ):
+                with self.connection:
+                    cursor = self.connection.execute(
+                        "INSERT INTO file_texts (content) VALUES (?)", [content]
+                    )
+                    self.connection.execute(
+                        "INSERT INTO indexed_files (file_id, text_rowid) VALUES (?, ?)",
+                        [file.file_id, cursor.lastrowid],
+                    )
+
+    def filter_files_with_possible_matches(
+        self, file_ids: list[str], search_value: str, use_regex: bool
+    ) -> set[str]:
+        """
+        :return: the ids of the files that are not indexed or contain all required literals of the search value
+        """
+        match_query = _to_match_query(search_value, use_regex)
+
+        if match_query is None:
+            return set(file_ids)
+
+        files_with_possible_matches = {
+            file_id
+            for (file_id,) in self.connection.execute(
+                """
+                SELECT indexed_files.file_id FROM file_texts
+                JOIN indexed_files ON indexed_files.text_rowid = file_texts.rowid
+                WHERE file_texts MATCH ?
+                """,
+                [match_query],
+            )
+        }
+
+        return {
+            file_id
+            for file_id in file_ids
+            if file_id in files_with_possible_matches
+            or not self._is_file_indexed(file_id)
+        }
+
+    def get_file_content(self, file_id: str) -> str | None:
+        row = self.connection.execute(
+            """
+            SELECT file_texts.content FROM indexed_files
+            JOIN file_texts ON file_texts.rowid = indexed_files.text_rowid
+            WHERE indexed_files.file_id = ?
+            """,
+            [file_id],
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _is_file_indexed(self, file_id: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM indexed_files WHERE file_id = ?", [file_id]
+            ).fetchone()
+            is not None
+        )
+
+    def _get_indexed_builds(self) -> set[tuple[str, int]]:
+        return set(
+            self.connection.execute(
+                "SELECT pipeline_slug, build_number FROM indexed_annotations"
+            )
+        )
+
+    def _index_annotations_of_build(self, build: Build, annotations: list[Any]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO annotation_texts (pipeline_slug, build_number, content) VALUES (?, ?, ?)",
+                [
+                    (
+                        build.pipeline,
+                        int(build.number),
+                        strip_html_tags(annotation["body_html"]),
+                    )
+                    for annotation in annotations
+                ],
+            )
+            self.connection.execute(
+                "INSERT INTO indexed_annotations (pipeline_slug, build_number) VALUES (?, ?)",
+                [build.pipeline, int(build.number)],
+            )
+
+
+def _to_match_query(search_value: str, use_regex: bool) -> str | None:
+    literals = required_literals(search_value, use_regex)
+
+    if len(literals) == 0:
+        return None
+
+    return " AND ".join('"' + literal.replace('"', '""') + '"' for literal in literals)
+
+
+def _download_file(pipeline_slug: str, build_number: int, file: IndexableFile) -> str:
+    if file.is_job_log():
+        return logs_api.download_log(
+            pipeline_slug=pipeline_slug, build_number=build_number, job_id=file.job_id
+        )
+
+    content = artifacts_api.download_artifact_content(
+        pipeline_slug=pipeline_slug,
+        build_number=build_number,
+        job_id=file.job_id,
+        artifact_id=file.file_id,
+    )
+
+    if file.file_name.endswith(".zst"):
+        content = (
+            zstandard.ZstdDecompressor()
+            .stream_reader(io.BytesIO(content), read_across_frames=True)
+            .read()
+        )
+
+    return content.decode("utf-8", errors="replace")
@@ -7,17 +7,39 @@
 # As of the Change Date specified in that file, in accordance with
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
+
+import argparse
+
 from materialize.buildkite_insights.buildkite_api import builds_api
+from materialize.buildkite_insights.cache.build_store import BuildStore
+from materialize.buildkite_insights.cache.cache_constants import FetchMode
 from materialize.buildkite_insights.util.data_io import (
     SimpleFilePath,
     write_results_to_file,
 )
 
 
-def main() -> None:
+def main(use_store: bool) -> None:
+    if use_store:
+        store = BuildStore()
+        store.sync_builds(None, FetchMode.ALWAYS, max_initial_fetches=None)
+        store.close()
+        return
+
     result = builds_api.get_builds_of_all_pipelines(max_fetches=None, branch=None)
     write_results_to_file(result, SimpleFilePath("data.json"))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        prog="download-stats",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--use-store",
+        action="store_true",
+        help="Sync only new builds into the local SQLite store instead of downloading all builds to data.json.",
+    )
+    args = parser.parse_args()
+
+    main(args.use_store)
@@ -7,10 +7,12 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import argparse
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 
+from materialize.buildkite_insights.cache.build_store import BuildStore
 from materialize.buildkite_insights.util.data_io import (
     SimpleFilePath,
     read_results_from_file,
@@ -108,7 +110,7 @@ class Failures:
     total: int
 
 
-def main() -> None:
+def main(use_store: bool) -> None:
     job_costs = defaultdict(lambda: defaultdict(float))
     pipeline_costs = defaultdict(lambda: defaultdict(float))
     job_counts = defaultdict(lambda: defaultdict(int))
@@ -120,7 +122,11 @@ def main() -> None:
     build_durations = defaultdict(lambda: defaultdict(float))
     build_counts = defaultdict(lambda: defaultdict(int))
 
-    data = read_results_from_file(SimpleFilePath("data.json"))
+    if use_store:
+        # iterate over the builds instead of loading all of them into memory
+        data = BuildStore().iterate_builds(pipeline_slug=None)
+    else:
+        data = read_results_from_file(SimpleFilePath("data.json"))
 
     for build in data:
         pipeline_name = build["pipeline"]["name"]
@@ -301,4 +307,15 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        prog="extract-stats",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--use-store",
+        action="store_true",
+        help="Read the builds from the local SQLite store instead of data.json.",
+    )
+    args = parser.parse_args()
+
+    main(args.use_store)
@@ -10,6 +10,7 @@
 # by the Apache License, Version 2.0.
 
 import argparse
+from typing import Any
 
 import pandas as pd
 
@@ -24,6 +25,7 @@ from materialize.buildkite_insights.buildkite_api.buildkite_constants import (
 )
 from materialize.buildkite_insights.buildkite_api.generic_api import RateLimitExceeded
 from materialize.buildkite_insights.cache import builds_cache
+from materialize.buildkite_insights.cache.build_store import ITEMS_PER_PAGE, BuildStore
 from materialize.buildkite_insights.cache.cache_constants import (
     FETCH_MODE_CHOICES,
     FetchMode,
@@ -142,15 +144,21 @@ def main(
     build_step_states: list[str],
     output_type: str,
     include_commit_hash: bool,
+    use_store: bool = False,
 ) -> None:
-    try:
-        builds_data = builds_cache.get_or_query_builds(
-            pipeline_slug, fetch_mode, max_fetches, branch, build_states
+    if use_store:
+        builds_data, data_is_incomplete = _get_builds_from_store(
+            pipeline_slug, build_steps, fetch_mode, max_fetches, branch, build_states
         )
-        data_is_incomplete = False
-    except RateLimitExceeded as e:
-        builds_data = e.partial_result
-        data_is_incomplete = True
+    else:
+        try:
+            builds_data = builds_cache.get_or_query_builds(
+                pipeline_slug, fetch_mode, max_fetches, branch, build_states
+            )
+            data_is_incomplete = False
+        except RateLimitExceeded as e:
+            builds_data = e.partial_result
+            data_is_incomplete = True
 
     step_outcomes = extract_build_step_outcomes(
         builds_data=builds_data,
@@ -167,6 +175,38 @@ def main(
     )
 
 
+def _get_builds_from_store(
+    pipeline_slug: str,
+    build_steps: list[BuildStepMatcher],
+    fetch_mode: FetchMode,
+    max_fetches: int,
+    branch: str | None,
+    build_states: list[str],
+) -> tuple[list[Any], bool]:
+    store = BuildStore()
+
+    try:
+        store.sync_builds(pipeline_slug, fetch_mode, max_initial_fetches=max_fetches)
+        data_is_incomplete = False
+    except RateLimitExceeded:
+        data_is_incomplete = True
+
+    # only load the jobs of the selected build steps
+    step_keys = [matcher.step_key for matcher in build_steps] or None
+    builds_data = list(
+        store.iterate_builds(
+            pipeline_slug,
+            branch=branch,
+            build_states=build_states,
+            step_keys=step_keys,
+            limit=max_fetches * ITEMS_PER_PAGE,
+        )
+    )
+    store.close()
+
+    return builds_data, data_is_incomplete
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         prog="buildkite-step-insights",
@@ -213,6 +253,11 @@ if __name__ == "__main__":
         "--include-commit-hash",
         action="store_true",
     )
+    parser.add_argument(
+        "--use-store",
+        action="store_true",
+        help="Sync the builds incrementally into a local SQLite store and query them from there.",
+    )
 
     args = parser.parse_args()
 
@@ -241,4 +286,5 @@ if __name__ == "__main__":
         selected_build_step_states,
         args.output_type,
         args.include_commit_hash,
+        args.use_store,
     )
@@ -24,6 +24,116 @@ def _search_value_to_regex(search_value: str, use_regex: bool) -> str:
     return re.escape(search_value)
 
 
+def required_literals(search_value: str, use_regex: bool) -> list[str]:
+    r"""
+    Determines substrings that every match of the search value contains. They allow looking up candidates in a
+    trigram index before searching them, which requires at least three characters. Parts of a regex that are
+    optional, in groups or in alternatives are not considered.
+
+    >>> required_literals("Error { kind: Db", use_regex=False)
+    ['Error { kind: Db']
+    >>> required_literals("cannot serve requested as_of AntiChain.*testdrive-materialized-1", use_regex=True)
+    ['cannot serve requested as_of AntiChain', 'testdrive-materialized-1']
+    >>> required_literals(r"colou?r \d+ files? in 10\.0 s", use_regex=True)
+    ['colo', ' file', ' in 10.0 s']
+    >>> required_literals("panicked at (src|lib)/.*[.]rs{1,2}", use_regex=True)
+    ['panicked at ']
+    >>> required_literals("Error { kind", use_regex=True)
+    ['Error { kind']
+    >>> required_literals("foo|bar", use_regex=True)
+    []
+    >>> required_literals(r"[\]x]abcd", use_regex=True)
+    ['abcd']
+    >>> required_literals("[^]]hello", use_regex=True)
+    ['hello']
+    """
+    if not use_regex:
+        literals = [search_value]
+    else:
+        literals = _required_literals_of_regex(search_value)
+
+    return [literal for literal in literals if len(literal) >= 3 and literal.isascii()]
+
+
+def _required_literals_of_regex(regex: str) -> list[str]:
+    literals = []
+    current = ""
+    group_depth = 0
+    i = 0
+
+    while i < len(regex):
+        char = regex[i]
+        quantifier = re.match(r"\{\d*(,\d*)?\}", regex[i:])
+
+        if char == "\\" and i + 1 < len(regex):
+            if regex[i + 1].isalnum():
+                # character class such as \d or back reference
+                literals.append(current)
+                current = ""
+            elif group_depth == 0:
+                current += regex[i + 1]
+            i += 2
+            continue
+        elif char == "[":
+            i = _end_of_character_set(regex, i)
+            literals.append(current)
+            current = ""
+        elif char == "(":
+            group_depth += 1
+            literals.append(current)
+            current = ""
+        elif char == ")":
+            group_depth = max(group_depth - 1, 0)
+        elif group_depth > 0:
+            pass
+        elif char == "|":
+            # matches of different alternatives do not need to have anything in common
+            return []
+        elif char in "*?" or (char == "{" and quantifier is not None):
+            # the preceding character is optional
+            literals.append(current[:-1])
+            current = ""
+            if quantifier is not None:
+                i += len(quantifier.group(0)) - 1
+        elif char in "+.^$":
+            literals.append(current)
+            current = ""
+        else:
+            current += char
+
+        i += 1
+
+    literals.append(current)
+    return literals
+
+
+def _end_of_character_set(regex: str, start: int) -> int:
+    """
+    :param start: index of the opening bracket of a character set
+    :return: index of its closing bracket, or the length of the regex if it is not closed
+    """
+    i = start + 1
+    if i < len(regex) and regex[i] == "^":
+        i += 1
+    if i < len(regex) and regex[i] == "]":
+        # a closing bracket at the start of the set is part of it
+        i += 1
+
+    while i < len(regex):
+        if regex[i] == "\\":
+            i += 2
+            continue
+        if regex[i] == "]":
+            return i
+        i += 1
+
+    return len(regex)
+
+
+def strip_html_tags(html: str) -> str:
+    return re.sub(r"<[^>]+>", "", html)
+
+
 def highlight_match(
     input: str,
     search_value: str,
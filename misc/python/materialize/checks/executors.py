@@ -8,7 +8,7 @@
 # by the Apache License, Version 2.0.
 
 import random
-import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from inspect import Traceback
 from typing import Any
 
@@ -54,34 +54,42 @@ class MzcomposeExecutor(Executor):
     def testdrive(
         self, input: str, caller: Traceback | None = None, mz_service: str | None = None
     ) -> None:
-        self.composition.testdrive(input, caller=caller, mz_service=mz_service)
+        # The testdrive service is started during the setup, so only check
+        # whether it is running if executing a fragment fails, rather than
+        # before every fragment.
+        self.composition.testdrive(
+            input, caller=caller, mz_service=mz_service, check_running=False
+        )
 
 
 class MzcomposeExecutorParallel(MzcomposeExecutor):
-    def __init__(self, composition: Composition) -> None:
+    """Runs the testdrive fragments on a bounded pool of long-lived threads.
+
+    Every thread renders its own compose file once, so that the fragments of
+    all phases reuse the threads instead of spawning a new one, and writing
+    a new compose file, per fragment.
+    """
+
+    MAX_WORKERS = 16
+
+    def __init__(
+        self, composition: Composition, max_workers: int = MAX_WORKERS
+    ) -> None:
         self.composition = composition
-        self.exception: BaseException | None = None
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="testdrive"
+        )
 
     def testdrive(
         self, input: str, caller: Traceback | None = None, mz_service: str | None = None
     ) -> Any:
-        thread = threading.Thread(target=self._testdrive, args=[input, caller])
-        thread.start()
-        return thread
-
-    def _testdrive(
-        self, input: str, caller: Traceback | None = None, mz_service: str | None = None
-    ) -> None:
-        try:
-            self.composition.testdrive(input, caller=caller, mz_service=mz_service)
-        except BaseException as e:
-            self.exception = e
+        return self.pool.submit(
+            super().testdrive, input, caller=caller, mz_service=mz_service
+        )
 
     def join(self, handle: Any) -> None:
-        assert type(handle) is threading.Thread
-        handle.join()
-        if self.exception:
-            raise self.exception
+        assert type(handle) is Future
+        handle.result()
 
 
 class CloudtestExecutor(Executor):
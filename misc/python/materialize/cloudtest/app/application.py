@@ -9,6 +9,7 @@
 
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from materialize import ui
 from materialize.cloudtest import DEFAULT_K8S_CLUSTER_NAME, DEFAULT_K8S_CONTEXT_NAME
@@ -27,8 +28,19 @@ class Application:
 
     def create_resources(self) -> None:
         self.acquire_images()
-        for resource in self.resources:
-            resource.create()
+        # Creating some resources takes a while, e.g. Minio waits for its
+        # deployment to become available, so the resources of a stage are
+        # created concurrently.
+        for stage in self.resource_stages():
+            with ThreadPoolExecutor(max_workers=max(len(stage), 1)) as executor:
+                futures = [executor.submit(resource.create) for resource in stage]
+                for future in futures:
+                    future.result()
+
+    def resource_stages(self) -> list[list[K8sResource]]:
+        """The resources in stages that are created one after the other. The
+        resources of a stage must not depend on each other."""
+        return [[resource] for resource in self.resources]
 
     def coverage_mode(self) -> bool:
         return ui.env_is_truthy("CI_COVERAGE_ENABLED")
@@ -7,7 +7,9 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from materialize import MZ_ROOT, mzbuild
 from materialize.cloudtest.app.application import Application
@@ -56,19 +58,82 @@ class CloudtestApplicationBase(Application):
             bazel_remote_cache=self.bazel_remote_cache(),
             bazel_lto=bazel_lto,
         )
-        for image in self.images:
-            self._acquire_image(repo, image)
-
-    def _acquire_image(self, repo: mzbuild.Repository, image: str) -> None:
-        deps = repo.resolve_dependencies([repo.images[image]])
+        # Resolve the dependencies of all images at once, so that the images
+        # they share are only acquired and loaded once.
+        deps = repo.resolve_dependencies([repo.images[image] for image in self.images])
         deps.acquire()
-        for dep in deps:
-            subprocess.check_call(
-                [
-                    "kind",
-                    "load",
-                    "docker-image",
-                    f"--name={self.cluster_name()}",
-                    dep.spec(),
-                ]
-            )
+        self._load_images([dep.spec() for dep in deps])
+
+    def _load_images(self, specs: list[str]) -> None:
+        """Load the images into the nodes of the kind cluster that do not
+        contain them yet."""
+        nodes = subprocess.check_output(
+            ["kind", "get", "nodes", f"--name={self.cluster_name()}"], text=True
+        ).split()
+        image_ids = subprocess.check_output(
+            ["docker", "image", "inspect", "--format={{.Id}}", *specs], text=True
+        ).split()
+        with ThreadPoolExecutor(max_workers=max(len(nodes), 1)) as executor:
+            node_images = dict(zip(nodes, executor.map(_get_node_images, nodes)))
+
+        missing_specs = set()
+        missing_nodes = set()
+        for node, images in node_images.items():
+            for spec, image_id in zip(specs, image_ids):
+                if (_normalize_image_name(spec), image_id) not in images:
+                    missing_specs.add(spec)
+                    missing_nodes.add(node)
+
+        if not missing_specs:
+            print("All images are already present on the kind nodes")
+            return
+
+        # A single invocation saves all images into one archive, which is then
+        # imported into every node that lacks any of them.
+        subprocess.check_call(
+            [
+                "kind",
+                "load",
+                "docker-image",
+                f"--name={self.cluster_name()}",
+                f"--nodes={','.join(sorted(missing_nodes))}",
+                *sorted(missing_specs),
+            ]
+        )
+
+
+def _get_node_images(node: str) -> set[tuple[str, str]]:
+    """The names and IDs of the images present on a kind node."""
+    try:
+        output = subprocess.check_output(
+            ["docker", "exec", node, "crictl", "images", "--output=json"], text=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to list the images on {node}, loading all images: {e}")
+        return set()
+
+    return {
+        (name, image["id"])
+        for image in json.loads(output)["images"]
+        for name in image.get("repoTags") or []
+    }
+
+
+def _normalize_image_name(name: str) -> str:
+    """Qualify an image name the way containerd does.
+
+    >>> _normalize_image_name("materialize/environmentd:mzbuild-ABC")
+    'docker.io/materialize/environmentd:mzbuild-ABC'
+    >>> _normalize_image_name("postgres")
+    'docker.io/library/postgres:latest'
+    >>> _normalize_image_name("localhost:5000/testdrive:v1")
+    'localhost:5000/testdrive:v1'
+    """
+    first, _, rest = name.partition("/")
+    if not rest:
+        name = f"docker.io/library/{name}"
+    elif "." not in first and ":" not in first and first != "localhost":
+        name = f"docker.io/{name}"
+    if ":" not in name.rsplit("/", 1)[1] and "@" not in name:
+        name = f"{name}:latest"
+    return name
@@ -72,31 +72,41 @@ class MaterializeApplication(CloudtestApplicationBase):
         self.create_resources_and_wait()
 
     def get_resources(self, log_filter: str | None) -> list[K8sResource]:
-        return [
+        self._resource_stages = [
             # Run first so it's available for Debezium, which gives up too quickly otherwise
-            *redpanda_resources(apply_node_selectors=self.apply_node_selectors),
-            *cockroach_resources(apply_node_selectors=self.apply_node_selectors),
-            *postgres_resources(apply_node_selectors=self.apply_node_selectors),
-            *mysql_resources(apply_node_selectors=self.apply_node_selectors),
-            *debezium_resources(apply_node_selectors=self.apply_node_selectors),
-            *ssh_resources(apply_node_selectors=self.apply_node_selectors),
-            Minio(apply_node_selectors=self.apply_node_selectors),
-            VpcEndpointsClusterRole(),
-            AdminRoleBinding(),
-            self.secret,
-            self.listeners_configmap,
-            EnvironmentdStatefulSet(
-                release_mode=self.release_mode,
-                tag=self.tag,
-                log_filter=log_filter,
-                coverage_mode=self.coverage_mode(),
-                apply_node_selectors=self.apply_node_selectors,
-            ),
-            PersistPubSubService(),
-            self.environmentd,
-            self.materialized_alias,
-            self.testdrive,
+            redpanda_resources(apply_node_selectors=self.apply_node_selectors),
+            [
+                *cockroach_resources(apply_node_selectors=self.apply_node_selectors),
+                *postgres_resources(apply_node_selectors=self.apply_node_selectors),
+                *mysql_resources(apply_node_selectors=self.apply_node_selectors),
+                *debezium_resources(apply_node_selectors=self.apply_node_selectors),
+                *ssh_resources(apply_node_selectors=self.apply_node_selectors),
+                Minio(apply_node_selectors=self.apply_node_selectors),
+                VpcEndpointsClusterRole(),
+                AdminRoleBinding(),
+                self.secret,
+                self.listeners_configmap,
+            ],
+            # Environmentd needs the persist bucket, its permissions, secret and
+            # listeners to exist when it starts
+            [
+                EnvironmentdStatefulSet(
+                    release_mode=self.release_mode,
+                    tag=self.tag,
+                    log_filter=log_filter,
+                    coverage_mode=self.coverage_mode(),
+                    apply_node_selectors=self.apply_node_selectors,
+                ),
+                PersistPubSubService(),
+                self.environmentd,
+                self.materialized_alias,
+                self.testdrive,
+            ],
         ]
+        return [resource for stage in self._resource_stages for resource in stage]
+
+    def resource_stages(self) -> list[list[K8sResource]]:
+        return self._resource_stages
 
     def get_images(self) -> list[str]:
         return ["environmentd", "clusterd", "testdrive", "postgres"]
@@ -10,11 +10,11 @@ import os
 import subprocess
 
 from kubernetes.client import AppsV1Api, CoreV1Api, RbacAuthorizationV1Api
-from kubernetes.config import new_client_from_config  # type: ignore
 
 from materialize import MZ_ROOT, mzbuild, ui
 from materialize.cloudtest import DEFAULT_K8S_CONTEXT_NAME
 from materialize.cloudtest.util.common import run_process_with_error_information
+from materialize.cloudtest.util.informer import api_client
 from materialize.cloudtest.util.wait import wait
 from materialize.rustc_flags import Sanitizer
 
@@ -49,16 +49,13 @@ class K8sResource:
             )
 
     def api(self) -> CoreV1Api:
-        api_client = new_client_from_config(context=self.context())
-        return CoreV1Api(api_client)
+        return CoreV1Api(api_client(self.context()))
 
     def apps_api(self) -> AppsV1Api:
-        api_client = new_client_from_config(context=self.context())
-        return AppsV1Api(api_client)
+        return AppsV1Api(api_client(self.context()))
 
     def rbac_api(self) -> RbacAuthorizationV1Api:
-        api_client = new_client_from_config(context=self.context())
-        return RbacAuthorizationV1Api(api_client)
+        return RbacAuthorizationV1Api(api_client(self.context()))
 
     def context(self) -> str:
         return DEFAULT_K8S_CONTEXT_NAME
@@ -155,6 +155,9 @@ class TestdrivePod(K8sPod, TestdriveBase):
 
         pod_spec = V1PodSpec(containers=[container], node_selector=node_selector)
         self.pod = V1Pod(metadata=metadata, spec=pod_spec)
+        # Whether the pod was ready when running the last command, in which case
+        # it is not waited for again
+        self.ready = False
 
     def _run_internal(
         self,
@@ -162,7 +165,9 @@ class TestdrivePod(K8sPod, TestdriveBase):
         input: str | None = None,
         suppress_command_error_output: bool = False,
     ) -> None:
-        self.wait(condition="condition=Ready", resource="pod/testdrive")
+        if not self.ready:
+            self.wait(condition="condition=Ready", resource="pod/testdrive")
+            self.ready = True
         try:
             self.kubectl(
                 "exec",
@@ -176,6 +181,9 @@ class TestdrivePod(K8sPod, TestdriveBase):
                 suppress_command_error_output=suppress_command_error_output,
             )
         except subprocess.CalledProcessError as e:
+            # The pod may have been restarted
+            self.ready = False
+
             if e.stdout is not None:
                 print(e.stdout, end="")
             if e.stderr is not None:
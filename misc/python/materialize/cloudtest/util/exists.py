@@ -10,8 +10,12 @@
 
 import subprocess
 
+from kubernetes.client import AppsV1Api, CoreV1Api
+from kubernetes.client.rest import ApiException
+
 from materialize import ui
-from materialize.cloudtest import DEFAULT_K8S_CONTEXT_NAME
+from materialize.cloudtest import DEFAULT_K8S_CONTEXT_NAME, DEFAULT_K8S_NAMESPACE
+from materialize.cloudtest.util.informer import KINDS, api_client
 from materialize.ui import UIError
 
 
@@ -33,6 +37,51 @@ def not_exists(
 
 def _exists(
     resource: str, should_exist: bool, context: str, namespace: str | None
+) -> None:
+    kind, _, name = resource.partition("/")
+    if kind in KINDS and name:
+        _exists_with_api(
+            KINDS[kind], name, should_exist, context, namespace or DEFAULT_K8S_NAMESPACE
+        )
+    else:
+        _exists_with_kubectl(resource, should_exist, context, namespace)
+
+
+def _exists_with_api(
+    kind: str, name: str, should_exist: bool, context: str, namespace: str
+) -> None:
+    core_v1_api = CoreV1Api(api_client(context))
+    apps_v1_api = AppsV1Api(api_client(context))
+    read_function = {
+        "pod": core_v1_api.read_namespaced_pod,
+        "secret": core_v1_api.read_namespaced_secret,
+        "service": core_v1_api.read_namespaced_service,
+        "statefulset": apps_v1_api.read_namespaced_stateful_set,
+        "deployment": apps_v1_api.read_namespaced_deployment,
+    }[kind]
+
+    ui.progress(f"looking up {kind}/{name} ... ")
+
+    try:
+        read_function(name=name, namespace=namespace)
+    except ApiException as e:
+        if e.status == 404:
+            if should_exist:
+                ui.progress("error!", finish=True)
+                raise UIError(f"{kind}/{name} does not exist, but expected it to")
+            ui.progress("success!", finish=True)
+            return
+        ui.progress(finish=True)
+        raise UIError(f"looking up {kind}/{name} failed: {e}")
+
+    if should_exist:
+        ui.progress("success!", finish=True)
+    else:
+        raise UIError(f"{kind}/{name} exists, but expected it not to")
+
+
+def _exists_with_kubectl(
+    resource: str, should_exist: bool, context: str, namespace: str | None
 ) -> None:
     cmd = ["kubectl", "get", "--output", "name", resource, "--context", context]
 
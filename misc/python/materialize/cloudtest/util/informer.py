@@ -0,0 +1,160 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""
+An in-memory cache of Kubernetes objects that is kept up to date by a watch stream, shared by everything that waits
+for or looks up these objects, so that waiting for a condition neither polls nor spawns kubectl.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from kubernetes import watch
+from kubernetes.client import ApiClient, AppsV1Api, CoreV1Api
+from kubernetes.config import new_client_from_config  # type: ignore
+from kubernetes.config.kube_config import (  # type: ignore
+    ENV_KUBECONFIG_PATH_SEPARATOR,
+    KUBE_CONFIG_DEFAULT_LOCATION,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# The names kubectl accepts for the kinds that can be watched, mapped to their canonical name
+KINDS = {
+    **{name: "pod" for name in ["po", "pod", "pods"]},
+    **{name: "secret" for name in ["secret", "secrets"]},
+    **{name: "service" for name in ["svc", "service", "services"]},
+    **{
+        name: "statefulset"
+        for name in ["sts", "statefulset", "statefulsets", "statefulset.apps"]
+    },
+    **{
+        name: "deployment"
+        for name in ["deploy", "deployment", "deployments", "deployment.apps"]
+    },
+}
+
+# Wait before watching again after the watch failed, e.g. because the cluster is not reachable yet
+RETRY_INTERVAL_SECS = 1
+
+_informers: dict[tuple[str, str, str], "Informer"] = {}
+_informers_lock = threading.Lock()
+
+
+def api_client(context: str) -> ApiClient:
+    """
+    The API client of a context, shared across threads to avoid loading the kube config for every request.
+
+    The client is recreated once the kube config changes, e.g. because the kind cluster was recreated.
+    """
+    return _api_client(context, _kube_config_digest())
+
+
+@cache
+def _api_client(context: str, kube_config_digest: str) -> ApiClient:
+    return new_client_from_config(context=context)
+
+
+def _kube_config_digest() -> str:
+    digest = hashlib.sha1()
+    for path in KUBE_CONFIG_DEFAULT_LOCATION.split(ENV_KUBECONFIG_PATH_SEPARATOR):
+        try:
+            digest.update(Path(path).expanduser().read_bytes())
+        except FileNotFoundError:
+            pass
+    return digest.hexdigest()
+
+
+def get_informer(context: str, namespace: str, kind: str) -> "Informer":
+    """
+    :param kind: a kind of `KINDS`
+    :return: the informer of the kind in the namespace, which is started on first use
+    """
+    key = (context, namespace, KINDS[kind])
+    with _informers_lock:
+        if key not in _informers:
+            _informers[key] = Informer(*key)
+        return _informers[key]
+
+
+class Informer:
+    def __init__(self, context: str, namespace: str, kind: str):
+        self.context = context
+        self.namespace = namespace
+        self.kind = kind
+        self.objects: dict[str, Any] = {}
+        self.synced = False
+        self.changed = threading.Condition()
+        self.thread = threading.Thread(
+            target=self._run,
+            name=f"informer-{kind}-{namespace}",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def wait_until(
+        self, predicate: Callable[[dict[str, Any]], bool], timeout_secs: float
+    ) -> bool:
+        """
+        :param predicate: is evaluated with the objects by name whenever they change
+        :return: whether the predicate was satisfied before the timeout
+        """
+        deadline = time.monotonic() + timeout_secs
+        with self.changed:
+            while not (self.synced and predicate(self.objects)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.changed.wait(remaining)
+            return True
+
+    def _list_function(self) -> Callable[..., Any]:
+        core_v1_api = CoreV1Api(api_client(self.context))
+        apps_v1_api = AppsV1Api(api_client(self.context))
+        return {
+            "pod": core_v1_api.list_namespaced_pod,
+            "secret": core_v1_api.list_namespaced_secret,
+            "service": core_v1_api.list_namespaced_service,
+            "statefulset": apps_v1_api.list_namespaced_stateful_set,
+            "deployment": apps_v1_api.list_namespaced_deployment,
+        }[self.kind]
+
+    def _run(self) -> None:
+        while True:
+            try:
+                list_function = self._list_function()
+                result = list_function(namespace=self.namespace)
+                with self.changed:
+                    self.objects = {item.metadata.name: item for item in result.items}
+                    self.synced = True
+                    self.changed.notify_all()
+
+                # The stream resumes from the last seen version by itself, and raises if that version has expired,
+                # after which the objects are listed again
+                for event in watch.Watch().stream(
+                    list_function,
+                    namespace=self.namespace,
+                    resource_version=result.metadata.resource_version,
+                ):
+                    item = event["object"]
+                    with self.changed:
+                        if event["type"] == "DELETED":
+                            self.objects.pop(item.metadata.name, None)
+                        else:
+                            self.objects[item.metadata.name] = item
+                        self.changed.notify_all()
+            except Exception as e:
+                LOGGER.info(f"Watching {self.kind} in {self.namespace} failed: {e}")
+                time.sleep(RETRY_INTERVAL_SECS)
@@ -7,16 +7,25 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import json
 import logging
+import re
 import subprocess
+from collections.abc import Callable
+from typing import Any
 
 from materialize import ui
-from materialize.cloudtest import DEFAULT_K8S_CONTEXT_NAME
+from materialize.cloudtest import DEFAULT_K8S_CONTEXT_NAME, DEFAULT_K8S_NAMESPACE
+from materialize.cloudtest.util.informer import KINDS, api_client, get_informer
 from materialize.cloudtest.util.print_pods import print_pods
 from materialize.ui import UIError
 
 LOGGER = logging.getLogger(__name__)
 
+# A path like {.status.containerStatuses[0].state.terminated.reason}
+JSONPATH_PATTERN = re.compile(r"^\{((?:\.[A-Za-z0-9_-]+|\[\d+\])+)\}=(.*)$")
+JSONPATH_SEGMENT_PATTERN = re.compile(r"\.([A-Za-z0-9_-]+)|\[(\d+)\]")
+
 
 def wait(
     condition: str,
@@ -27,6 +36,151 @@ def wait(
     label: str | None = None,
     namespace: str | None = None,
     server: str | None = None,
+) -> None:
+    """
+    Wait for a condition like `kubectl wait` does. Conditions on pods, secrets, services, stateful sets and
+    deployments are evaluated against a shared cache of these objects that is kept up to date by a watch stream,
+    other conditions are delegated to `kubectl wait`.
+    """
+    predicate = (
+        _objects_predicate(condition, resource, label, context)
+        if server is None
+        else None
+    )
+
+    if predicate is None:
+        _wait_with_kubectl(
+            condition,
+            resource,
+            timeout_secs,
+            context,
+            label=label,
+            namespace=namespace,
+            server=server,
+        )
+        return
+
+    kind = resource.split("/", 1)[0]
+    informer = get_informer(context, namespace or DEFAULT_K8S_NAMESPACE, kind)
+    description = f"{condition} of {resource}" + (
+        f" with {label}" if label is not None else ""
+    )
+    ui.progress(f"waiting for {description} ... ")
+
+    if informer.wait_until(predicate, timeout_secs):
+        ui.progress("success!", finish=True)
+        return
+
+    ui.progress(finish=True)
+    print_pods()
+    raise UIError(f"timed out waiting for {description}")
+
+
+def _objects_predicate(
+    condition: str, resource: str, label: str | None, context: str
+) -> Callable[[dict[str, Any]], bool] | None:
+    """
+    :return: a predicate on the cached objects by name that tells whether the condition is met, or None if the
+             condition or resource is not supported
+    """
+    kind, _, name = resource.partition("/")
+    if kind not in KINDS:
+        return None
+
+    labels = _parse_label_selector(label) if label is not None else {}
+    if labels is None:
+        return None
+
+    def matching(objects: dict[str, Any]) -> list[Any]:
+        if name:
+            candidates = [objects[name]] if name in objects else []
+        else:
+            candidates = list(objects.values())
+        return [
+            item
+            for item in candidates
+            if all(
+                (item.metadata.labels or {}).get(key) == value
+                for key, value in labels.items()
+            )
+        ]
+
+    if condition == "delete":
+        return lambda objects: len(matching(objects)) == 0
+
+    object_condition = _object_predicate(condition, context)
+    if object_condition is None:
+        return None
+
+    # Like kubectl, wait for at least one matching object to exist
+    return lambda objects: (
+        len(items := matching(objects)) > 0 and all(map(object_condition, items))
+    )
+
+
+def _object_predicate(condition: str, context: str) -> Callable[[Any], bool] | None:
+    if condition.startswith("condition="):
+        condition_type, _, status = condition.removeprefix("condition=").partition("=")
+        status = status or "True"
+
+        def has_condition(item: Any) -> bool:
+            return any(
+                c.type.lower() == condition_type.lower()
+                and c.status.lower() == status.lower()
+                for c in (item.status.conditions or [])
+            )
+
+        return has_condition
+
+    if condition.startswith("jsonpath="):
+        match = JSONPATH_PATTERN.match(condition.removeprefix("jsonpath="))
+        if match is None:
+            return None
+        segments = JSONPATH_SEGMENT_PATTERN.findall(match.group(1))
+        expected_value = match.group(2)
+
+        def has_value(item: Any) -> bool:
+            # The objects are serialized to get the field names of the API rather than the python ones
+            value = api_client(context).sanitize_for_serialization(item)
+            for key, index in segments:
+                try:
+                    value = value[key] if key else value[int(index)]
+                except (KeyError, IndexError, TypeError):
+                    return False
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            return value == expected_value
+
+        return has_value
+
+    return None
+
+
+def _parse_label_selector(label: str) -> dict[str, str] | None:
+    """
+    >>> _parse_label_selector("cluster.environmentd.materialize.cloud/cluster-id=u1,app==environmentd")
+    {'cluster.environmentd.materialize.cloud/cluster-id': 'u1', 'app': 'environmentd'}
+    >>> _parse_label_selector("app!=environmentd") is None
+    True
+    """
+    labels = {}
+    for requirement in label.split(","):
+        key, _, value = requirement.replace("==", "=").partition("=")
+        if not value or "!" in key or " " in requirement:
+            return None
+        labels[key] = value
+    return labels
+
+
+def _wait_with_kubectl(
+    condition: str,
+    resource: str,
+    timeout_secs: int,
+    context: str,
+    *,
+    label: str | None,
+    namespace: str | None,
+    server: str | None,
 ) -> None:
     cmd = [
         "kubectl",
@@ -14,6 +14,7 @@ import uuid
 from enum import Enum
 from typing import Any
 
+import numpy as np
 from pg8000.native import literal
 
 from materialize.util import all_subclasses
@@ -46,11 +47,26 @@ class DataType:
         """Generate a random value, should be possible for all types."""
         raise NotImplementedError
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        """Generate `count` random values at once. Types override this to generate the whole batch vectorized."""
+        return [cls.random_value(rng, record_size) for _ in range(count)]
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         """Generate a value that corresponds to `num`, so that it will always be the same value for the same input `num`, but fits into the type. This doesn't make sense for a type like boolean."""
         raise NotImplementedError
 
+    @classmethod
+    def numeric_values(cls, nums: range) -> list[Any]:
+        """Generate the values corresponding to each of `nums`."""
+        return [cls.numeric_value(num) for num in nums]
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         raise NotImplementedError
@@ -65,6 +81,15 @@ class Boolean(DataType):
     ) -> Any:
         return rng.choice((True, False))
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _numpy_rng(rng).integers(0, 2, size=count).astype(bool).tolist()
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         return "boolean"
@@ -72,24 +97,36 @@ class Boolean(DataType):
 
 class SmallInt(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = -127, 128
+            return -127, 128
         elif record_size in (RecordSize.SMALL, RecordSize.MEDIUM, RecordSize.LARGE):
-            min, max = -32768, 32767
+            return -32768, 32767
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = SmallInt._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -106,26 +143,38 @@ class SmallInt(DataType):
 
 class Int(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = -127, 128
+            return -127, 128
         elif record_size == RecordSize.SMALL:
-            min, max = -32768, 32767
+            return -32768, 32767
         elif record_size in (RecordSize.MEDIUM, RecordSize.LARGE):
-            min, max = -2147483648, 2147483647
+            return -2147483648, 2147483647
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = Int._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -140,28 +189,40 @@ class Int(DataType):
 
 class Long(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = -127, 128
+            return -127, 128
         elif record_size == RecordSize.SMALL:
-            min, max = -32768, 32767
+            return -32768, 32767
         elif record_size == RecordSize.MEDIUM:
-            min, max = -2147483648, 2147483647
+            return -2147483648, 2147483647
         elif record_size == RecordSize.LARGE:
-            min, max = -9223372036854775808, 9223372036854775807
+            return -9223372036854775808, 9223372036854775807
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = Long._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -178,24 +239,36 @@ class Long(DataType):
 
 class UInt2(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = 0, 256
+            return 0, 256
         elif record_size in (RecordSize.SMALL, RecordSize.MEDIUM, RecordSize.LARGE):
-            min, max = 0, 65535
+            return 0, 65535
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = UInt2._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -216,26 +289,38 @@ class UInt2(DataType):
 
 class UInt4(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = 0, 256
+            return 0, 256
         elif record_size == RecordSize.SMALL:
-            min, max = 0, 65535
+            return 0, 65535
         elif record_size in (RecordSize.MEDIUM, RecordSize.LARGE):
-            min, max = 0, 4294967295
+            return 0, 4294967295
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = UInt4._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -256,28 +341,40 @@ class UInt4(DataType):
 
 class UInt8(DataType):
     @staticmethod
-    def random_value(
-        rng: random.Random,
-        record_size: RecordSize = RecordSize.LARGE,
-        in_query: bool = False,
-    ) -> Any:
+    def _range(record_size: RecordSize) -> tuple[int, int]:
         if record_size == RecordSize.TINY:
-            min, max = 0, 256
+            return 0, 256
         elif record_size == RecordSize.SMALL:
-            min, max = 0, 65535
+            return 0, 65535
         elif record_size == RecordSize.MEDIUM:
-            min, max = 0, 4294967295
+            return 0, 4294967295
         elif record_size == RecordSize.LARGE:
-            min, max = 0, 18446744073709551615
+            return 0, 18446744073709551615
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @staticmethod
+    def random_value(
+        rng: random.Random,
+        record_size: RecordSize = RecordSize.LARGE,
+        in_query: bool = False,
+    ) -> Any:
+        min, max = UInt8._range(record_size)
         if rng.randrange(10) == 0:
             return min
         if rng.randrange(10) == 0:
             return max
         return rng.randint(min, max)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _random_ints(rng, count, *cls._range(record_size))
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -319,6 +416,31 @@ class Float(DataType):
         else:
             raise ValueError(f"Unexpected record size {record_size}")
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        np_rng = _numpy_rng(rng)
+        if record_size == RecordSize.TINY:
+            values = np_rng.random(count)
+        elif record_size == RecordSize.SMALL:
+            values = np_rng.uniform(-100, 100, count)
+        elif record_size == RecordSize.MEDIUM:
+            values = np_rng.uniform(-1_000_000, 1_000_000, count)
+        elif record_size == RecordSize.LARGE:
+            values = np_rng.uniform(-1_000_000_000, 1_000_000_000_00, count)
+        else:
+            raise ValueError(f"Unexpected record size {record_size}")
+
+        # Same distribution of special values as in random_value()
+        special = np_rng.random(count)
+        values[special < 0.1] = 1.0
+        values[(special >= 0.1) & (special < 0.19)] = 0.0
+        return values.tolist()
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         return num
@@ -400,6 +522,33 @@ class Text(DataType):
 
         return literal(str(result)) if in_query else str(result)
 
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        np_rng = _numpy_rng(rng)
+        if record_size == RecordSize.TINY:
+            return np_rng.choice(["foo", "bar", "baz"], size=count).tolist()
+        elif record_size == RecordSize.SMALL:
+            length = 3
+        elif record_size == RecordSize.MEDIUM:
+            length = 10
+        elif record_size == RecordSize.LARGE:
+            length = 100
+        else:
+            raise ValueError(f"Unexpected record size {record_size}")
+
+        # Pick all characters at once and reinterpret each row of them as one
+        # fixed-size byte string.
+        chars = np.frombuffer(
+            (string.ascii_letters + string.digits).encode(), dtype="S1"
+        )
+        strings = chars[np_rng.integers(0, len(chars), size=(count, length))]
+        return [value.decode() for value in strings.view(f"S{length}").ravel()]
+
     @staticmethod
     def numeric_value(num: int, in_query: bool = False) -> Any:
         result = f"key{num}"
@@ -425,6 +574,15 @@ class Bytea(Text):
 
 
 class UUID(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def random_value(
         rng: random.Random,
@@ -453,6 +611,15 @@ class UUID(DataType):
 
 
 class Jsonb(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         if backend == Backend.AVRO:
@@ -488,6 +655,15 @@ class Jsonb(DataType):
 
 
 class TextTextMap(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         if backend == Backend.AVRO:
@@ -531,6 +707,15 @@ class TextTextMap(DataType):
 
 
 class IntArray(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         if backend == Backend.AVRO:
@@ -568,6 +753,15 @@ class IntArray(DataType):
 
 
 class IntList(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def name(backend: Backend = Backend.MATERIALIZE) -> str:
         if backend == Backend.AVRO:
@@ -605,6 +799,15 @@ class IntList(DataType):
 
 
 class Timestamp(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def random_value(
         rng: random.Random,
@@ -636,6 +839,15 @@ class Timestamp(DataType):
 
 
 class Date(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def random_value(
         rng: random.Random,
@@ -667,6 +879,15 @@ class Date(DataType):
 
 
 class Time(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def random_value(
         rng: random.Random,
@@ -698,6 +919,15 @@ class Time(DataType):
 
 
 class Interval(DataType):
+    @classmethod
+    def random_values(
+        cls,
+        rng: random.Random,
+        count: int,
+        record_size: RecordSize = RecordSize.LARGE,
+    ) -> list[Any]:
+        return _pooled_random_values(cls, rng, count, record_size)
+
     @staticmethod
     def random_value(
         rng: random.Random,
@@ -745,6 +975,45 @@ class Oid(Int):
             return "oid"
 
 
+def _numpy_rng(rng: random.Random) -> np.random.Generator:
+    """Derive a NumPy generator from `rng`, so that batches of values are
+    reproducible with a specific seed, just like single values."""
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def _random_ints(rng: random.Random, count: int, min: int, max: int) -> list[int]:
+    np_rng = _numpy_rng(rng)
+    values = np_rng.integers(
+        min, max, size=count, endpoint=True, dtype=np.uint64 if min >= 0 else np.int64
+    )
+    # Same distribution of boundary values as in random_value()
+    special = np_rng.random(count)
+    values[special < 0.1] = min
+    values[(special >= 0.1) & (special < 0.19)] = max
+    return values.tolist()
+
+
+# Number of values to pre-generate per type and record size for types whose
+# values are too complex to generate vectorized.
+POOL_SIZE = 10_000
+
+_pools: dict[tuple[type[DataType], RecordSize], list[Any]] = {}
+
+
+def _pooled_random_values(
+    data_type: type[DataType],
+    rng: random.Random,
+    count: int,
+    record_size: RecordSize,
+) -> list[Any]:
+    """Pick `count` values from a pool of random values of the type."""
+    pool = _pools.get((data_type, record_size))
+    if pool is None:
+        pool = [data_type.random_value(rng, record_size) for _ in range(POOL_SIZE)]
+        _pools[(data_type, record_size)] = pool
+    return [pool[i] for i in _numpy_rng(rng).integers(0, len(pool), count).tolist()]
+
+
 # Sort to keep determinism for reproducible runs with specific seed
 DATA_TYPES = sorted(list(all_subclasses(DataType)), key=repr)
 
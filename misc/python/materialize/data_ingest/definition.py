@@ -10,6 +10,7 @@
 import random
 from collections.abc import Iterator
 from enum import Enum
+from typing import Any
 
 from materialize.data_ingest.data_type import RecordSize
 from materialize.data_ingest.field import Field
@@ -39,6 +40,24 @@ class Target(Enum):
     PRINT = 3
 
 
+# Number of rows whose values are generated at once, column by column. The rows
+# are still yielded one by one, so transactions keep their size.
+BATCH_SIZE = 1_000
+
+
+def batch_sizes(count: int) -> Iterator[int]:
+    """Split `count` rows into batches of at most BATCH_SIZE rows."""
+    for start in range(0, count, BATCH_SIZE):
+        yield min(BATCH_SIZE, count - start)
+
+
+def transpose(columns: list[list[Any]], batch_size: int) -> Iterator[list[Any]]:
+    """Turn the columns of a batch into its rows."""
+    if not columns:
+        return iter([[]] * batch_size)
+    return (list(values) for values in zip(*columns))
+
+
 class Definition:
     def generate(self, fields: list[Field]) -> Iterator[RowList]:
         raise NotImplementedError
@@ -63,29 +82,32 @@ class Insert(Definition):
                 f'Unexpected count {self.count}, doesn\'t make sense to generate "ALL" values'
             )
 
-        for i in range(self.count):
-            if self.current_key >= self.count:
-                break
-
-            values = [
+        while self.current_key < self.count:
+            batch_size = min(BATCH_SIZE, self.count - self.current_key)
+            columns = [
                 (
-                    field.data_type.numeric_value(self.current_key)
+                    field.data_type.numeric_values(
+                        range(self.current_key, self.current_key + batch_size)
+                    )
                     if field.is_key
-                    else field.data_type.random_value(rng, self.record_size)
+                    else field.data_type.random_values(
+                        rng, batch_size, self.record_size
+                    )
                 )
                 for field in fields
             ]
-            self.current_key += 1
-
-            yield RowList(
-                [
-                    Row(
-                        fields=fields,
-                        values=values,
-                        operation=Operation.INSERT,
-                    )
-                ]
-            )
+            for values in transpose(columns, batch_size):
+                self.current_key += 1
+
+                yield RowList(
+                    [
+                        Row(
+                            fields=fields,
+                            values=values,
+                            operation=Operation.INSERT,
+                        )
+                    ]
+                )
 
 
 class Upsert(Definition):
@@ -100,25 +122,27 @@ class Upsert(Definition):
                 f'Unexpected count {self.count}, doesn\'t make sense to generate "ALL" values'
             )
 
-        for i in range(self.count):
-            values = [
+        for batch_size in batch_sizes(self.count):
+            columns = [
                 (
-                    field.data_type.numeric_value(0)
+                    [field.data_type.numeric_value(0)] * batch_size
                     if field.is_key
-                    else field.data_type.random_value(rng, self.record_size)
+                    else field.data_type.random_values(
+                        rng, batch_size, self.record_size
+                    )
                 )
                 for field in fields
             ]
-
-            yield RowList(
-                [
-                    Row(
-                        fields=fields,
-                        values=values,
-                        operation=Operation.UPSERT,
-                    )
-                ]
-            )
+            for values in transpose(columns, batch_size):
+                yield RowList(
+                    [
+                        Row(
+                            fields=fields,
+                            values=values,
+                            operation=Operation.UPSERT,
+                        )
+                    ]
+                )
 
 
 class Delete(Definition):
@@ -142,19 +166,24 @@ class Delete(Definition):
             ]
             yield RowList([Row(fields, values, Operation.DELETE)])
         elif self.number_of_records in (Records.SOME, Records.MANY):
-            for i in range(self.number_of_records.value):
-                values = [
-                    field.data_type.random_value(rng, self.record_size)
+            for batch_size in batch_sizes(self.number_of_records.value):
+                columns = [
+                    field.data_type.random_values(rng, batch_size, self.record_size)
                     for field in fields
                     if field.is_key
                 ]
-                yield RowList([Row(fields, values, Operation.DELETE)])
+                for values in transpose(columns, batch_size):
+                    yield RowList([Row(fields, values, Operation.DELETE)])
         elif self.number_of_records == Records.ALL:
             assert self.num is not None
-            for i in range(self.num):
-                values = [
-                    field.data_type.numeric_value(i) for field in fields if field.is_key
+            for start in range(0, self.num, BATCH_SIZE):
+                keys = range(start, min(start + BATCH_SIZE, self.num))
+                columns = [
+                    field.data_type.numeric_values(keys)
+                    for field in fields
+                    if field.is_key
                 ]
-                yield RowList([Row(fields, values, Operation.DELETE)])
+                for values in transpose(columns, len(keys)):
+                    yield RowList([Row(fields, values, Operation.DELETE)])
         else:
             raise ValueError(f"Unexpected number of records {self.number_of_records}")
@@ -7,9 +7,11 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import itertools
 import json
 import random
 import time
+from collections.abc import Iterator
 from typing import Any
 
 import confluent_kafka  # type: ignore
@@ -29,7 +31,7 @@ from psycopg.errors import OperationalError
 from materialize.data_ingest.data_type import Backend
 from materialize.data_ingest.field import Field, formatted_value
 from materialize.data_ingest.query_error import QueryError
-from materialize.data_ingest.row import Operation
+from materialize.data_ingest.row import Operation, Row
 from materialize.data_ingest.transaction import Transaction
 from materialize.mzcompose.services.mysql import MySql
 
@@ -137,6 +139,47 @@ class PrintExecutor(Executor):
         print("  ", transaction.row_lists)
 
 
+# Upper bounds for the rows and the size in bytes of a single batched statement,
+# to stay well within MySQL's max_allowed_packet.
+MAX_BATCH_ROWS = 1000
+MAX_BATCH_BYTES = 1024 * 1024
+
+
+def operation_batches(
+    transaction: Transaction,
+) -> Iterator[tuple[Operation, list[Row]]]:
+    """Group the rows of a transaction into runs of the same operation. The
+    runs can be applied in bulk without changing the outcome, since they
+    retain the order of the operations."""
+    rows = (row for row_list in transaction.row_lists for row in row_list.rows)
+    for operation, batch in itertools.groupby(rows, lambda row: row.operation):
+        yield operation, list(batch)
+
+
+def key_values(row: Row) -> list[Any]:
+    return [value for field, value in zip(row.fields, row.values) if field.is_key]
+
+
+def values_batches(rows: list[Row], keys_only: bool = False) -> Iterator[str]:
+    """Format the rows as the tuples of multi-row VALUES lists, split into
+    batches of bounded size."""
+    batch: list[str] = []
+    batch_bytes = 0
+    for row in rows:
+        values = key_values(row) if keys_only else row.values
+        row_str = f"({', '.join(str(formatted_value(value)) for value in values)})"
+        if batch and (
+            len(batch) >= MAX_BATCH_ROWS or batch_bytes + len(row_str) > MAX_BATCH_BYTES
+        ):
+            yield ", ".join(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(row_str)
+        batch_bytes += len(row_str) + 2
+    if batch:
+        yield ", ".join(batch)
+
+
 def delivery_report(err: str, msg: Any) -> None:
     assert err is None, f"Delivery failed for User record {msg.key()}: {err}"
 
@@ -383,57 +426,51 @@ class MySqlExecutor(Executor):
     def run(self, transaction: Transaction, logging_exe: Any | None = None) -> None:
         self.logging_exe = logging_exe
         with self.mysql_conn.cursor() as cur:
-            for row_list in transaction.row_lists:
-                for row in row_list.rows:
-                    if row.operation == Operation.INSERT:
-                        values_str = ", ".join(
-                            str(formatted_value(value)) for value in row.values
-                        )
+            for operation, rows in operation_batches(transaction):
+                if operation == Operation.INSERT:
+                    for values_str in values_batches(rows):
                         self.execute(
                             cur,
                             f"""INSERT INTO `{self.table}`
-                                VALUES ({values_str})
+                                VALUES {values_str}
                             """,
                         )
-                    elif row.operation == Operation.UPSERT:
-                        values_str = ", ".join(
-                            str(formatted_value(value)) for value in row.values
-                        )
-                        ", ".join(
-                            f"`{field.name}`" for field in row.fields if field.is_key
-                        )
-                        update_str = ", ".join(
-                            f"`{field.name}` = VALUES(`{field.name}`)"
-                            for field in row.fields
-                        )
+                elif operation == Operation.UPSERT:
+                    update_str = ", ".join(
+                        f"`{field.name}` = VALUES(`{field.name}`)"
+                        for field in self.fields
+                    )
+                    # MySQL applies the rows in order, so the last one wins
+                    # for duplicate keys, as with one statement per row.
+                    for values_str in values_batches(rows):
                         self.execute(
                             cur,
                             f"""INSERT INTO `{self.table}`
-                                VALUES ({values_str})
+                                VALUES {values_str}
                                 ON DUPLICATE KEY
                                 UPDATE {update_str}
                             """,
                         )
-                    elif row.operation == Operation.DELETE:
-                        cond_str = " AND ".join(
-                            f"`{field.name}` = {formatted_value(value)}"
-                            for field, value in zip(row.fields, row.values)
-                            if field.is_key
-                        )
+                elif operation == Operation.DELETE:
+                    keys_str = ", ".join(
+                        f"`{field.name}`" for field in self.fields if field.is_key
+                    )
+                    for values_str in values_batches(rows, keys_only=True):
                         self.execute(
                             cur,
                             f"""DELETE FROM `{self.table}`
-                                WHERE {cond_str}
+                                WHERE ({keys_str}) IN ({values_str})
                             """,
                         )
-                    else:
-                        raise ValueError(f"Unexpected operation {row.operation}")
+                else:
+                    raise ValueError(f"Unexpected operation {operation}")
         self.mysql_conn.commit()
 
 
 class PgExecutor(Executor):
     pg_conn: psycopg.Connection
     table: str
+    staging_table: str
     source: str
     num: int
 
@@ -449,6 +486,8 @@ class PgExecutor(Executor):
     ):
         super().__init__(ports, fields, database, schema, cluster, mz_service)
         self.table = f"table{num}"
+        # Session-local table to bulk load the rows of upserts and deletes into
+        self.staging_table = f"table{num}_staging"
         self.source = f"postgres_source{num}"
         self.num = num
 
@@ -479,7 +518,9 @@ class PgExecutor(Executor):
                     CREATE USER postgres{self.num} WITH SUPERUSER PASSWORD 'postgres';
                     ALTER USER postgres{self.num} WITH replication;
                     DROP PUBLICATION IF EXISTS {self.source};
-                    CREATE PUBLICATION {self.source} FOR ALL TABLES;""",
+                    CREATE PUBLICATION {self.source} FOR ALL TABLES;
+                    CREATE TEMPORARY TABLE {identifier(self.staging_table)}
+                        (LIKE {identifier(self.table)});""",
             )
         self.pg_conn.autocommit = False
 
@@ -509,56 +550,78 @@ class PgExecutor(Executor):
 
     def run(self, transaction: Transaction, logging_exe: Any | None = None) -> None:
         self.logging_exe = logging_exe
+        columns = [field.name for field in self.fields]
+        keys = [field.name for field in self.fields if field.is_key]
+        keys_str = ", ".join(identifier(key) for key in keys)
         with self.pg_conn.cursor() as cur:
-            for row_list in transaction.row_lists:
-                for row in row_list.rows:
-                    if row.operation == Operation.INSERT:
-                        values_str = ", ".join(
-                            str(formatted_value(value)) for value in row.values
-                        )
-                        self.execute(
-                            cur,
-                            f"""INSERT INTO {identifier(self.table)}
-                                VALUES ({values_str})
-                            """,
-                        )
-                    elif row.operation == Operation.UPSERT:
-                        values_str = ", ".join(
-                            str(formatted_value(value)) for value in row.values
-                        )
-                        keys_str = ", ".join(
-                            identifier(field.name)
-                            for field in row.fields
-                            if field.is_key
-                        )
-                        update_str = ", ".join(
-                            f"{identifier(field.name)} = EXCLUDED.{identifier(field.name)}"
-                            for field in row.fields
-                        )
-                        self.execute(
-                            cur,
-                            f"""INSERT INTO {identifier(self.table)}
-                                VALUES ({values_str})
-                                ON CONFLICT ({keys_str})
-                                DO UPDATE SET {update_str}
-                            """,
-                        )
-                    elif row.operation == Operation.DELETE:
-                        cond_str = " AND ".join(
-                            f"{identifier(field.name)} = {formatted_value(value)}"
-                            for field, value in zip(row.fields, row.values)
-                            if field.is_key
-                        )
-                        self.execute(
-                            cur,
-                            f"""DELETE FROM {identifier(self.table)}
-                                WHERE {cond_str}
-                            """,
-                        )
-                    else:
-                        raise ValueError(f"Unexpected operation {row.operation}")
+            for operation, rows in operation_batches(transaction):
+                if operation == Operation.INSERT:
+                    self.copy(cur, self.table, columns, [row.values for row in rows])
+                elif operation == Operation.UPSERT:
+                    # A single INSERT ... ON CONFLICT can't update a row twice,
+                    # keep only the last upsert per key, which is the one that
+                    # would have won with one statement per row.
+                    last_per_key = {tuple(key_values(row)): row.values for row in rows}
+                    self.copy(
+                        cur, self.staging_table, columns, list(last_per_key.values())
+                    )
+                    update_str = ", ".join(
+                        f"{identifier(column)} = EXCLUDED.{identifier(column)}"
+                        for column in columns
+                    )
+                    self.execute(
+                        cur,
+                        f"""INSERT INTO {identifier(self.table)}
+                            SELECT * FROM {identifier(self.staging_table)}
+                            ON CONFLICT ({keys_str})
+                            DO UPDATE SET {update_str};
+                            TRUNCATE {identifier(self.staging_table)}
+                        """,
+                    )
+                elif operation == Operation.DELETE:
+                    self.copy(
+                        cur,
+                        self.staging_table,
+                        keys,
+                        [key_values(row) for row in rows],
+                    )
+                    cond_str = " AND ".join(
+                        f"t.{identifier(key)} = s.{identifier(key)}" for key in keys
+                    )
+                    self.execute(
+                        cur,
+                        f"""DELETE FROM {identifier(self.table)} AS t
+                            USING {identifier(self.staging_table)} AS s
+                            WHERE {cond_str};
+                            TRUNCATE {identifier(self.staging_table)}
+                        """,
+                    )
+                else:
+                    raise ValueError(f"Unexpected operation {operation}")
         self.pg_conn.commit()
 
+    def copy(
+        self,
+        cur: psycopg.Cursor,
+        table: str,
+        columns: list[str],
+        rows: list[list[Any]],
+    ) -> None:
+        """Bulk load the rows into the table using `COPY ... FROM STDIN`."""
+        query = f"COPY {identifier(table)} ({', '.join(identifier(column) for column in columns)}) FROM STDIN"
+        if self.logging_exe is not None:
+            self.logging_exe.log(f"{query} -- {len(rows)} rows")
+
+        try:
+            with cur.copy(query.encode()) as copy:
+                for values in rows:
+                    # Pass the same text representation that formatted_value()
+                    # uses, so that Postgres parses the values the same way.
+                    copy.write_row([str(value) for value in values])
+        except Exception as e:
+            print(f"Query failed: {query} {e}")
+            raise QueryError(str(e), query)
+
 
 class KafkaRoundtripExecutor(Executor):
     table: str
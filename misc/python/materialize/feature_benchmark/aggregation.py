@@ -44,6 +44,14 @@ class Aggregation:
     def func(self) -> Callable:
         raise NotImplementedError
 
+    @classmethod
+    def comparison_statistic(cls) -> Callable:
+        """A numpy function that can be applied along an axis, which the
+        sequential comparison bootstraps to decide whether THIS and OTHER
+        differ. It must be smooth in the measurements, so it can differ from
+        the aggregation itself."""
+        raise NotImplementedError
+
     def name(self) -> str:
         return self.__class__.__name__
 
@@ -52,11 +60,21 @@ class MinAggregation(Aggregation):
     def func(self) -> Callable:
         return min
 
+    @classmethod
+    def comparison_statistic(cls) -> Callable:
+        # Resampling a few measurements mostly reproduces their minimum, so its
+        # bootstrap interval is far too narrow. Compare their median instead.
+        return np.median
+
 
 class MeanAggregation(Aggregation):
     def func(self) -> Callable:
         return np.mean
 
+    @classmethod
+    def comparison_statistic(cls) -> Callable:
+        return np.mean
+
 
 class StdDevAggregation(Aggregation):
     def __init__(self, num_stdevs: float) -> None:
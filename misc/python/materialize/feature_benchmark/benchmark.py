@@ -8,6 +8,7 @@
 # by the Apache License, Version 2.0.
 
 import time
+from contextlib import ExitStack
 
 from materialize.feature_benchmark.aggregation import Aggregation
 from materialize.feature_benchmark.executor import Executor
@@ -22,6 +23,7 @@ from materialize.feature_benchmark.measurement_source import MeasurementSource
 from materialize.feature_benchmark.scenario import Scenario
 from materialize.feature_benchmark.termination import TerminationCondition
 from materialize.mz_version import MzVersion
+from materialize.mzcompose.cgroup import MemorySampler
 
 
 class Benchmark:
@@ -38,6 +40,8 @@ class Benchmark:
         seed: int,
         scale: str | None = None,
         measure_memory: bool = True,
+        shared_services: bool = True,
+        memory_sampling_interval: float | None = None,
     ) -> None:
         self._scale = scale
         self._mz_id = mz_id
@@ -49,6 +53,12 @@ class Benchmark:
         self._performance_aggregation = aggregation_class()
         self._default_size = default_size
         self._seed = seed
+        # Whether all Mzs under measurement use the same auxiliary services,
+        # such as Kafka, so that the shared() section only needs to run once.
+        self._shared_services = shared_services
+        # If set, sample the memory usage during the benchmark() section and
+        # report its peak, instead of taking a single sample afterwards.
+        self._memory_sampling_interval = memory_sampling_interval
 
         if measure_memory:
             self._memory_mz_aggregation = aggregation_class()
@@ -74,12 +84,22 @@ class Benchmark:
         )
 
     def run(self) -> list[Aggregation]:
+        scenario = self.setup()
+
+        i = 0
+        while not self.run_iteration(scenario, i):
+            i = i + 1
+
+        return self.finish(scenario)
+
+    def setup(self) -> Scenario:
+        """Run the sections of the scenario that precede the measurements."""
         scenario = self.create_scenario_instance()
 
         print(
             f"--- Running scenario {scenario.name()}, scale = {scenario.scale()}, N = {scenario.n()}"
         )
-        start_time = time.time()
+        self._start_time = time.time()
 
         # Run the shared() section once for both Mzs under measurement
         self.run_shared(scenario)
@@ -87,30 +107,32 @@ class Benchmark:
         # Run the init() section once for each Mz
         self.run_init(scenario)
 
-        i = 0
-        while True:
-            # Run the before() section once for each measurement
-            self.run_before(scenario)
+        return scenario
 
-            performance_measurement = self.run_measurement(scenario, i)
+    def run_iteration(self, scenario: Scenario, i: int) -> bool:
+        """Take the i-th measurement and return whether to stop measuring."""
+        # Run the before() section once for each measurement
+        self.run_before(scenario)
 
-            if self.shall_terminate(performance_measurement):
-                duration = time.time() - start_time
-                print(
-                    f"Scenario {scenario.name()}, scale = {scenario.scale()}, N = {scenario.n()} took {duration:.0f}s to run"
-                )
+        performance_measurement = self.run_measurement(scenario, i)
 
-                return [
-                    self._performance_aggregation,
-                    self._memory_mz_aggregation,
-                    self._memory_clusterd_aggregation,
-                ]
+        return self.shall_terminate(performance_measurement)
 
-            i = i + 1
+    def finish(self, scenario: Scenario) -> list[Aggregation]:
+        duration = time.time() - self._start_time
+        print(
+            f"Scenario {scenario.name()}, scale = {scenario.scale()}, N = {scenario.n()} took {duration:.0f}s to run"
+        )
+
+        return [
+            self._performance_aggregation,
+            self._memory_mz_aggregation,
+            self._memory_clusterd_aggregation,
+        ]
 
     def run_shared(self, scenario: Scenario) -> None:
         shared = scenario.shared()
-        if self._mz_id == 0 and shared is not None:
+        if (self._mz_id == 0 or not self._shared_services) and shared is not None:
             print(
                 f"Running the shared() section for scenario {scenario.name()} with {self._mz_version} ..."
             )
@@ -155,12 +177,30 @@ class Benchmark:
         # Collect timestamps from any part of the workload being benchmarked
         timestamps: list[WallclockDuration] = []
         benchmark = scenario.benchmark()
-        for benchmark_item in benchmark if isinstance(benchmark, list) else [benchmark]:
-            assert isinstance(
-                benchmark_item, MeasurementSource
-            ), f"Benchmark item is of type {benchmark_item.__class__} but not a MeasurementSource"
-            item_timestamps = benchmark_item.run(executor=self._executor)
-            timestamps.extend(item_timestamps)
+        samplers: dict[MeasurementType, MemorySampler] = {}
+        with ExitStack() as stack:
+            if self._memory_mz_aggregation and self._memory_sampling_interval:
+                samplers[MeasurementType.MEMORY_MZ] = stack.enter_context(
+                    MemorySampler(
+                        self._executor.DockerMemMz, self._memory_sampling_interval
+                    )
+                )
+            if self._memory_clusterd_aggregation and self._memory_sampling_interval:
+                samplers[MeasurementType.MEMORY_CLUSTERD] = stack.enter_context(
+                    MemorySampler(
+                        self._executor.DockerMemClusterd,
+                        self._memory_sampling_interval,
+                    )
+                )
+
+            for benchmark_item in (
+                benchmark if isinstance(benchmark, list) else [benchmark]
+            ):
+                assert isinstance(
+                    benchmark_item, MeasurementSource
+                ), f"Benchmark item is of type {benchmark_item.__class__} but not a MeasurementSource"
+                item_timestamps = benchmark_item.run(executor=self._executor)
+                timestamps.extend(item_timestamps)
 
         self._validate_measurement_timestamps(scenario.name(), timestamps)
 
@@ -175,12 +215,18 @@ class Benchmark:
 
         if self._memory_mz_aggregation:
             self._collect_memory_measurement(
-                i, MeasurementType.MEMORY_MZ, self._memory_mz_aggregation
+                i,
+                MeasurementType.MEMORY_MZ,
+                self._memory_mz_aggregation,
+                samplers.get(MeasurementType.MEMORY_MZ),
             )
 
         if self._memory_clusterd_aggregation:
             self._collect_memory_measurement(
-                i, MeasurementType.MEMORY_CLUSTERD, self._memory_clusterd_aggregation
+                i,
+                MeasurementType.MEMORY_CLUSTERD,
+                self._memory_clusterd_aggregation,
+                samplers.get(MeasurementType.MEMORY_CLUSTERD),
             )
 
         return performance_measurement
@@ -206,9 +252,17 @@ class Benchmark:
             self._performance_aggregation.append_measurement(performance_measurement)
 
     def _collect_memory_measurement(
-        self, i: int, memory_measurement_type: MeasurementType, aggregation: Aggregation
+        self,
+        i: int,
+        memory_measurement_type: MeasurementType,
+        aggregation: Aggregation,
+        sampler: MemorySampler | None = None,
     ) -> None:
-        if memory_measurement_type == MeasurementType.MEMORY_MZ:
+        notes = None
+        if sampler is not None:
+            value = sampler.peak()
+            notes = f"Time-weighted mean: {sampler.time_weighted_mean() / 2**20:.3f} MB"
+        elif memory_measurement_type == MeasurementType.MEMORY_MZ:
             value = self._executor.DockerMemMz()
         elif memory_measurement_type == MeasurementType.MEMORY_CLUSTERD:
             value = self._executor.DockerMemClusterd()
@@ -218,6 +272,7 @@ class Benchmark:
             type=memory_measurement_type,
             value=value / 2**20,  # Convert to Mb
             unit=MeasurementUnit.MEGABYTE,
+            notes=notes,
         )
 
         if memory_measurement.value > 0:
@@ -7,9 +7,18 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import re
 from collections.abc import Callable
 from typing import Any
 
+from psycopg import Connection
+
+from materialize.feature_benchmark.native_testdrive import (
+    NativeTestdrive,
+    TdStatementEvent,
+    UnsupportedFragment,
+    parse,
+)
 from materialize.mzcompose.composition import Composition
 from materialize.mzcompose.services.clusterd import Clusterd
 from materialize.mzcompose.services.materialized import Materialized
@@ -25,6 +34,31 @@ class Executor:
     def Td(self, input: str) -> Any:
         raise NotImplementedError
 
+    def TdMarkers(self, input: str) -> dict[str, float]:
+        """Run a testdrive fragment and return, for each `/* X */` marker in
+        it, the time at which the marked query returned the expected rows."""
+        return self._markers_of_output(self.Td(input))
+
+    def _markers_of_output(self, output: str) -> dict[str, float]:
+        lines = [l for l in output.splitlines() if l]
+
+        timestamps = {}
+        for id, line in enumerate(lines):
+            marker = re.search(r"/\* ([A-Z]) \*/", line)
+            if not marker:
+                continue
+            for id2 in range(id + 1, len(lines)):
+                if "rows match" in lines[id2]:
+                    break
+            else:
+                raise RuntimeError("row match not found")
+
+            matched_line = lines[id2]
+            regex = re.search("at ts ([0-9.]+)", matched_line)
+            assert regex, f"'at ts' string not found on line '{matched_line}'"
+            timestamps[marker.group(1)] = float(regex.group(1))
+        return timestamps
+
     def Kgen(self, topic: str, args: list[str]) -> Any:
         raise NotImplementedError
 
@@ -51,13 +85,36 @@ class Docker(Executor):
         seed: int,
         materialized: Materialized,
         clusterd: Clusterd,
+        native_sql_service: str | None = None,
+        default_timeout: str = "1800s",
     ) -> None:
+        """
+        Args:
+            native_sql_service: If set, fragments consisting only of SQL
+                queries are run over a long-lived connection to this service
+                instead of spawning a testdrive process for each of them.
+            default_timeout: How long the native runner retries a query until
+                its results match, in seconds with an `s` suffix.
+        """
         self._composition = composition
         self._seed = seed
         self._materialized = materialized
         self._clusterd = clusterd
+        self._native: NativeTestdrive | None = None
+        if native_sql_service is not None:
+            self._native = NativeTestdrive(
+                lambda: self._connect(native_sql_service, default_timeout),
+                timeout=float(default_timeout.removesuffix("s")),
+            )
+
+    def _connect(self, service: str, default_timeout: str) -> Connection:
+        return self._composition.sql_connection(
+            service, startup_params={"statement_timeout": default_timeout}
+        )
 
     def RestartMzClusterd(self) -> None:
+        if self._native:
+            self._native.close()
         self._composition.kill("materialized")
         self._composition.kill("clusterd")
         # Make sure we are restarting Materialized() with the
@@ -67,7 +124,23 @@ class Docker(Executor):
             self._composition.up("clusterd")
         return None
 
+    def _td_native(self, input: str) -> tuple[list[TdStatementEvent], str]:
+        """Run as much of the fragment as possible natively, returning the
+        events of the statements that were run and the rest of the fragment."""
+        if self._native is None:
+            return [], input
+        try:
+            statements = parse(input)
+        except UnsupportedFragment:
+            return [], input
+        events, remaining = self._native.run(statements)
+        return events, "".join(statement.source for statement in remaining)
+
     def Td(self, input: str) -> Any:
+        _, remaining = self._td_native(input)
+        return self._testdrive(remaining) if remaining else ""
+
+    def _testdrive(self, input: str) -> str:
         return self._composition.exec(
             "testdrive",
             "--no-reset",
@@ -80,6 +153,13 @@ class Docker(Executor):
             capture=True,
         ).stdout
 
+    def TdMarkers(self, input: str) -> dict[str, float]:
+        events, remaining = self._td_native(input)
+        timestamps = {e.marker: e.matched_at for e in events if e.marker is not None}
+        if remaining:
+            timestamps.update(self._markers_of_output(self._testdrive(remaining)))
+        return timestamps
+
     def Kgen(self, topic: str, args: list[str]) -> Any:
         return self._composition.run(
             "kgen", f"--topic=testdrive-{topic}-{self._seed}", *args
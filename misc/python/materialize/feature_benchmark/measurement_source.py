@@ -7,7 +7,6 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
-import re
 import textwrap
 import time
 from collections.abc import Callable
@@ -61,38 +60,13 @@ class Td(MeasurementSource):
         if executor.add_known_fragment(self._td_str):
             print(self._td_str)
 
-        td_output = executor.Td(self._td_str)
-
-        lines = td_output.splitlines()
-        lines = [l for l in lines if l]
-
-        timestamps = []
-        for marker in ["A", "B"]:
-            timestamp = self._get_time_for_marker(lines, marker)
-            if timestamp is not None:
-                timestamps.append(WallclockDuration(timestamp, MeasurementUnit.SECONDS))
-
-        return timestamps
-
-    def _get_time_for_marker(self, lines: list[str], marker: str) -> None | float:
-        matched_line_id = None
-        for id, line in enumerate(lines):
-            if f"/* {marker} */" in line:
-                for id2 in range(id + 1, len(lines)):
-                    if "rows match" in lines[id2]:
-                        matched_line_id = id2
-                        break
-                else:
-                    raise RuntimeError("row match not found")
-
-        if not matched_line_id:
-            # Marker /* ... */ not found
-            return None
-
-        matched_line = lines[matched_line_id]
-        regex = re.search("at ts ([0-9.]+)", matched_line)
-        assert regex, f"'at ts' string not found on line '{matched_line}'"
-        return float(regex.group(1))
+        timestamps = executor.TdMarkers(self._td_str)
+
+        return [
+            WallclockDuration(timestamps[marker], MeasurementUnit.SECONDS)
+            for marker in ["A", "B"]
+            if marker in timestamps
+        ]
 
 
 class Lambda(MeasurementSource):
@@ -0,0 +1,289 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Run the SQL-only subset of testdrive fragments in-process.
+
+Spawning a testdrive process via `docker compose exec` for every fragment costs
+a fixed overhead that dominates the wall clock of fast benchmark scenarios.
+Fragments that consist only of `>` commands are instead run over a single
+long-lived psycopg connection, emulating testdrive's semantics: each query is
+retried until its sorted result rows match the expected ones, and the time at
+which they matched is recorded as a structured event per statement. Once a
+query returns values that are not formatted like testdrive does here, the rest
+of the fragment is left to the real testdrive.
+"""
+
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+import psycopg
+from psycopg import Connection
+
+MARKER_RE = re.compile(r"/\* ([A-Z]) \*/")
+
+# Statements that testdrive does not retry, as they should provide the
+# expected result on the first try.
+NON_RETRIED_RE = re.compile(
+    r"^(CREATE|DROP|ALTER|SET|DISCARD|FETCH|EXPLAIN)\b", re.IGNORECASE
+)
+
+# Statements that leave state behind in the session, which a fresh testdrive
+# process would not have seen.
+SESSION_STATE_RE = re.compile(
+    r"^(SET|RESET|BEGIN|START|DECLARE|PREPARE|CREATE\s+TEMP)", re.IGNORECASE
+)
+
+FLOAT4_OID = psycopg.postgres.types["float4"].oid
+
+LEADING_COMMENTS_RE = re.compile(r"^(\s*/\*.*?\*/)*\s*", re.DOTALL)
+
+
+class UnsupportedFragment(Exception):
+    """The fragment uses testdrive features beyond plain SQL commands."""
+
+
+@dataclass
+class TdStatement:
+    sql: str
+    expected_rows: list[list[str]]
+    source: str
+    """The lines of the fragment the statement was parsed from."""
+
+
+@dataclass
+class TdStatementEvent:
+    """The timing of a single statement run by `NativeTestdrive`.
+
+    Attributes:
+        sql: The statement.
+        marker: The `/* X */` marker contained in the statement, if any.
+        started_at: When the statement was first issued, in seconds since the
+            epoch.
+        matched_at: When the statement returned the expected rows, in seconds
+            since the epoch.
+        attempts: How often the statement had to be issued.
+    """
+
+    sql: str
+    marker: str | None
+    started_at: float
+    matched_at: float
+    attempts: int
+
+
+def parse(td_str: str) -> list[TdStatement]:
+    """Parse a testdrive fragment consisting only of `>` commands.
+
+    Raises:
+        UnsupportedFragment: The fragment requires the real testdrive.
+    """
+    if "${" in td_str:
+        raise UnsupportedFragment("variable substitution")
+
+    statements: list[TdStatement] = []
+    for line in td_str.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        if line.startswith(">"):
+            statements.append(
+                TdStatement(sql=line[1:].strip(), expected_rows=[], source="")
+            )
+        elif line[0] in "$!?":
+            raise UnsupportedFragment(f"command {line[0]}")
+        elif not statements:
+            raise UnsupportedFragment("expected rows without a query")
+        elif line.startswith("  ") and not statements[-1].expected_rows:
+            # An indented line continues the query of the previous line.
+            statements[-1].sql += "\n" + line[2:]
+        else:
+            statements[-1].expected_rows.append(
+                _split_line(line[1:] if line.startswith("\\") else line)
+            )
+        statements[-1].source += f"{line}\n"
+
+    for statement in statements:
+        rows = statement.expected_rows
+        if (
+            len(rows) == 1
+            and len(rows[0]) == 5
+            and rows[0][1:4]
+            == [
+                "values",
+                "hashing",
+                "to",
+            ]
+        ):
+            raise UnsupportedFragment("hashed results")
+        if len(rows) >= 2 and re.fullmatch(r"-{3,}", " ".join(rows[1])):
+            raise UnsupportedFragment("column names")
+        rows.sort()
+    return statements
+
+
+def _split_line(line: str) -> list[str]:
+    """Split a line of expected output into fields like testdrive does."""
+    out = []
+    field = ""
+    in_quotes = False
+    escaping = False
+    for c in line:
+        if not in_quotes and c.isspace():
+            if field:
+                out.append(field)
+                field = ""
+        elif c == '"' and not escaping:
+            if in_quotes:
+                out.append(field)
+                field = ""
+            in_quotes = not in_quotes
+        elif c == "\\" and not escaping and in_quotes:
+            escaping = True
+        elif escaping:
+            field += {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}.get(c, c)
+            escaping = False
+        else:
+            field += c
+    if in_quotes:
+        raise UnsupportedFragment("unterminated quote")
+    if field:
+        out.append(field)
+    return out
+
+
+def _format_value(value: object, float4: bool = False) -> str:
+    """Format a value the way testdrive does.
+
+    Args:
+        float4: The value is a `real`, which testdrive prints with the
+            shortest representation that round trips in single precision.
+
+    Raises:
+        UnsupportedFragment: Values of this type are not formatted here.
+    """
+    if value is None:
+        return "<null>"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int | str):
+        return str(value)
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f") if value != 0 else "0"
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "inf" if value > 0 else "-inf"
+        # Rust prints the shortest representation that round trips, but
+        # never in scientific notation.
+        if float4:
+            return np.format_float_positional(np.float32(value), trim="-")
+        return format(Decimal(repr(value)), "f").removesuffix(".0")
+    raise UnsupportedFragment(f"values of type {type(value).__name__}")
+
+
+class NativeTestdrive:
+    """Runs SQL-only testdrive fragments over one long-lived connection.
+
+    Args:
+        connect: Opens a new autocommit connection to Materialize.
+        timeout: How long to retry a query until its results match, in
+            seconds.
+        backoff: How long to sleep between retries, in seconds.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Connection],
+        timeout: float,
+        backoff: float = 0.01,
+    ) -> None:
+        self._connect = connect
+        self._timeout = timeout
+        self._backoff = backoff
+        self._conn: Connection | None = None
+        self._session_dirty = False
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def run(
+        self, statements: list[TdStatement]
+    ) -> tuple[list[TdStatementEvent], list[TdStatement]]:
+        """Run the parsed statements of a fragment up to the first one that
+        returns values which are not formatted here.
+
+        Returns:
+            One event per statement that was run, and the statements that are
+            left to run with the real testdrive.
+        """
+        # Every testdrive invocation starts out with a fresh session.
+        if self._conn is not None and (self._session_dirty or self._conn.broken):
+            self.close()
+        self._session_dirty = False
+        if self._conn is None:
+            self._conn = self._connect()
+
+        events = []
+        for i, statement in enumerate(statements):
+            try:
+                events.append(self._run_statement(self._conn, statement))
+            except UnsupportedFragment:
+                return events, statements[i:]
+        return events, []
+
+    def _run_statement(
+        self, conn: Connection, statement: TdStatement
+    ) -> TdStatementEvent:
+        sql = statement.sql
+        body = LEADING_COMMENTS_RE.sub("", sql, count=1)
+        if SESSION_STATE_RE.match(body):
+            self._session_dirty = True
+        retry = not NON_RETRIED_RE.match(body)
+        marker = MARKER_RE.search(sql)
+
+        started_at = time.time()
+        deadline = time.monotonic() + self._timeout
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql.encode())
+                    float4 = [c.type_code == FLOAT4_OID for c in cur.description or []]
+                    rows = cur.fetchall() if cur.description is not None else []
+                actual = sorted(
+                    [_format_value(v, f) for v, f in zip(row, float4)] for row in rows
+                )
+                if actual == statement.expected_rows:
+                    break
+                error = (
+                    f"rows didn't match for {sql!r}\n"
+                    f"expected: {statement.expected_rows}\nactual: {actual}"
+                )
+            except psycopg.Error as e:
+                if conn.broken:
+                    raise
+                error = f"executing {sql!r} failed: {e}"
+            if not retry or time.monotonic() > deadline:
+                raise RuntimeError(error)
+            time.sleep(self._backoff)
+
+        return TdStatementEvent(
+            sql=sql,
+            marker=marker.group(1) if marker else None,
+            started_at=started_at,
+            matched_at=time.time(),
+            attempts=attempts,
+        )
@@ -8,6 +8,9 @@
 # by the Apache License, Version 2.0.
 
 import statistics
+import threading
+from collections.abc import Callable
+from typing import Any
 
 import numpy as np
 from scipy import stats  # type: ignore
@@ -75,3 +78,163 @@ class RunAtMost(TerminationCondition):
         self._data.append(measurement.value)
 
         return len(self._data) >= self._threshold
+
+
+class RunningStats:
+    """Mean and variance of a stream of values, updated in constant time per
+    value using Welford's algorithm."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def relative_standard_error(self) -> float:
+        """The standard error of the mean, relative to the mean."""
+        if self.n < 2 or self.mean == 0:
+            return float("inf")
+        return float(np.sqrt(self.variance() / self.n) / abs(self.mean))
+
+
+class SequentialComparison:
+    """Sequential test of whether THIS (mz_id 0) regressed against OTHER
+    (mz_id 1), fed with the measurements of both as they arrive.
+
+    After every measurement, a bootstrap confidence interval of the ratio
+    statistic(THIS) / statistic(OTHER) is computed, with the comparison
+    statistic of the aggregation of the final result. The bootstrap requires a
+    smooth statistic such as the median or the mean, not the minimum. The
+    verdict is decided as soon as the interval lies entirely below or entirely
+    above 1 + threshold, so scenarios whose
+    performance clearly did or did not change stop after a few measurements,
+    while noisy ones are sampled for longer.
+
+    While only one of the instances has been measured, as is the case for THIS
+    when the instances are not benchmarked concurrently, it is measured until
+    the relative standard error of its mean drops below `precision`.
+
+    The first `skip` measurements of each instance are not taken into account,
+    in line with the measurements discarded by the `Filter` of the benchmark.
+
+    Measurements of THIS and OTHER from the same distribution are rarely
+    reported as a regression:
+
+    >>> import contextlib, io
+    >>> def regressions(runs: int, max_measurements: int = 99) -> int:
+    ...     rng = np.random.default_rng(0)
+    ...     count = 0
+    ...     for seed in range(runs):
+    ...         comparison = SequentialComparison(
+    ...             threshold=0.1, statistic=np.median, resamples=200, seed=seed
+    ...         )
+    ...         with contextlib.redirect_stdout(io.StringIO()):
+    ...             for _ in range(max_measurements):
+    ...                 comparison.add(1, rng.lognormal(0, 0.3))
+    ...                 comparison.add(0, rng.lognormal(0, 0.3))
+    ...                 if comparison.decided(0):
+    ...                     break
+    ...         count += comparison.ratio_interval()[0] > 1.1
+    ...     return count
+    >>> regressions(runs=100) <= 5
+    True
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        statistic: Callable[..., Any],
+        confidence: float = 0.95,
+        min_samples: int = 5,
+        precision: float = 0.02,
+        resamples: int = 2000,
+        skip: int = 0,
+        seed: int = 0,
+    ) -> None:
+        self._threshold = threshold
+        self._statistic = statistic
+        self._alpha = 1 - confidence
+        self._min_samples = min_samples
+        self._precision = precision
+        self._resamples = resamples
+        self._skip = skip
+        self._rng = np.random.default_rng(seed)
+        self._skipped = [0, 0]
+        self._data: tuple[list[float], list[float]] = ([], [])
+        self._stats = (RunningStats(), RunningStats())
+        # Instances measured concurrently report from different threads
+        self._lock = threading.Lock()
+
+    def add(self, mz_id: int, value: float) -> None:
+        with self._lock:
+            if self._skipped[mz_id] < self._skip:
+                self._skipped[mz_id] += 1
+                return
+            self._data[mz_id].append(value)
+            self._stats[mz_id].add(value)
+
+    def ratio_interval(self) -> tuple[float, float]:
+        """The bootstrap confidence interval of the ratio THIS / OTHER."""
+        with self._lock:
+            return self._ratio_interval()
+
+    def _ratio_interval(self) -> tuple[float, float]:
+        this, other = (np.array(data) for data in self._data)
+        this_stats = self._statistic(
+            self._rng.choice(this, size=(self._resamples, len(this))), axis=1
+        )
+        other_stats = self._statistic(
+            self._rng.choice(other, size=(self._resamples, len(other))), axis=1
+        )
+        # A statistic of 0 is equal to another 0 and infinitely smaller than
+        # anything else
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(
+                other_stats == 0,
+                np.where(this_stats == 0, 1.0, np.inf),
+                this_stats / other_stats,
+            )
+        # Pick actual ratios rather than interpolating, which is undefined
+        # between infinite ones
+        low, high = np.quantile(
+            ratios, [self._alpha / 2, 1 - self._alpha / 2], method="nearest"
+        )
+        return float(low), float(high)
+
+    def decided(self, mz_id: int) -> bool:
+        """Whether the instance with the given id can stop being measured."""
+        with self._lock:
+            own_stats = self._stats[mz_id]
+            if own_stats.n < self._min_samples:
+                return False
+            if self._stats[1 - mz_id].n < self._min_samples:
+                return own_stats.relative_standard_error() < self._precision
+
+            low, high = self._ratio_interval()
+
+        print(
+            f"THIS / OTHER = [{low:.3f}, {high:.3f}] with {1 - self._alpha:.0%} confidence"
+        )
+        return high < 1 + self._threshold or low > 1 + self._threshold
+
+
+class SequentialRatioTest(TerminationCondition):
+    """Signal termination once the shared `SequentialComparison` has decided
+    whether THIS regressed against OTHER."""
+
+    def __init__(self, comparison: SequentialComparison, mz_id: int) -> None:
+        super().__init__(threshold=0)
+        self._comparison = comparison
+        self._mz_id = mz_id
+
+    def terminate(self, measurement: Measurement) -> bool:
+        self._comparison.add(self._mz_id, measurement.value)
+        return self._comparison.decided(self._mz_id)
@@ -9,10 +9,14 @@
 
 """Git utilities."""
 
+import bisect
+import fnmatch
 import functools
 import os
+import re
 import subprocess
 import sys
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TypeVar
 
@@ -66,6 +70,14 @@ def rev_parse(rev: str, *, abbrev: bool = False) -> str:
 @functools.cache
 def expand_globs(root: Path, *specs: Path | str) -> set[str]:
     """Find unignored files within the specified paths."""
+    if specs:
+        matched = _match_pathspecs(root, specs)
+        if matched is not None:
+            return matched
+    return _ls_worktree_files(root, *specs)
+
+
+def _ls_worktree_files(root: Path, *specs: Path | str) -> set[str]:
     # The goal here is to find all files in the working tree that are not
     # ignored by .gitignore. Naively using `git ls-files` doesn't work, because
     # it reports files that have been deleted in the working tree if they are
@@ -93,6 +105,99 @@ def expand_globs(root: Path, *specs: Path | str) -> set[str]:
     return set(f for f in (diff_files + ls_files).split("\0") if f.strip() != "")
 
 
+@functools.cache
+def _sorted_worktree_files(root: Path) -> list[str]:
+    return sorted(_ls_worktree_files(root))
+
+
+def _match_pathspecs(root: Path, specs: Iterable[Path | str]) -> set[str] | None:
+    """Evaluate Git pathspecs against a single cached listing of the working
+    tree, rather than shelling out to Git for every set of specs.
+
+    Only plain paths, globs and `:(exclude)` specs are supported. Returns
+    `None` if any spec requires Git to evaluate it.
+    """
+    includes: list[str] = []
+    excludes: list[str] = []
+    for spec in specs:
+        spec = str(spec)
+        target = includes
+        if spec.startswith(":(exclude)"):
+            spec = spec.removeprefix(":(exclude)")
+            target = excludes
+        elif spec.startswith(":"):
+            return None
+        if os.path.isabs(spec):
+            try:
+                spec = str(Path(spec).relative_to(root))
+            except ValueError:
+                return None
+        spec = spec.rstrip("/")
+        if not spec or spec == "." or spec.startswith("../"):
+            return None
+        target.append(spec)
+
+    files = _sorted_worktree_files(root)
+    out = _match_paths(files, includes) if includes else set(files)
+    if excludes:
+        out -= _match_paths(sorted(out), excludes)
+    return out
+
+
+def _match_paths(files: list[str], specs: list[str]) -> set[str]:
+    out = set()
+    globs = []
+    for spec in specs:
+        if any(c in spec for c in "*?[\\"):
+            globs.append(spec)
+            continue
+        # A literal spec matches the file of that name or anything within the
+        # directory of that name.
+        i = bisect.bisect_left(files, spec)
+        if i < len(files) and files[i] == spec:
+            out.add(spec)
+        prefix = f"{spec}/"
+        i = bisect.bisect_left(files, prefix, lo=i)
+        while i < len(files) and files[i].startswith(prefix):
+            out.add(files[i])
+            i += 1
+    if globs:
+        # Like Git, but unlike shells, wildcards match across slashes.
+        pattern = re.compile("|".join(fnmatch.translate(g) for g in globs))
+        out |= {f for f in files if pattern.match(f)}
+    return out
+
+
+@functools.cache
+def clean_blob_ids(root: Path) -> dict[str, str]:
+    """Map each tracked regular file that is unmodified in the working tree to
+    the ID of its Git blob.
+
+    Since blob IDs are derived from file contents, they make a stable cache
+    key for anything computed from the contents of a file. Files that are
+    modified or deleted in the working tree, untracked files, symlinks and
+    submodules are omitted.
+    """
+    staged = spawn.capture(["git", "ls-files", "--stage", "-z"], cwd=root)
+    modified = set(
+        spawn.capture(
+            ["git", "diff", "--name-only", "--relative", "-z"], cwd=root
+        ).split("\0")
+    )
+    blob_ids = {}
+    for entry in staged.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        mode, blob_id, stage = info.split(" ")
+        if mode not in ("100644", "100755"):
+            continue
+        # Files with merge conflicts have several stages and no single blob.
+        if stage == "0" and path not in modified:
+            blob_ids[path] = blob_id
+    return blob_ids
+
+
 def get_version_tags(
     *,
     version_type: type[VERSION_TYPE],
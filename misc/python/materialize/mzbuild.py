@@ -18,7 +18,9 @@ documentation][user-docs].
 import argparse
 import base64
 import collections
+import copy
 import hashlib
+import heapq
 import json
 import multiprocessing
 import os
@@ -32,15 +34,16 @@ import tarfile
 import time
 from collections import OrderedDict
 from collections.abc import Callable, Iterable, Iterator, Sequence
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from enum import Enum, auto
 from functools import cache
 from pathlib import Path
 from tempfile import TemporaryFile
-from threading import Lock
+from threading import BoundedSemaphore, Lock
 from typing import IO, Any, cast
 
 import requests
+import requests.adapters
 import yaml
 from requests.auth import HTTPBasicAuth
 
@@ -62,6 +65,249 @@ class Fingerprint(bytes):
         return base64.b32encode(self).decode()
 
 
+class FileDigestCache:
+    """A persistent cache of the SHA-1 digests of the contents of files.
+
+    Computing a fingerprint requires a digest of every input file of every
+    image, which is expensive to recompute from scratch on every invocation.
+    Files that are unmodified relative to the Git index are looked up by their
+    blob ID, which is derived from their contents and so never goes stale.
+    Other files are looked up by their size, modification time and inode, as
+    Git does for its own index. Files are only read on a cache miss.
+
+    Args:
+        root: The path to the root of the repository.
+        path: The file in which to persist the cache across invocations, or
+            `None` to keep the cache in memory only.
+    """
+
+    VERSION = 1
+
+    # Bound the size of the cache file. Entries that were not used by the
+    # current invocation are dropped first.
+    MAX_ENTRIES = 200_000
+
+    # Like Git, don't trust the modification time of files that were changed
+    # very recently, as they could be changed again within the granularity of
+    # the filesystem's timestamps without their metadata changing.
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, root: Path, path: Path | None):
+        self.root = root
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._by_blob: dict[str, str] = {}
+        self._by_stat: dict[str, tuple[str, str]] = {}
+        self._used_blobs: set[str] = set()
+        self._used_paths: set[str] = set()
+        self._dirty = False
+        self._lock = Lock()
+        if path is not None:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self._by_blob = data["blobs"]
+                    self._by_stat = {
+                        p: (key, digest) for p, (key, digest) in data["stats"].items()
+                    }
+            except (OSError, ValueError, KeyError, TypeError):
+                # A missing or corrupt cache is equivalent to an empty one.
+                pass
+
+    def digest(self, rel_path: str, st: os.stat_result) -> bytes:
+        """Return the SHA-1 digest of the contents of a file.
+
+        Args:
+            rel_path: The path to the file, relative to the repository root.
+            st: The result of `os.stat` on the file.
+        """
+        blob_id = git.clean_blob_ids(self.root).get(rel_path)
+        stat_key = f"{st.st_size}:{st.st_mtime_ns}:{st.st_ino}"
+        with self._lock:
+            if blob_id is not None and blob_id in self._by_blob:
+                self.hits += 1
+                self._used_blobs.add(blob_id)
+                return bytes.fromhex(self._by_blob[blob_id])
+            cached = self._by_stat.get(rel_path)
+            if cached is not None and cached[0] == stat_key:
+                self.hits += 1
+                self._used_paths.add(rel_path)
+                return bytes.fromhex(cached[1])
+
+        with open(self.root / rel_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+
+        with self._lock:
+            self.misses += 1
+            if blob_id is not None:
+                self._by_blob[blob_id] = digest
+                self._used_blobs.add(blob_id)
+                self._dirty = True
+            elif time.time_ns() - st.st_mtime_ns > self.RACY_WINDOW_NS:
+                self._by_stat[rel_path] = (stat_key, digest)
+                self._used_paths.add(rel_path)
+                self._dirty = True
+        return bytes.fromhex(digest)
+
+    def save(self) -> None:
+        """Persist any new entries in the cache to disk."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            blobs = self._by_blob
+            stats = self._by_stat
+            if len(blobs) + len(stats) > self.MAX_ENTRIES:
+                blobs = {b: d for b, d in blobs.items() if b in self._used_blobs}
+                stats = {p: e for p, e in stats.items() if p in self._used_paths}
+            data = {"version": self.VERSION, "blobs": blobs, "stats": stats}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temporary file and rename it into place so that
+                # concurrent invocations never observe a partially written
+                # cache.
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save fingerprint cache: {e}", file=sys.stderr)
+                return
+            self._dirty = False
+
+
+class BuildDurations:
+    """How long each image took to build the last time it was built locally.
+
+    Used to schedule the builds on the critical path first.
+
+    Args:
+        path: The file in which to persist the durations across invocations.
+    """
+
+    # The duration assumed for images that have never been built.
+    DEFAULT_SECONDS = 60.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._durations: dict[str, float] = {}
+        self._lock = Lock()
+        try:
+            with open(path) as f:
+                self._durations = {
+                    name: float(duration) for name, duration in json.load(f).items()
+                }
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def get(self, name: str) -> float:
+        """Return the expected duration of building the named image."""
+        with self._lock:
+            return self._durations.get(name, self.DEFAULT_SECONDS)
+
+    def record(self, name: str, duration: float) -> None:
+        """Record how long building the named image took."""
+        with self._lock:
+            self._durations[name] = duration
+
+    def save(self) -> None:
+        """Persist the recorded durations to disk."""
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+                with open(tmp_path, "w") as f:
+                    json.dump(self._durations, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save build durations: {e}", file=sys.stderr)
+
+
+class RepositoryManifest:
+    """A persistent cache of the parsed `mzbuild.yml` configurations and the
+    `MZFROM` dependencies of the images in a repository.
+
+    Parsing the configuration of every image is expensive to repeat on every
+    invocation. An image's entry is reused as long as the digests of the
+    contents of its `mzbuild.yml` and `Dockerfile` are unchanged, so that these
+    files are only parsed when they change. Hashing these small files is cheap
+    compared to parsing them.
+
+    Args:
+        root: The path to the root of the repository.
+        path: The file in which to persist the manifest across invocations, or
+            `None` to keep the manifest in memory only.
+    """
+
+    VERSION = 1
+
+    def __init__(self, root: Path, path: Path | None):
+        self.root = root
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._images: dict[str, dict[str, Any]] = {}
+        self._used: set[str] = set()
+        self._dirty = False
+        if path is not None:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self._images = data["images"]
+            except (OSError, ValueError, KeyError, TypeError):
+                # A missing or corrupt manifest is equivalent to an empty one.
+                pass
+
+    def image(self, rel_path: str) -> tuple[dict[str, Any], list[str]]:
+        """Return the configuration and the names of the dependencies of the
+        image in a directory.
+
+        Args:
+            rel_path: The path to the directory containing the `mzbuild.yml`
+                file, relative to the repository root.
+        """
+        path = self.root / rel_path
+        digests = []
+        for file in ("mzbuild.yml", "Dockerfile"):
+            with open(path / file, "rb") as f:
+                digests.append(hashlib.sha1(f.read()).hexdigest())
+        self._used.add(rel_path)
+        entry = self._images.get(rel_path)
+        if entry is not None and entry["digests"] == digests:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = {
+                "digests": digests,
+                "config": Image.load_config(path),
+                "depends_on": Image.load_depends_on(path),
+            }
+            self._images[rel_path] = entry
+            self._dirty = True
+        # The configuration is consumed destructively by `Image`.
+        return copy.deepcopy(entry["config"]), list(entry["depends_on"])
+
+    def save(self) -> None:
+        """Persist any new entries in the manifest to disk."""
+        if self.path is None or not self._dirty:
+            return
+        # Drop the entries of images that no longer exist.
+        images = {p: e for p, e in self._images.items() if p in self._used}
+        data = {"version": self.VERSION, "images": images}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError) as e:
+            print(f"Failed to save repository manifest: {e}", file=sys.stderr)
+            return
+        self._dirty = False
+
+
 class Profile(Enum):
     RELEASE = auto()
     OPTIMIZED = auto()
@@ -87,6 +333,9 @@ class RepositoryDetails:
         bazel: Whether or not to use Bazel as the build system instead of Cargo.
         bazel_remote_cache: URL of a Bazel Remote Cache that we can build with.
         bazel_lto: Force LTO build
+        file_digests: The `FileDigestCache` used to fingerprint images.
+        build_durations: The `BuildDurations` used to schedule image builds.
+        manifest: The `RepositoryManifest` used to discover images.
     """
 
     def __init__(
@@ -117,6 +366,15 @@ class RepositoryDetails:
             or ui.env_is_truthy("BUILDKITE_TAG")
             or ui.env_is_truthy("CI_RELEASE_LTO_BUILD")
         )
+        self.file_digests = FileDigestCache(
+            root, root / "target" / "mzbuild" / "file-digests.json"
+        )
+        self.build_durations = BuildDurations(
+            root / "target" / "mzbuild" / "build-durations.json"
+        )
+        self.manifest = RepositoryManifest(
+            root, root / "target" / "mzbuild" / "manifest.json"
+        )
 
     def build(
         self,
@@ -226,61 +484,225 @@ KNOWN_DOCKER_IMAGES_FILE = Path(MZ_ROOT / "known-docker-images.txt")
 _known_docker_images: set[str] | None = None
 _known_docker_images_lock = Lock()
 
+MISSING_DOCKER_IMAGES_FILE = Path(
+    MZ_ROOT / "target" / "mzbuild" / "missing-docker-images.txt"
+)
+# How long to trust that an image was missing from Docker Hub. Images can be
+# pushed by other build agents at any time, so keep this short.
+MISSING_DOCKER_IMAGES_TTL_SECONDS = 300
+_missing_docker_images: dict[str, float] | None = None
 
-def is_docker_image_pushed(name: str) -> bool:
-    """Check whether the named image is pushed to Docker Hub.
 
-    Note that this operation requires a rather slow network request.
+class DockerHubClient:
+    """A client for querying the Docker Hub registry.
+
+    All requests share a single pooled HTTP session. Pull tokens are reused
+    for each repository until they expire, the number of concurrent requests
+    is bounded, and all requests back off together when rate limited.
+
+    Args:
+        max_concurrency: The maximum number of concurrent requests.
+        max_attempts: How often to try a request before giving up.
     """
-    global _known_docker_images
 
-    if _known_docker_images is None:
-        with _known_docker_images_lock:
+    REGISTRY_URL = "https://registry-1.docker.io"
+    AUTH_URL = "https://auth.docker.io/token"
+
+    def __init__(self, max_concurrency: int = 16, max_attempts: int = 5):
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=max_concurrency
+        )
+        self.session.mount("https://", adapter)
+        dockerhub_username = os.getenv("DOCKERHUB_USERNAME")
+        dockerhub_token = os.getenv("DOCKERHUB_ACCESS_TOKEN")
+        self.basic_auth = (
+            HTTPBasicAuth(dockerhub_username, dockerhub_token)
+            if dockerhub_username and dockerhub_token
+            else None
+        )
+        self._tokens: dict[str, tuple[str, float]] = {}
+        self._token_locks: collections.defaultdict[str, Lock] = collections.defaultdict(
+            Lock
+        )
+        self._lock = Lock()
+        self._semaphore = BoundedSemaphore(max_concurrency)
+        self._backoff_until = 0.0
+
+    def _token_lock(self, repository: str) -> Lock:
+        with self._lock:
+            return self._token_locks[repository]
+
+    def _token(self, repository: str) -> str:
+        # Only fetch a single token per repository, even if many of its images
+        # are checked concurrently.
+        with self._token_lock(repository):
+            token, expires_at = self._tokens.get(repository, ("", 0.0))
+            if time.monotonic() < expires_at:
+                return token
+            response = self._request(
+                "GET",
+                self.AUTH_URL,
+                params={
+                    "service": "registry.docker.io",
+                    "scope": f"repository:{repository}:pull",
+                },
+            )
+            response.raise_for_status()
+            data = response.json()
+            token = data["token"]
+            # Leave some slack so that the token doesn't expire in flight.
+            expires_at = time.monotonic() + max(data.get("expires_in", 60) - 10, 0)
+            self._tokens[repository] = (token, expires_at)
+            return token
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Issue a request, retrying with exponential backoff while rate
+        limited or while the registry reports server errors."""
+        sleep_time = 1.0
+        for attempt in range(self.max_attempts):
+            with self._lock:
+                backoff = self._backoff_until - time.monotonic()
+            if backoff > 0:
+                time.sleep(backoff)
+            with self._semaphore:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            if (
+                response.status_code not in (429, 500, 502, 503, 504)
+                or attempt == self.max_attempts - 1
+            ):
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", sleep_time))
+            except ValueError:
+                delay = sleep_time
+            with self._lock:
+                self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+            sleep_time = min(sleep_time * 2, 30)
+        raise RuntimeError("unreachable")
+
+    def manifest_exists(self, name: str) -> bool | None:
+        """Report whether the named image exists on Docker Hub.
+
+        Returns `None` if the registry could not give a definitive answer.
+        """
+        if ":" not in name:
+            image, tag = name, "latest"
+        else:
+            image, tag = name.rsplit(":", 1)
+
+        headers = {"Accept": "application/vnd.docker.distribution.manifest.v2+json"}
+        url = f"{self.REGISTRY_URL}/v2/{image}/manifests/{tag}"
+        if self.basic_auth:
+            response = self._request("HEAD", url, headers=headers, auth=self.basic_auth)
+        else:
+            headers["Authorization"] = f"Bearer {self._token(image)}"
+            response = self._request("HEAD", url, headers=headers)
+            if response.status_code == 401:
+                # The token might have been revoked early, try a fresh one.
+                with self._token_lock(image):
+                    self._tokens.pop(image, None)
+                headers["Authorization"] = f"Bearer {self._token(image)}"
+                response = self._request("HEAD", url, headers=headers)
+
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            return False
+        return None
+
+
+_docker_hub_client: DockerHubClient | None = None
+_docker_hub_client_lock = Lock()
+
+
+def docker_hub_client() -> DockerHubClient:
+    """Return the `DockerHubClient` shared by all of mzbuild."""
+    global _docker_hub_client
+    with _docker_hub_client_lock:
+        if _docker_hub_client is None:
+            _docker_hub_client = DockerHubClient()
+        return _docker_hub_client
+
+
+def _load_docker_image_caches() -> None:
+    global _known_docker_images, _missing_docker_images
+
+    with _known_docker_images_lock:
+        if _known_docker_images is None:
             if not KNOWN_DOCKER_IMAGES_FILE.exists():
                 _known_docker_images = set()
             else:
                 with KNOWN_DOCKER_IMAGES_FILE.open() as f:
                     _known_docker_images = set(line.strip() for line in f)
+        if _missing_docker_images is None:
+            _missing_docker_images = {}
+            if MISSING_DOCKER_IMAGES_FILE.exists():
+                with MISSING_DOCKER_IMAGES_FILE.open() as f:
+                    lines = f.readlines()
+                now = time.time()
+                for line in lines:
+                    try:
+                        name, checked_at = line.split()
+                        if now - float(checked_at) < MISSING_DOCKER_IMAGES_TTL_SECONDS:
+                            _missing_docker_images[name] = float(checked_at)
+                    except ValueError:
+                        continue
+                # The file is only appended to while checking images, so drop
+                # the expired and superseded entries.
+                if len(lines) > len(_missing_docker_images):
+                    with MISSING_DOCKER_IMAGES_FILE.open("w") as f:
+                        for name, checked_at in _missing_docker_images.items():
+                            print(name, checked_at, file=f)
+
+
+def mark_docker_image_pushed(name: str) -> None:
+    """Record that the named image is known to exist on Docker Hub."""
+    _load_docker_image_caches()
+    assert _known_docker_images is not None and _missing_docker_images is not None
+    with _known_docker_images_lock:
+        _missing_docker_images.pop(name, None)
+        if name not in _known_docker_images:
+            _known_docker_images.add(name)
+            with KNOWN_DOCKER_IMAGES_FILE.open("a") as f:
+                print(name, file=f)
 
-    if name in _known_docker_images:
-        return True
 
-    if ":" not in name:
-        image, tag = name, "latest"
-    else:
-        image, tag = name.rsplit(":", 1)
+def _mark_docker_image_missing(name: str) -> None:
+    assert _missing_docker_images is not None
+    now = time.time()
+    with _known_docker_images_lock:
+        _missing_docker_images[name] = now
+        MISSING_DOCKER_IMAGES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with MISSING_DOCKER_IMAGES_FILE.open("a") as f:
+            print(name, now, file=f)
 
-    dockerhub_username = os.getenv("DOCKERHUB_USERNAME")
-    dockerhub_token = os.getenv("DOCKERHUB_ACCESS_TOKEN")
 
-    exists: bool = False
+def is_docker_image_pushed(name: str) -> bool:
+    """Check whether the named image is pushed to Docker Hub.
 
-    try:
-        if dockerhub_username and dockerhub_token:
-            response = requests.head(
-                f"https://registry-1.docker.io/v2/{image}/manifests/{tag}",
-                headers={
-                    "Accept": "application/vnd.docker.distribution.manifest.v2+json",
-                },
-                auth=HTTPBasicAuth(dockerhub_username, dockerhub_token),
-            )
-        else:
-            token = requests.get(
-                "https://auth.docker.io/token",
-                params={
-                    "service": "registry.docker.io",
-                    "scope": f"repository:{image}:pull",
-                },
-            ).json()["token"]
-            response = requests.head(
-                f"https://registry-1.docker.io/v2/{image}/manifests/{tag}",
-                headers={
-                    "Accept": "application/vnd.docker.distribution.manifest.v2+json",
-                    "Authorization": f"Bearer {token}",
-                },
-            )
+    Note that this operation requires a rather slow network request, unless
+    the result is already known from an earlier check. To check many images,
+    use `are_docker_images_pushed`.
+    """
+    _load_docker_image_caches()
+    assert _known_docker_images is not None and _missing_docker_images is not None
+
+    if name in _known_docker_images:
+        return True
 
-        if response.status_code in (401, 429, 500, 502, 503, 504):
+    checked_at = _missing_docker_images.get(name)
+    if (
+        checked_at is not None
+        and time.time() - checked_at < MISSING_DOCKER_IMAGES_TTL_SECONDS
+    ):
+        return False
+
+    try:
+        exists = docker_hub_client().manifest_exists(name)
+        if exists is None:
             # Fall back to 5x slower method
             proc = subprocess.run(
                 ["docker", "manifest", "inspect", name],
@@ -288,23 +710,37 @@ def is_docker_image_pushed(name: str) -> bool:
                 stderr=subprocess.DEVNULL,
                 env=dict(os.environ, DOCKER_CLI_EXPERIMENTAL="enabled"),
             )
-            exists = proc.returncode == 0
-        else:
-            exists = response.status_code == 200
-
+            if proc.returncode == 0:
+                mark_docker_image_pushed(name)
+            # A failure might as well be a network error or rate limit, so
+            # don't remember the image as missing
+            return proc.returncode == 0
     except Exception as e:
         print(f"Error checking Docker image: {e}")
         return False
 
     if exists:
-        with _known_docker_images_lock:
-            _known_docker_images.add(name)
-            with KNOWN_DOCKER_IMAGES_FILE.open("a") as f:
-                print(name, file=f)
+        mark_docker_image_pushed(name)
+    else:
+        _mark_docker_image_missing(name)
 
     return exists
 
 
+def are_docker_images_pushed(names: Iterable[str]) -> dict[str, bool]:
+    """Check whether each of the named images is pushed to Docker Hub.
+
+    The checks share a single HTTP session and are issued concurrently, up to
+    the concurrency limit of the `DockerHubClient`.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    max_workers = min(len(names), docker_hub_client().max_concurrency)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(names, executor.map(is_docker_image_pushed, names)))
+
+
 def chmod_x(path: Path) -> None:
     """Set the executable bit on a file or directory."""
     # https://stackoverflow.com/a/30463972/1122351
@@ -804,39 +1240,58 @@ class Image:
 
     _DOCKERFILE_MZFROM_RE = re.compile(rb"^MZFROM\s*(\S+)")
 
-    def __init__(self, rd: RepositoryDetails, path: Path):
+    def __init__(
+        self,
+        rd: RepositoryDetails,
+        path: Path,
+        config: dict[str, Any] | None = None,
+        depends_on: list[str] | None = None,
+    ):
         self.rd = rd
         self.path = path
         self.pre_images: list[PreImage] = []
-        with open(self.path / "mzbuild.yml") as f:
-            data = yaml.safe_load(f)
-            self.name: str = data.pop("name")
-            self.publish: bool = data.pop("publish", True)
-            self.description: str | None = data.pop("description", None)
-            self.mainline: bool = data.pop("mainline", True)
-            for pre_image in data.pop("pre-image", []):
-                typ = pre_image.pop("type", None)
-                if typ == "cargo-build":
-                    self.pre_images.append(CargoBuild(self.rd, self.path, pre_image))
-                elif typ == "copy":
-                    self.pre_images.append(Copy(self.rd, self.path, pre_image))
-                else:
-                    raise ValueError(
-                        f"mzbuild config in {self.path} has unknown pre-image type"
-                    )
-            self.build_args = data.pop("build-args", {})
+        data = config if config is not None else self.load_config(self.path)
+        self.name: str = data.pop("name")
+        self.publish: bool = data.pop("publish", True)
+        self.description: str | None = data.pop("description", None)
+        self.mainline: bool = data.pop("mainline", True)
+        for pre_image in data.pop("pre-image", []):
+            typ = pre_image.pop("type", None)
+            if typ == "cargo-build":
+                self.pre_images.append(CargoBuild(self.rd, self.path, pre_image))
+            elif typ == "copy":
+                self.pre_images.append(Copy(self.rd, self.path, pre_image))
+            else:
+                raise ValueError(
+                    f"mzbuild config in {self.path} has unknown pre-image type"
+                )
+        self.build_args = data.pop("build-args", {})
 
         if re.search(r"[^A-Za-z0-9\-]", self.name):
             raise ValueError(
                 f"mzbuild image name {self.name} contains invalid character; only alphanumerics and hyphens allowed"
             )
 
-        self.depends_on: list[str] = []
-        with open(self.path / "Dockerfile", "rb") as f:
+        self.depends_on: list[str] = (
+            depends_on if depends_on is not None else self.load_depends_on(self.path)
+        )
+
+    @staticmethod
+    def load_config(path: Path) -> dict[str, Any]:
+        """Parse the `mzbuild.yml` configuration in a directory."""
+        with open(path / "mzbuild.yml") as f:
+            return yaml.safe_load(f)
+
+    @classmethod
+    def load_depends_on(cls, path: Path) -> list[str]:
+        """Find the images that the `Dockerfile` in a directory depends on."""
+        depends_on = []
+        with open(path / "Dockerfile", "rb") as f:
             for line in f:
-                match = self._DOCKERFILE_MZFROM_RE.match(line)
+                match = cls._DOCKERFILE_MZFROM_RE.match(line)
                 if match:
-                    self.depends_on.append(match.group(1).decode())
+                    depends_on.append(match.group(1).decode())
+        return depends_on
 
     def sync_description(self) -> None:
         """Sync the description to Docker Hub if the image is publishable
@@ -1044,13 +1499,6 @@ class ResolvedImage:
                         break
         return self.acquired
 
-    def is_published_if_necessary(self) -> bool:
-        """Report whether the image exists on Docker Hub if it is publishable."""
-        if self.publish and is_docker_image_pushed(self.spec()):
-            ui.say(f"{self.spec()} already exists")
-            return True
-        return False
-
     def run(
         self,
         args: list[str] = [],
@@ -1125,26 +1573,25 @@ class ResolvedImage:
         be inputs. If it has a pre-image action, that action may add additional
         inputs via `PreImage.inputs`.
         """
+        root = self.image.rd.root
         self_hash = hashlib.sha1()
-        for rel_path in sorted(
-            set(git.expand_globs(self.image.rd.root, *self.inputs()))
-        ):
-            abs_path = self.image.rd.root / rel_path
-            file_hash = hashlib.sha1()
-            raw_file_mode = os.lstat(abs_path).st_mode
+        for rel_path in sorted(git.expand_globs(root, *self.inputs())):
+            abs_path = root / rel_path
+            st = os.lstat(abs_path)
+            raw_file_mode = st.st_mode
             # Compute a simplified file mode using the same rules as Git.
             # https://github.com/git/git/blob/3bab5d562/Documentation/git-fast-import.txt#L610-L616
             if stat.S_ISLNK(raw_file_mode):
                 file_mode = 0o120000
+                # The digest covers the contents of the link's target.
+                st = os.stat(abs_path)
             elif raw_file_mode & stat.S_IXUSR:
                 file_mode = 0o100755
             else:
                 file_mode = 0o100644
-            with open(abs_path, "rb") as f:
-                file_hash.update(f.read())
             self_hash.update(file_mode.to_bytes(2, byteorder="big"))
             self_hash.update(rel_path.encode())
-            self_hash.update(file_hash.digest())
+            self_hash.update(self.image.rd.file_digests.digest(rel_path, st))
             self_hash.update(b"\0")
 
         for pre_image in self.image.pre_images:
@@ -1187,6 +1634,9 @@ class DependencySet:
             )
             image.acquired = image.spec() in known_images
             self._dependencies[d.name] = image
+        if self._dependencies:
+            # All images in a dependency set belong to the same repository.
+            next(iter(self)).image.rd.file_digests.save()
 
     def _prepare_batch(self, images: list[ResolvedImage]) -> dict[type[PreImage], Any]:
         pre_images = collections.defaultdict(list)
@@ -1243,75 +1693,121 @@ class DependencySet:
         for dep in deps_to_build:
             dep.build(prep)
 
-    def ensure(self, post_build: Callable[[ResolvedImage], None] | None = None):
+    def ensure(
+        self,
+        post_build: Callable[[ResolvedImage], None] | None = None,
+        max_workers: int | None = None,
+    ):
         """Ensure all publishable images in this dependency set exist on Docker
         Hub.
 
-        Images are pushed using their spec as their tag.
+        Images are pushed using their spec as their tag. Each image is built as
+        soon as all of the images it depends on have been built, prioritizing
+        the images on the critical path.
 
         Args:
             post_build: A callback to invoke with each dependency that was built
                 locally.
+            max_workers: The maximum number of images to build concurrently.
+                Defaults to the number of CPUs.
         """
-        num_deps = len(list(self))
-        if not num_deps:
-            deps_to_build = []
-        else:
-            with ThreadPoolExecutor(max_workers=num_deps) as executor:
-                futures = list(
-                    executor.map(
-                        lambda dep: (dep, not dep.is_published_if_necessary()), self
-                    )
-                )
-
-            deps_to_build = [dep for dep, should_build in futures if should_build]
+        published = self._check_published()
+        deps_to_build = [dep for dep in self if not published[dep.name]]
+        if not deps_to_build:
+            return
 
         prep = self._prepare_batch(deps_to_build)
-        lock = Lock()
-        built_deps: set[str] = set([dep.name for dep in self]) - set(
-            [dep.name for dep in deps_to_build]
-        )
+        durations = deps_to_build[0].image.rd.build_durations
+        to_build = {dep.name: dep for dep in deps_to_build}
+
+        # Only dependencies that are themselves being built need to be waited
+        # for; the rest already exist on Docker Hub.
+        pending = {
+            dep.name: {d for d in dep.dependencies if d in to_build}
+            for dep in deps_to_build
+        }
+        dependents: dict[str, list[str]] = {name: [] for name in to_build}
+        for name, deps in pending.items():
+            for d in deps:
+                dependents[d].append(name)
+
+        # Start the builds on the longest remaining chain of dependent builds
+        # first, using how long each image took to build last time.
+        priority: dict[str, float] = {}
+
+        def critical_path(name: str) -> float:
+            if name not in priority:
+                priority[name] = durations.get(name) + max(
+                    (critical_path(d) for d in dependents[name]), default=0.0
+                )
+            return priority[name]
 
-        def build_dep(dep):
-            end_time = time.time() + 600
-            while True:
-                if time.time() > end_time:
-                    raise TimeoutError(
-                        f"Timed out in {dep.name} waiting for {[dep2.name for dep2 in dep.dependencies if dep2 not in built_deps]}"
-                    )
-                with lock:
-                    if all(dep2 in built_deps for dep2 in dep.dependencies):
-                        break
-                time.sleep(0.01)
+        ready = [
+            (-critical_path(name), name) for name, deps in pending.items() if not deps
+        ]
+        heapq.heapify(ready)
+
+        def build_dep(dep: ResolvedImage) -> float:
+            start_time = time.monotonic()
             for attempts_remaining in reversed(range(3)):
                 try:
                     dep.build(prep, push=dep.publish)
-                    with lock:
-                        built_deps.add(dep.name)
+                    if dep.publish:
+                        mark_docker_image_pushed(dep.spec())
                     break
                 except Exception:
                     if not dep.publish or attempts_remaining == 0:
                         raise
+            duration = time.monotonic() - start_time
             if post_build:
                 post_build(dep)
-
-        if deps_to_build:
-            with ThreadPoolExecutor(max_workers=len(deps_to_build)) as executor:
-                futures = [executor.submit(build_dep, dep) for dep in deps_to_build]
-                for future in as_completed(futures):
-                    future.result()
+            return duration
+
+        max_workers = max_workers or multiprocessing.cpu_count()
+        build_times: dict[str, float] = {}
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running: dict[Future[float], str] = {}
+            while ready or running:
+                while ready and len(running) < max_workers:
+                    _, name = heapq.heappop(ready)
+                    running[executor.submit(build_dep, to_build[name])] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    build_times[name] = future.result()
+                    durations.record(name, build_times[name])
+                    for dependent in dependents[name]:
+                        pending[dependent].remove(name)
+                        if not pending[dependent]:
+                            heapq.heappush(
+                                ready, (-critical_path(dependent), dependent)
+                            )
+        durations.save()
+
+        ui.section(
+            f"Built {len(build_times)} images in {time.monotonic() - start_time:.1f}s"
+        )
+        for name, duration in sorted(
+            build_times.items(), key=lambda item: item[1], reverse=True
+        ):
+            ui.say(f"{duration:8.1f}s  {name}")
 
     def check(self) -> bool:
         """Check all publishable images in this dependency set exist on Docker
         Hub. Don't try to download or build them."""
-        num_deps = len(list(self))
-        if num_deps == 0:
-            return True
-        with ThreadPoolExecutor(max_workers=num_deps) as executor:
-            results = list(
-                executor.map(lambda dep: dep.is_published_if_necessary(), list(self))
-            )
-        return all(results)
+        return all(self._check_published().values())
+
+    def _check_published(self) -> dict[str, bool]:
+        """Report for each image whether it is publishable and already exists
+        on Docker Hub, checking all images in one batch."""
+        pushed = are_docker_images_pushed(dep.spec() for dep in self if dep.publish)
+        published = {}
+        for dep in self:
+            published[dep.name] = dep.publish and pushed[dep.spec()]
+            if published[dep.name]:
+                ui.say(f"{dep.spec()} already exists")
+        return published
 
     def __iter__(self) -> Iterator[ResolvedImage]:
         return iter(self._dependencies.values())
@@ -1323,8 +1819,9 @@ class DependencySet:
 class Repository:
     """A collection of mzbuild `Image`s.
 
-    Creating a repository will walk the filesystem beneath `root` to
-    automatically discover all contained `Image`s.
+    Creating a repository will list the unignored files beneath `root` to
+    automatically discover all contained `Image`s. The configurations of the
+    images are cached in a `RepositoryManifest`.
 
     Iterating over a repository yields the contained images in an arbitrary
     order.
@@ -1373,8 +1870,56 @@ class Repository:
         )
         self.images: dict[str, Image] = {}
         self.compositions: dict[str, Path] = {}
+        self._discover()
+
+        # Validate dependencies.
+        for image in self.images.values():
+            for d in image.depends_on:
+                if d not in self.images:
+                    raise ValueError(
+                        f"image {image.name} depends on non-existent image {d}"
+                    )
+
+    def _discover(self) -> None:
+        # Listing the files known to Git is much cheaper than walking the
+        # entire checkout, including its ignored directories.
+        try:
+            files = spawn.capture(
+                [
+                    "git",
+                    "ls-files",
+                    "--cached",
+                    "--others",
+                    "--exclude-standard",
+                    "-z",
+                    "--",
+                    "*mzbuild.yml",
+                    "*mzcompose.py",
+                    ":(exclude)misc/python",
+                ],
+                cwd=self.root,
+                stderr=subprocess.DEVNULL,
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            # Not a Git checkout.
+            self._walk()
+            return
+        # Files are listed once per stage during a merge conflict.
+        for file in sorted({f for f in files.split("\0") if f}):
+            path, _, name = file.rpartition("/")
+            # Tracked files may have been deleted in the working tree.
+            if not (self.root / file).exists():
+                continue
+            if name == "mzbuild.yml":
+                config, depends_on = self.rd.manifest.image(path)
+                self._add_image(Image(self.rd, self.root / path, config, depends_on))
+            elif name == "mzcompose.py":
+                self._add_composition(self.root / path)
+        self.rd.manifest.save()
+
+    def _walk(self) -> None:
         for path, dirs, files in os.walk(self.root, topdown=True):
-            if path == str(root / "misc"):
+            if path == str(self.root / "misc"):
                 dirs.remove("python")
             # Filter out some particularly massive ignored directories to keep
             # things snappy. Not required for correctness.
@@ -1389,25 +1934,22 @@ class Repository:
                 "venv",
             }
             if "mzbuild.yml" in files:
-                image = Image(self.rd, Path(path))
-                if not image.name:
-                    raise ValueError(f"config at {path} missing name")
-                if image.name in self.images:
-                    raise ValueError(f"image {image.name} exists twice")
-                self.images[image.name] = image
+                self._add_image(Image(self.rd, Path(path)))
             if "mzcompose.py" in files:
-                name = Path(path).name
-                if name in self.compositions:
-                    raise ValueError(f"composition {name} exists twice")
-                self.compositions[name] = Path(path)
-
-        # Validate dependencies.
-        for image in self.images.values():
-            for d in image.depends_on:
-                if d not in self.images:
-                    raise ValueError(
-                        f"image {image.name} depends on non-existent image {d}"
-                    )
+                self._add_composition(Path(path))
+
+    def _add_image(self, image: Image) -> None:
+        if not image.name:
+            raise ValueError(f"config at {image.path} missing name")
+        if image.name in self.images:
+            raise ValueError(f"image {image.name} exists twice")
+        self.images[image.name] = image
+
+    def _add_composition(self, path: Path) -> None:
+        name = path.name
+        if name in self.compositions:
+            raise ValueError(f"composition {name} exists twice")
+        self.compositions[name] = path
 
     @staticmethod
     def install_arguments(parser: argparse.ArgumentParser) -> None:
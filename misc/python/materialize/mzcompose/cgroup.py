@@ -0,0 +1,182 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Resource usage of Docker containers, read from their cgroup v2 files.
+
+Reading the files is much cheaper than `docker stats --no-stream`, which
+blocks for a second or two to compute CPU percentages, so the memory usage of
+a container can be sampled frequently while a benchmark runs.
+"""
+
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# The files read by `ContainerCgroup.stats`, in this order. `memory.peak` is
+# only available as of Linux 5.19.
+STAT_FILES = ["memory.current", "memory.stat", "cpu.stat", "memory.peak"]
+
+
+class CgroupUnavailable(Exception):
+    """The cgroup v2 files of the container can not be read."""
+
+
+@dataclass
+class CgroupStats:
+    """A snapshot of the resource usage of a container.
+
+    Attributes:
+        memory_usage: The memory in use in bytes, excluding inactive file
+            pages, like `docker stats` reports it.
+        memory_current: The total memory charged to the container in bytes.
+        memory_peak: The highest `memory_current` seen since the container
+            started, if the kernel reports it.
+        cpu_usage_usec: The CPU time consumed since the container started.
+    """
+
+    memory_usage: int
+    memory_current: int
+    memory_peak: int | None
+    cpu_usage_usec: int
+
+
+class ContainerCgroup:
+    """The cgroup of a running Docker container.
+
+    The files are read directly if the cgroup hierarchy of the container is
+    visible to this process, and via `docker exec` otherwise, e.g. when
+    running inside of the ci-builder container.
+    """
+
+    def __init__(self, container_id: str) -> None:
+        self.container_id = container_id
+        self._path: Path | None = None
+        for path in [
+            # systemd cgroup driver
+            CGROUP_ROOT / "system.slice" / f"docker-{container_id}.scope",
+            # cgroupfs cgroup driver
+            CGROUP_ROOT / "docker" / container_id,
+        ]:
+            if (path / "memory.current").exists():
+                self._path = path
+                break
+
+    def _read(self) -> list[str]:
+        if self._path is not None:
+            contents = []
+            for file in STAT_FILES:
+                try:
+                    contents.append((self._path / file).read_text())
+                except FileNotFoundError:
+                    if file != "memory.peak" or not self._path.exists():
+                        raise CgroupUnavailable(self.container_id)
+                    contents.append("")
+            return contents
+
+        # The container's own cgroup is mounted at the cgroup root within its
+        # cgroup namespace. Separate the files by NUL bytes, which they do not
+        # contain.
+        script = "; ".join(
+            f"cat {CGROUP_ROOT / file} 2>/dev/null; printf '\\0'" for file in STAT_FILES
+        )
+        proc = subprocess.run(
+            ["docker", "exec", self.container_id, "sh", "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        contents = proc.stdout.split("\0")
+        if proc.returncode != 0 or not contents[0].strip():
+            raise CgroupUnavailable(self.container_id)
+        return contents
+
+    def stats(self) -> CgroupStats:
+        current, memory_stat, cpu_stat, peak = self._read()[: len(STAT_FILES)]
+        memory_current = int(current)
+        inactive_file = _parse_flat_keyed(memory_stat).get("inactive_file", 0)
+        return CgroupStats(
+            memory_usage=max(memory_current - inactive_file, 0),
+            memory_current=memory_current,
+            memory_peak=int(peak) if peak.strip() else None,
+            cpu_usage_usec=_parse_flat_keyed(cpu_stat)["usage_usec"],
+        )
+
+
+def _parse_flat_keyed(contents: str) -> dict[str, int]:
+    """Parse a cgroup file with one `<key> <value>` pair per line."""
+    result = {}
+    for line in contents.splitlines():
+        key, _, value = line.partition(" ")
+        if value:
+            result[key] = int(value)
+    return result
+
+
+class MemorySampler:
+    """Samples memory usage at a fixed interval in a background thread.
+
+    Args:
+        read: Returns the current memory usage in bytes.
+        interval: The time between samples in seconds.
+    """
+
+    def __init__(self, read: Callable[[], int], interval: float) -> None:
+        self._read = read
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._samples: list[tuple[float, int]] = []
+        self._error: Exception | None = None
+
+    def __enter__(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        if not self._samples:
+            assert self._error is not None
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            self._sample()
+            if self._stop.wait(self._interval):
+                # Always include the state at the end of the sampled period
+                self._sample()
+                return
+
+    def _sample(self) -> None:
+        try:
+            self._samples.append((time.monotonic(), self._read()))
+        except Exception as e:
+            # The container might be restarted by the workload, skip the
+            # samples until it is back.
+            self._error = e
+
+    def peak(self) -> int:
+        """The highest memory usage sampled."""
+        return max(value for _, value in self._samples)
+
+    def time_weighted_mean(self) -> float:
+        """The mean memory usage over the sampled period, interpolating
+        linearly between samples."""
+        duration = self._samples[-1][0] - self._samples[0][0]
+        if duration <= 0:
+            return float(self._samples[0][1])
+        area = 0.0
+        for (t0, v0), (t1, v1) in zip(self._samples, self._samples[1:]):
+            area += (t1 - t0) * (v0 + v1) / 2
+        return area / duration
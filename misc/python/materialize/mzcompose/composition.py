@@ -17,6 +17,7 @@ documentation][user-docs].
 
 import argparse
 import copy
+import functools
 import importlib
 import importlib.abc
 import importlib.util
@@ -45,6 +46,11 @@ from psycopg import Connection, Cursor
 
 from materialize import MZ_ROOT, buildkite, mzbuild, spawn, ui
 from materialize.mzcompose import cluster_replica_size_map, loader
+from materialize.mzcompose.cgroup import (
+    CgroupStats,
+    CgroupUnavailable,
+    ContainerCgroup,
+)
 from materialize.mzcompose.service import Service as MzComposeService
 from materialize.mzcompose.services.materialized import (
     LEADER_STATUS_HEALTHCHECK,
@@ -78,6 +84,9 @@ FILTERED_ARGS = [
     "cluster-replica-sizes=",
 ]
 
+# `docker compose` commands which never change the containers of a composition.
+READ_ONLY_COMPOSE_COMMANDS = {"config", "exec", "images", "logs", "port", "ps", "top"}
+
 
 class Service:
     def __init__(self, name: str, idle: bool = False):
@@ -113,6 +122,31 @@ class WorkflowArgumentParser(argparse.ArgumentParser):
         return super().parse_known_args(args or self.args, namespace)
 
 
+def _invalidating_published_ports(
+    invoke: Callable[..., subprocess.CompletedProcess]
+) -> Callable[..., subprocess.CompletedProcess]:
+    """Drop the cached published ports around `docker compose` commands.
+
+    Any command other than a read-only one might (re)create containers and
+    thereby change their public ports.
+    """
+
+    @functools.wraps(invoke)
+    def wrapper(
+        self: "Composition", *args: str, **kwargs: Any
+    ) -> subprocess.CompletedProcess:
+        changes_containers = not args or args[0] not in READ_ONLY_COMPOSE_COMMANDS
+        if changes_containers:
+            self.invalidate_published_ports()
+        try:
+            return invoke(self, *args, **kwargs)
+        finally:
+            if changes_containers:
+                self.invalidate_published_ports()
+
+    return wrapper
+
+
 class Composition:
     """A loaded mzcompose.py file."""
 
@@ -139,6 +173,12 @@ class Composition:
         self.sources_and_sinks_ignored_from_validation = set()
         self.is_sanity_restart_mz = sanity_restart_mz
         self.current_test_case_name_override: str | None = None
+        self._published_ports: dict[str, dict[str, int]] = {}
+        self._published_ports_generation = 0
+        self._published_ports_lock = threading.Lock()
+        self.cpuset: str | None = None
+        self._cgroups: dict[str, ContainerCgroup] = {}
+        self._cgroups_available = True
 
         if name in self.repo.compositions:
             self.path = self.repo.compositions[name]
@@ -294,6 +334,47 @@ class Composition:
 
         return deps
 
+    def sibling(self, project_name: str, cpuset: str | None = None) -> "Composition":
+        """Return a copy of this composition that runs in its own Docker
+        Compose project.
+
+        The copy starts out with the same service definitions, but its
+        containers, networks and volumes are separate from this composition's,
+        so that both can run the same services side by side.
+
+        Args:
+            project_name: The name of the Docker Compose project of the copy.
+            cpuset: If set, pin all containers of the copy to these CPUs, in
+                the format of `docker run --cpuset-cpus`.
+        """
+        # Only the repository, the workflows and the dependencies are shared,
+        # which are not modified after loading. All other mutable state,
+        # including connections and open files, is the sibling's own.
+        sibling = copy.copy(self)
+        sibling.project_name = project_name
+        sibling.cpuset = cpuset
+        sibling.compose = copy.deepcopy(self.compose)
+        sibling.conns = {}
+        sibling.files = {}
+        sibling.test_results = OrderedDict()
+        sibling.sources_and_sinks_ignored_from_validation = set(
+            self.sources_and_sinks_ignored_from_validation
+        )
+        sibling._published_ports = {}
+        sibling._published_ports_generation = 0
+        sibling._published_ports_lock = threading.Lock()
+        sibling._cgroups = {}
+        return sibling
+
+    def _rendered_compose(self) -> dict[str, Any]:
+        if self.cpuset is None:
+            return self.compose
+        compose = copy.deepcopy(self.compose)
+        for config in compose["services"].values():
+            config["cpuset"] = self.cpuset
+        return compose
+
+    @_invalidating_published_ports
     def invoke(
         self,
         *args: str,
@@ -353,7 +434,7 @@ class Composition:
         if not file:
             file = TemporaryFile(mode="w")
             os.set_inheritable(file.fileno(), True)
-            yaml.dump(self.compose, file)
+            yaml.dump(self._rendered_compose(), file)
             os.fsync(file.fileno())
             self.files[thread_id] = file
 
@@ -478,12 +559,21 @@ class Composition:
     def port(self, service: str, private_port: int | str) -> int:
         """Get the public port for a service's private port.
 
-        Delegates to `docker compose port`. See that command's help for details.
+        The published ports of a service are resolved with a single `docker
+        compose ps` call and cached until the next `docker compose` command
+        that could change the service's containers. Falls back to `docker
+        compose port`, see that command's help for details.
 
         Args:
             service: The name of a service in the composition.
             private_port: A private port exposed by the service.
         """
+        port, _, protocol = str(private_port).partition("/")
+        key = f"{port}/{protocol or 'tcp'}"
+        public_port = self.published_ports(service).get(key)
+        if public_port is not None:
+            return public_port
+
         proc = self.invoke(
             "port", service, str(private_port), capture=True, silent=True
         )
@@ -494,6 +584,54 @@ class Composition:
             )
         return int(proc.stdout.split(":")[1])
 
+    def published_ports(self, service: str) -> dict[str, int]:
+        """Get all public ports of a running service.
+
+        Delegates to `docker compose ps`. The result is cached until the next
+        `docker compose` command that could change the service's containers.
+
+        Args:
+            service: The name of a service in the composition.
+
+        Returns:
+            A mapping from each published private port, in the form
+            `"<port>/<protocol>"`, to its public port.
+        """
+        with self._published_ports_lock:
+            if service in self._published_ports:
+                return self._published_ports[service]
+            generation = self._published_ports_generation
+
+        output = self.invoke(
+            "ps", "--format", "json", service, capture=True, silent=True
+        ).stdout.strip()
+        # Older versions of Docker Compose print a single JSON array, newer
+        # ones print one JSON object per line.
+        if output.startswith("["):
+            containers = json.loads(output)
+        else:
+            containers = [json.loads(line) for line in output.splitlines() if line]
+
+        ports: dict[str, int] = {}
+        # `docker compose port` reports the first container of the service.
+        for container in sorted(containers, key=lambda c: c.get("Name", ""))[:1]:
+            for publisher in container.get("Publishers") or []:
+                if publisher.get("PublishedPort"):
+                    key = f"{publisher['TargetPort']}/{publisher['Protocol']}"
+                    ports.setdefault(key, int(publisher["PublishedPort"]))
+
+        with self._published_ports_lock:
+            # Don't cache the ports if the containers changed in the meantime.
+            if ports and generation == self._published_ports_generation:
+                self._published_ports[service] = ports
+        return ports
+
+    def invalidate_published_ports(self) -> None:
+        """Forget all cached public ports of the composition's services."""
+        with self._published_ports_lock:
+            self._published_ports = {}
+            self._published_ports_generation += 1
+
     def default_port(self, service: str) -> int:
         """Get the default public port for a service.
 
@@ -1250,7 +1388,9 @@ class Composition:
             self.wait(*services, expect_exit_code=137 if signal == "SIGKILL" else None)
 
     def is_running(self, container_name: str) -> bool:
-        qualified_container_name = f"{self.name}-{container_name}-1"
+        qualified_container_name = (
+            f"{self.project_name or self.name}-{container_name}-1"
+        )
         output_str = self.invoke(
             "ps",
             "--filter",
@@ -1355,7 +1495,7 @@ class Composition:
             force: Whether to force the removal (i.e., don't error if the
                 volume does not exist).
         """
-        volumes = tuple(f"{self.name}_{v}" for v in volumes)
+        volumes = tuple(f"{self.project_name or self.name}_{v}" for v in volumes)
         spawn.runv(
             ["docker", "volume", "rm", *(["--force"] if force else []), *volumes]
         )
@@ -1413,7 +1553,42 @@ class Composition:
             bufsize=1,
         ).stdout
 
+    def cgroup(self, service: str) -> ContainerCgroup:
+        """Return the cgroup of the specified service's container.
+
+        The cgroup is cached until it can no longer be read, e.g. because the
+        container was recreated.
+        """
+        cgroup = self._cgroups.get(service)
+        if cgroup is None:
+            container_id = self.container_id(service)
+            assert container_id is not None, f"service {service} is not running"
+            cgroup = ContainerCgroup(container_id)
+            self._cgroups[service] = cgroup
+        return cgroup
+
+    def cgroup_stats(self, service: str) -> CgroupStats:
+        """Read the resource usage of the specified service's container from
+        its cgroup v2 files.
+
+        Raises:
+            CgroupUnavailable: The host does not use cgroup v2.
+        """
+        try:
+            return self.cgroup(service).stats()
+        except CgroupUnavailable:
+            # The container might have been recreated since
+            self._cgroups.pop(service, None)
+            return self.cgroup(service).stats()
+
     def mem(self, service: str) -> int:
+        """Return the memory usage of the specified service in bytes."""
+        if self._cgroups_available:
+            try:
+                return self.cgroup_stats(service).memory_usage
+            except CgroupUnavailable:
+                self._cgroups_available = False
+
         stats_str = self.stats(service)
         stats = json.loads(stats_str)
         assert service in stats["Name"]
@@ -1435,6 +1610,7 @@ class Composition:
         caller: Traceback | None = None,
         mz_service: str | None = None,
         quiet: bool = False,
+        check_running: bool = True,
     ) -> subprocess.CompletedProcess:
         """Run a string as a testdrive script.
 
@@ -1445,6 +1621,10 @@ class Composition:
             persistent: Whether a persistent testdrive container will be used.
             caller: The python source line that invoked testdrive()
             mz_service: The Materialize service name to target
+            check_running: Whether to check that the testdrive service is
+                running before executing the script. Otherwise the service is
+                only started, and the script executed again, if executing it
+                failed because the service is not running.
         """
 
         caller = caller or getframeinfo(stack()[1][0])
@@ -1457,17 +1637,26 @@ class Composition:
                 f"--persist-consensus-url=postgres://root@{mz_service}:26257?options=--search_path=consensus",
             ]
 
-        if not self.is_running(service):
+        def run() -> subprocess.CompletedProcess:
+            return self.exec(
+                service,
+                *args,
+                stdin=input,
+                capture_and_print=not quiet,
+                capture=quiet,
+                capture_stderr=quiet,
+            )
+
+        if check_running and not self.is_running(service):
             self.up(Service(service, idle=True))
 
-        return self.exec(
-            service,
-            *args,
-            stdin=input,
-            capture_and_print=not quiet,
-            capture=quiet,
-            capture_stderr=quiet,
-        )
+        try:
+            return run()
+        except CommandFailureCausedUIError:
+            if check_running or self.is_running(service):
+                raise
+            self.up(Service(service, idle=True))
+            return run()
 
     def enable_minio_versioning(self) -> None:
         self.up("minio", Service("mc", idle=True))
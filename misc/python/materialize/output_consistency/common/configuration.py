@@ -34,6 +34,7 @@ class ConsistencyTestConfiguration:
         disable_predefined_queries: bool,
         query_output_mode: QueryOutputMode,
         vertical_join_tables: int,
+        parallel_strategy_execution: bool = False,
     ):
         self.scenario = scenario
         self.queries_per_tx = queries_per_tx
@@ -52,6 +53,7 @@ class ConsistencyTestConfiguration:
         self.disable_predefined_queries = disable_predefined_queries
         self.query_output_mode = query_output_mode
         self.vertical_join_tables = vertical_join_tables
+        self.parallel_strategy_execution = parallel_strategy_execution
 
     def validate(self) -> None:
         if self.max_runtime_in_sec == 0 and self.max_iterations == 0:
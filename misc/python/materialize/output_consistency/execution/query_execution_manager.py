@@ -6,6 +6,7 @@
 # As of the Change Date specified in that file, in accordance with
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from materialize.output_consistency.common.configuration import (
@@ -24,6 +25,7 @@ from materialize.output_consistency.query.query_format import QueryOutputFormat
 from materialize.output_consistency.query.query_result import (
     QueryExecution,
     QueryFailure,
+    QueryOutcome,
     QueryResult,
 )
 from materialize.output_consistency.query.query_template import QueryTemplate
@@ -55,6 +57,7 @@ class QueryExecutionManager:
         self.comparator = comparator
         self.output_printer = output_printer
         self.query_counter = 0
+        self.thread_pool: ThreadPoolExecutor | None = None
 
     def setup_database_objects(
         self,
@@ -151,46 +154,26 @@ class QueryExecutionManager:
             # print the header with the query before the execution to have information if it gets stuck
             self.print_query_header(query_id, query_execution, collapsed=True)
 
-        for strategy in evaluation_strategies:
-            sql_query_string = query_template.to_sql(
-                strategy,
-                QueryOutputFormat.SINGLE_LINE,
-                ALL_QUERY_COLUMNS_BY_INDEX_SELECTION,
-                self.config.query_output_mode,
-            )
-
-            start_time = datetime.now()
-
-            try:
-                self.executors.get_executor(strategy).before_query_execution()
-
-                start_time = datetime.now()
-                data = self.executors.get_executor(strategy).query(sql_query_string)
-                duration = self._get_duration_in_ms(start_time)
-
-                self.executors.get_executor(strategy).after_query_execution()
+        retry_with_smaller_query = self.shall_retry_with_smaller_query(query_template)
+        strategy_outcomes = self._execute_query_with_strategies(
+            query_template, evaluation_strategies, retry_with_smaller_query
+        )
 
-                result = QueryResult(
-                    strategy, sql_query_string, query_template.column_count(), data
+        for outcome_with_duration in strategy_outcomes:
+            if outcome_with_duration is None:
+                # not executed because an earlier strategy with the same executor failed
+                continue
+
+            outcome, duration = outcome_with_duration
+            if isinstance(outcome, QueryFailure) and retry_with_smaller_query:
+                # abort and retry with smaller query
+                # this will discard the outcomes of all strategies
+                return self.split_and_retry_queries(
+                    query_template, query_id, evaluation_strategies
                 )
-                query_execution.outcomes.append(result)
-                query_execution.durations.append(duration)
-            except SqlExecutionError as err:
-                duration = self._get_duration_in_ms(start_time)
-                self.rollback_tx(strategy, start_new_tx=True)
-
-                if self.shall_retry_with_smaller_query(query_template):
-                    # abort and retry with smaller query
-                    # this will discard the outcomes of all strategies
-                    return self.split_and_retry_queries(
-                        query_template, query_id, evaluation_strategies
-                    )
 
-                failure = QueryFailure(
-                    strategy, sql_query_string, query_template.column_count(), str(err)
-                )
-                query_execution.outcomes.append(failure)
-                query_execution.durations.append(duration)
+            query_execution.outcomes.append(outcome)
+            query_execution.durations.append(duration)
 
         if self.config.dry_run:
             return [ValidationOutcome()]
@@ -200,6 +183,92 @@ class QueryExecutionManager:
 
         return [validation_outcome]
 
+    def _execute_query_with_strategies(
+        self,
+        query_template: QueryTemplate,
+        evaluation_strategies: list[EvaluationStrategy],
+        stop_on_failure: bool,
+    ) -> list[tuple[QueryOutcome, float] | None]:
+        """
+        Returns the outcome and duration for each strategy in the given order, or None if a strategy was skipped.
+        Strategies using different executors run concurrently, strategies sharing an executor (and thereby a
+        connection) run one after another. The latter stop at the first failure if `stop_on_failure` is set.
+        """
+        strategy_indices_by_executor: dict[int, list[int]] = dict()
+        for index, strategy in enumerate(evaluation_strategies):
+            strategy_indices_by_executor.setdefault(
+                id(self.executors.get_executor(strategy)), []
+            ).append(index)
+
+        outcomes: list[tuple[QueryOutcome, float] | None] = [None] * len(
+            evaluation_strategies
+        )
+
+        def execute_strategies(strategy_indices: list[int]) -> None:
+            for index in strategy_indices:
+                outcome, duration = self._execute_query_with_strategy(
+                    query_template, evaluation_strategies[index]
+                )
+                outcomes[index] = (outcome, duration)
+
+                if isinstance(outcome, QueryFailure) and stop_on_failure:
+                    break
+
+        if (
+            not self.config.parallel_strategy_execution
+            or len(strategy_indices_by_executor) == 1
+        ):
+            for strategy_indices in strategy_indices_by_executor.values():
+                execute_strategies(strategy_indices)
+        else:
+            if self.thread_pool is None:
+                self.thread_pool = ThreadPoolExecutor(
+                    max_workers=len(strategy_indices_by_executor),
+                    thread_name_prefix="query-execution",
+                )
+            # consume the results to re-raise unexpected errors
+            list(
+                self.thread_pool.map(
+                    execute_strategies, strategy_indices_by_executor.values()
+                )
+            )
+
+        return outcomes
+
+    def _execute_query_with_strategy(
+        self, query_template: QueryTemplate, strategy: EvaluationStrategy
+    ) -> tuple[QueryOutcome, float]:
+        sql_query_string = query_template.to_sql(
+            strategy,
+            QueryOutputFormat.SINGLE_LINE,
+            ALL_QUERY_COLUMNS_BY_INDEX_SELECTION,
+            self.config.query_output_mode,
+        )
+
+        start_time = datetime.now()
+
+        try:
+            self.executors.get_executor(strategy).before_query_execution()
+
+            start_time = datetime.now()
+            data = self.executors.get_executor(strategy).query(sql_query_string)
+            duration = self._get_duration_in_ms(start_time)
+
+            self.executors.get_executor(strategy).after_query_execution()
+
+            result = QueryResult(
+                strategy, sql_query_string, query_template.column_count(), data
+            )
+            return result, duration
+        except SqlExecutionError as err:
+            duration = self._get_duration_in_ms(start_time)
+            self.rollback_tx(strategy, start_new_tx=True)
+
+            failure = QueryFailure(
+                strategy, sql_query_string, query_template.column_count(), str(err)
+            )
+            return failure, duration
+
     def _get_duration_in_ms(self, start_time: datetime) -> float:
         end_time = datetime.now()
         duration = end_time - start_time
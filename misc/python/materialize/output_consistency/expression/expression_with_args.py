@@ -55,12 +55,24 @@ class ExpressionWithArgs(Expression):
         self.pattern = operation.to_pattern(len(args))
         self.return_type_spec = operation.return_type_spec
         self.args = args
+        # the pattern split at the placeholders, the args go in between
+        self._pattern_parts = self.pattern.split(EXPRESSION_PLACEHOLDER)
+        # An expression is not modified after its creation, these values are computed when first needed. The
+        # characteristics are only cached when all rows are selected because otherwise they depend on the data
+        # sources, which are assigned later.
+        self._hash: int | None = None
+        self._return_type_category: DataTypeCategory | None = None
+        self._involved_characteristics_of_all_rows: (
+            set[ExpressionCharacteristics] | None
+        ) = None
 
     def hash(self) -> int:
-        return stable_int_hash(
-            self.operation.to_pattern(self.count_args()),
-            *[str(arg.hash()) for arg in self.args],
-        )
+        if self._hash is None:
+            self._hash = stable_int_hash(
+                self.pattern,
+                *[str(arg.hash()) for arg in self.args],
+            )
+        return self._hash
 
     def count_args(self) -> int:
         return len(self.args)
@@ -71,20 +83,17 @@ class ExpressionWithArgs(Expression):
     def to_sql(
         self, sql_adjuster: SqlDialectAdjuster, include_alias: bool, is_root_level: bool
     ) -> str:
-        sql: str = self.pattern
-
-        for arg in self.args:
-            sql = sql.replace(
-                EXPRESSION_PLACEHOLDER,
-                arg.to_sql(sql_adjuster, include_alias, False),
-                1,
-            )
-
-        if len(self.args) != self.pattern.count(EXPRESSION_PLACEHOLDER):
+        if len(self.args) != len(self._pattern_parts) - 1:
             raise RuntimeError(
                 f"Not enough arguments to fill all placeholders in pattern {self.pattern}"
             )
 
+        sql_parts = [self._pattern_parts[0]]
+        for arg, pattern_part in zip(self.args, self._pattern_parts[1:]):
+            sql_parts.append(arg.to_sql(sql_adjuster, include_alias, False))
+            sql_parts.append(pattern_part)
+        sql = "".join(sql_parts)
+
         if (
             is_root_level
             and self.resolve_return_type_category() == DataTypeCategory.DATE_TIME
@@ -98,6 +107,11 @@ class ExpressionWithArgs(Expression):
         return self.return_type_spec
 
     def resolve_return_type_category(self) -> DataTypeCategory:
+        if self._return_type_category is None:
+            self._return_type_category = self._resolve_return_type_category()
+        return self._return_type_category
+
+    def _resolve_return_type_category(self) -> DataTypeCategory:
         input_type_hints = InputArgTypeHints()
 
         if self.return_type_spec.indices_of_required_input_type_hints is not None:
@@ -127,18 +141,32 @@ class ExpressionWithArgs(Expression):
     def recursively_collect_involved_characteristics(
         self, row_selection: DataRowSelection
     ) -> set[ExpressionCharacteristics]:
-        involved_characteristics: set[ExpressionCharacteristics] = set()
-        involved_characteristics = involved_characteristics.union(
-            self.own_characteristics
-        )
+        includes_all_rows = row_selection.includes_all_of_all_sources()
 
-        for arg in self.args:
-            involved_characteristics = involved_characteristics.union(
+        if includes_all_rows and self._involved_characteristics_of_all_rows is not None:
+            return self._involved_characteristics_of_all_rows
+
+        involved_characteristics = self.combine_involved_characteristics(
+            [
                 arg.recursively_collect_involved_characteristics(row_selection)
-            )
+                for arg in self.args
+            ]
+        )
+
+        if includes_all_rows:
+            self._involved_characteristics_of_all_rows = involved_characteristics
 
         return involved_characteristics
 
+    def combine_involved_characteristics(
+        self, characteristics_of_args: list[set[ExpressionCharacteristics]]
+    ) -> set[ExpressionCharacteristics]:
+        """
+        :param characteristics_of_args: the involved characteristics of each arg
+        :return: the own characteristics together with the ones of the args
+        """
+        return self.own_characteristics.union(*characteristics_of_args)
+
     def collect_leaves(self) -> list[LeafExpression]:
         leaves = []
 
@@ -44,6 +44,10 @@ from materialize.output_consistency.operation.operation_param import OperationPa
 from materialize.output_consistency.operation.volatile_data_operation_param import (
     VolatileDataOperationParam,
 )
+from materialize.output_consistency.selection.operation_index import (
+    OperationIndex,
+    WeightedOperations,
+)
 from materialize.output_consistency.selection.randomized_picker import RandomizedPicker
 
 NESTING_LEVEL_ROOT = 0
@@ -66,9 +70,12 @@ class ExpressionGenerator:
         self.selectable_operations: list[DbOperationOrFunction] = []
         self.operation_weights: list[float] = []
         self.operation_weights_no_aggregates: list[float] = []
-        self.operations_by_return_type_category: dict[
-            DataTypeCategory, list[DbOperationOrFunction]
-        ] = dict()
+        self.operation_index = OperationIndex(
+            self.input_data.operations_input.all_operation_types,
+            lambda operation: self.randomized_picker.convert_operation_relevance_to_number(
+                operation.relevance
+            ),
+        )
         self.types_with_values_by_category: dict[
             DataTypeCategory, list[DataTypeWithValues]
         ] = dict()
@@ -88,15 +95,6 @@ class ExpressionGenerator:
                 0 if operation.is_aggregation else self.operation_weights[index]
             )
 
-            category = operation.return_type_spec.type_category
-            operations_with_return_category = (
-                self.operations_by_return_type_category.get(category, [])
-            )
-            operations_with_return_category.append(operation)
-            self.operations_by_return_type_category[category] = (
-                operations_with_return_category
-            )
-
     def _initialize_types(self) -> None:
         for (
             data_type_with_values
@@ -111,29 +109,44 @@ class ExpressionGenerator:
         include_aggregates: bool,
         accept_op_filter: Callable[[DbOperationOrFunction], bool] | None = None,
     ) -> DbOperationOrFunction:
+        if accept_op_filter is None:
+            # use the precomputed index
+            return self.pick_random_operation_of_category(
+                DataTypeCategory.ANY, aggregation=None if include_aggregates else False
+            )
+
         all_weights = (
             self.operation_weights
             if include_aggregates
             else self.operation_weights_no_aggregates
         )
 
-        if accept_op_filter is not None:
-            selected_operations = []
-            weights = []
-            for index, operation in enumerate(self.selectable_operations):
-                if accept_op_filter(operation):
-                    selected_operations.append(operation)
-                    weights.append(all_weights[index])
-        else:
-            selected_operations = self.selectable_operations
-            weights = all_weights
+        selected_operations = []
+        weights = []
+        for index, operation in enumerate(self.selectable_operations):
+            if accept_op_filter(operation):
+                selected_operations.append(operation)
+                weights.append(all_weights[index])
 
         assert (
             len(selected_operations) > 0
-        ), f"no operations available (include_aggregates={include_aggregates}, accept_op_filter used={accept_op_filter is not None})"
+        ), f"no operations available (include_aggregates={include_aggregates}, accept_op_filter used=True)"
         assert len(selected_operations) == len(weights)
         return self.randomized_picker.random_operation(selected_operations, weights)
 
+    def pick_random_operation_of_category(
+        self, category: DataTypeCategory, aggregation: bool | None
+    ) -> DbOperationOrFunction:
+        """
+        :param category: the return type category, `DataTypeCategory.ANY` for all operations
+        :param aggregation: True for only aggregations, False for no aggregations, None for both
+        """
+        weighted_operations = self.operation_index.get(category, aggregation)
+        assert (
+            len(weighted_operations) > 0
+        ), f"no operations available (category={category}, aggregation={aggregation})"
+        return self.randomized_picker.random_weighted_operation(weighted_operations)
+
     def generate_boolean_expression(
         self,
         use_aggregation: bool,
@@ -151,17 +164,15 @@ class ExpressionGenerator:
         data_type_category: DataTypeCategory,
         nesting_level: int = NESTING_LEVEL_ROOT,
     ) -> ExpressionWithArgs | None:
-        def operation_filter(operation: DbOperationOrFunction) -> bool:
-            if operation.is_aggregation != use_aggregation:
-                return False
-
-                # Simplification: This will only include operations defined to return a boolean value but not generic
-                # operations that might return a boolean value depending on the input.
-            return operation.return_type_spec.type_category == data_type_category
-
-        return self.generate_expression_with_filter(
-            use_aggregation, storage_layout, operation_filter, nesting_level
+        # Simplification: This will only include operations defined to return a value of the category but not generic
+        # operations that might return such a value depending on the input.
+        operation = self.pick_random_operation_of_category(
+            data_type_category, aggregation=use_aggregation
         )
+        expression, _ = self.generate_expression_for_operation(
+            operation, storage_layout, nesting_level
+        )
+        return expression
 
     def generate_expression_with_filter(
         self,
@@ -394,9 +405,8 @@ class ExpressionGenerator:
                 f" must_use_aggregation={must_use_aggregation})"
             )
 
-        weights = self._get_operation_weights(suitable_operations)
-        operation = self.randomized_picker.random_operation(
-            suitable_operations, weights
+        operation = self.randomized_picker.random_weighted_operation(
+            suitable_operations
         )
 
         nested_expression, _ = self.generate_expression_for_operation(
@@ -468,51 +478,18 @@ class ExpressionGenerator:
         arg_context: ArgContext,
         must_use_aggregation: bool,
         allow_aggregation: bool,
-    ) -> list[DbOperationOrFunction]:
+    ) -> WeightedOperations:
         category = param.resolve_type_category(arg_context.args)
-        suitable_operations = self._get_all_operations_of_category(param, category)
+
+        if category != DataTypeCategory.ANY:
+            self._assert_valid_type_category_for_param(param, category)
+
         if must_use_aggregation:
-            return self._get_only_aggregate_operations(suitable_operations)
+            return self.operation_index.get(category, aggregation=True)
         elif not allow_aggregation:
-            return self._get_without_aggregate_operations(suitable_operations)
+            return self.operation_index.get(category, aggregation=False)
         else:
-            return suitable_operations
-
-    def _get_all_operations_of_category(
-        self, param: OperationParam, category: DataTypeCategory
-    ) -> list[DbOperationOrFunction]:
-        if category == DataTypeCategory.ANY:
-            return self.input_data.operations_input.all_operation_types
-
-        self._assert_valid_type_category_for_param(param, category)
-
-        return self.operations_by_return_type_category.get(category, [])
-
-    def _get_without_aggregate_operations(
-        self, operations: list[DbOperationOrFunction]
-    ) -> list[DbOperationOrFunction]:
-        return self._get_operations_with_filter(
-            operations, lambda op: not op.is_aggregation
-        )
-
-    def _get_only_aggregate_operations(
-        self, operations: list[DbOperationOrFunction]
-    ) -> list[DbOperationOrFunction]:
-        return self._get_operations_with_filter(
-            operations, lambda op: op.is_aggregation
-        )
-
-    def _get_operations_with_filter(
-        self,
-        operations: list[DbOperationOrFunction],
-        op_filter: Callable[[DbOperationOrFunction], bool],
-    ) -> list[DbOperationOrFunction]:
-        matching_operations = []
-        for operation in operations:
-            if op_filter(operation):
-                matching_operations.append(operation)
-
-        return matching_operations
+            return self.operation_index.get(category, aggregation=None)
 
     def _get_operation_weights(
         self, operations: list[DbOperationOrFunction]
@@ -60,6 +60,13 @@ class GenericInconsistencyIgnoreFilter:
 
 
 class PreExecutionInconsistencyIgnoreFilterBase:
+    # The involved characteristics of the (sub-)expressions of the expression that is currently being checked, so
+    # that they are collected only once and not again at every level of the expression tree. Keyed by the id of the
+    # expression.
+    _involved_characteristics_cache: (
+        dict[int, set[ExpressionCharacteristics]] | None
+    ) = None
+
     def shall_ignore_expression(
         self, expression: Expression, row_selection: DataRowSelection
     ) -> IgnoreVerdict:
@@ -75,6 +82,16 @@ class PreExecutionInconsistencyIgnoreFilterBase:
         expression: ExpressionWithArgs,
         row_selection: DataRowSelection,
     ) -> IgnoreVerdict:
+        if self._involved_characteristics_cache is None:
+            # the data sources and row selection do not change while checking the expression
+            self._involved_characteristics_cache = dict()
+            try:
+                return self._shall_ignore_expression_with_args(
+                    expression, row_selection
+                )
+            finally:
+                self._involved_characteristics_cache = None
+
         # check expression itself
         expression_verdict = self._visit_expression_with_args(expression, row_selection)
         if expression_verdict.ignore:
@@ -93,8 +110,8 @@ class PreExecutionInconsistencyIgnoreFilterBase:
         expression: ExpressionWithArgs,
         row_selection: DataRowSelection,
     ) -> IgnoreVerdict:
-        expression_characteristics = (
-            expression.recursively_collect_involved_characteristics(row_selection)
+        expression_characteristics = self._collect_involved_characteristics(
+            expression, row_selection
         )
 
         invocation_verdict = self._matches_problematic_operation_or_function_invocation(
@@ -123,6 +140,29 @@ class PreExecutionInconsistencyIgnoreFilterBase:
 
         return NoIgnore()
 
+    def _collect_involved_characteristics(
+        self, expression: Expression, row_selection: DataRowSelection
+    ) -> set[ExpressionCharacteristics]:
+        if self._involved_characteristics_cache is None or not isinstance(
+            expression, ExpressionWithArgs
+        ):
+            return expression.recursively_collect_involved_characteristics(
+                row_selection
+            )
+
+        characteristics = self._involved_characteristics_cache.get(id(expression))
+
+        if characteristics is None:
+            characteristics = expression.combine_involved_characteristics(
+                [
+                    self._collect_involved_characteristics(arg, row_selection)
+                    for arg in expression.args
+                ]
+            )
+            self._involved_characteristics_cache[id(expression)] = characteristics
+
+        return characteristics
+
     def _matches_problematic_operation_or_function_invocation(
         self,
         expression: ExpressionWithArgs,
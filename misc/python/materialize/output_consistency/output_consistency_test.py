@@ -85,6 +85,7 @@ class OutputConsistencyTest:
             args.max_failures_until_abort,
             args.avoid_expressions_expecting_db_error,
             args.disable_predefined_queries,
+            args.parallel_strategy_execution,
             query_output_mode=query_output_mode,
         )
 
@@ -124,6 +125,12 @@ class OutputConsistencyTest:
             type=bool,
             action=argparse.BooleanOptionalAction,
         )
+        parser.add_argument(
+            "--parallel-strategy-execution",
+            default=True,
+            type=bool,
+            action=argparse.BooleanOptionalAction,
+        )
 
         return parser.parse_args()
 
@@ -141,6 +148,7 @@ class OutputConsistencyTest:
         max_failures_until_abort: int,
         avoid_expressions_expecting_db_error: bool,
         disable_predefined_queries: bool,
+        parallel_strategy_execution: bool,
         query_output_mode: QueryOutputMode,
     ) -> ConsistencyTestSummary:
         input_data = self.create_input_data()
@@ -168,6 +176,7 @@ class OutputConsistencyTest:
             disable_predefined_queries=disable_predefined_queries,
             query_output_mode=query_output_mode,
             vertical_join_tables=4,
+            parallel_strategy_execution=parallel_strategy_execution,
         )
 
         output_printer = OutputPrinter(input_data, config.query_output_mode)
@@ -0,0 +1,80 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+from collections.abc import Callable
+from itertools import accumulate
+
+from materialize.output_consistency.data_type.data_type_category import DataTypeCategory
+from materialize.output_consistency.operation.operation import (
+    DbOperationOrFunction,
+)
+
+
+class WeightedOperations:
+    """Operations together with the cumulative sums of their weights, which allow a weighted random pick by
+    bisection"""
+
+    def __init__(
+        self, operations: list[DbOperationOrFunction], weights: list[float]
+    ) -> None:
+        assert len(operations) == len(weights)
+        self.operations = operations
+        self.cumulative_weights = list(accumulate(weights))
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+
+class OperationIndex:
+    """Groups the operations by their return type category and whether they are aggregations once, so that the
+    suitable operations and their weights do not need to be determined again for each pick
+    """
+
+    def __init__(
+        self,
+        operations: list[DbOperationOrFunction],
+        get_weight: Callable[[DbOperationOrFunction], float],
+    ) -> None:
+        self._weighted_operations: dict[
+            tuple[DataTypeCategory, bool | None], WeightedOperations
+        ] = dict()
+
+        categories = {DataTypeCategory.ANY}.union(
+            operation.return_type_spec.type_category for operation in operations
+        )
+        operations_with_weights = [
+            (operation, get_weight(operation)) for operation in operations
+        ]
+
+        for category in categories:
+            for aggregation in [True, False, None]:
+                selected = [
+                    (operation, weight)
+                    for operation, weight in operations_with_weights
+                    if (
+                        category == DataTypeCategory.ANY
+                        or operation.return_type_spec.type_category == category
+                    )
+                    and (aggregation is None or operation.is_aggregation == aggregation)
+                ]
+                self._weighted_operations[(category, aggregation)] = WeightedOperations(
+                    [operation for operation, _ in selected],
+                    [weight for _, weight in selected],
+                )
+
+        self._empty = WeightedOperations([], [])
+
+    def get(
+        self, category: DataTypeCategory, aggregation: bool | None
+    ) -> WeightedOperations:
+        """
+        :param category: the return type category of the operations, `DataTypeCategory.ANY` for all operations
+        :param aggregation: True for only aggregations, False for no aggregations, None for both
+        """
+        return self._weighted_operations.get((category, aggregation), self._empty)
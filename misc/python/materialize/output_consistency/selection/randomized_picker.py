@@ -29,6 +29,9 @@ from materialize.output_consistency.query.join import (
     JoinOperator,
     JoinTarget,
 )
+from materialize.output_consistency.selection.operation_index import (
+    WeightedOperations,
+)
 
 
 class RandomizedPicker:
@@ -52,6 +55,15 @@ class RandomizedPicker:
     ) -> DbOperationOrFunction:
         return random.choices(operations, k=1, weights=weights)[0]
 
+    def random_weighted_operation(
+        self, weighted_operations: WeightedOperations
+    ) -> DbOperationOrFunction:
+        return random.choices(
+            weighted_operations.operations,
+            k=1,
+            cum_weights=weighted_operations.cumulative_weights,
+        )[0]
+
     def random_type_with_values(
         self, types_with_values: list[DataTypeWithValues]
     ) -> DataTypeWithValues:
@@ -7,6 +7,8 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import asyncio
+import itertools
 import queue
 import random
 import sqlite3
@@ -14,12 +16,16 @@ import threading
 import time
 from collections import defaultdict
 from collections.abc import Iterator, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 from textwrap import dedent
 
 import psycopg
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from materialize.mzcompose.composition import Composition
+from materialize.parallel_benchmark.hdr_histogram import HdrHistogram
 from materialize.util import PgConnInfo
 
 DB_FILE = "parallel-benchmark.db"
@@ -27,6 +33,15 @@ assert (
     sqlite3.threadsafety == 3
 ), f"Thread safety level 3 (serialized) required, but is: {sqlite3.threadsafety}"
 
+# Arrivals of an open loop that started later than this after their scheduled
+# time, in seconds, count as the client having fallen behind.
+MAX_SCHEDULE_LAG = 0.01
+
+# Granularity at which the async engine dispatches open loop arrivals, in
+# seconds. Arrivals due within one tick are started together, while their
+# measurements still use their exact scheduled time.
+SCHEDULER_TICK = 0.001
+
 
 class Measurement:
     duration: float
@@ -148,11 +163,328 @@ class SQLiteStore(MeasurementsStore):
             return (times, durations)
 
 
+class ScheduleLag:
+    """How much later than scheduled the client started the arrivals of an
+    open loop action."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.late = 0
+        self.max = 0.0
+
+    def add(self, lag: float) -> None:
+        with self.lock:
+            self.count += 1
+            if lag > MAX_SCHEDULE_LAG:
+                self.late += 1
+            self.max = max(self.max, lag)
+
+    def fell_behind(self) -> bool:
+        return self.late > self.count / 100
+
+
+# Durations are recorded in microseconds, up to an hour
+HISTOGRAM_HIGHEST = 3_600_000_000
+HISTOGRAM_STRIPES = 16
+SPILL_BATCH_SIZE = 65536
+
+
+class _ActionHistograms:
+    def __init__(self, window: float):
+        self.total = HdrHistogram(HISTOGRAM_HIGHEST, significant_digits=3)
+        self.window = window
+        self.windows: dict[int, HdrHistogram] = {}
+        self.last_timestamp = 0.0
+
+    def compact(self) -> None:
+        """Halve the number of windows by merging neighboring ones."""
+        windows: dict[int, HdrHistogram] = {}
+        for index, histogram in self.windows.items():
+            if index // 2 in windows:
+                windows[index // 2].add(histogram)
+            else:
+                windows[index // 2] = histogram
+        self.window *= 2
+        self.windows = windows
+
+
+class _Stripe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.actions: dict[str, _ActionHistograms] = {}
+        self.spill: list[tuple[str, float, float]] = []
+
+
+class HistogramStore(MeasurementsStore):
+    """Aggregates the measurements into HDR histograms per action and time
+    window, so that the memory used does not grow with the run's length.
+
+    The histograms are striped by thread to avoid contention between the
+    workers, and merged when read, so that statistics can also be queried
+    while the load phase is still running. Each thread is assigned a stripe
+    when it first adds a measurement, round-robin.
+
+    Memory is bounded by the number of stripes times `max_windows` window
+    histograms of about 26 KB per action, i.e. up to about 100 MB per action
+    with the defaults if every stripe sees every window.
+
+    Args:
+        window: The initial width of the time windows in seconds. Whenever an
+            action has more than `max_windows` windows, neighboring windows
+            are merged, doubling their width.
+        max_windows: The maximum number of time windows kept per action.
+        spill_path: If set, all raw measurements are additionally written to
+            this Parquet file, and returned by `get_data`.
+        report_interval: If set, print the throughput and latency
+            percentiles of each action at this interval in seconds.
+    """
+
+    def __init__(
+        self,
+        window: float = 1.0,
+        max_windows: int = 256,
+        spill_path: Path | None = None,
+        report_interval: float | None = None,
+    ):
+        self.start_time = time.time()
+        self.window = window
+        self.max_windows = max_windows
+        self.stripes = [_Stripe() for i in range(HISTOGRAM_STRIPES)]
+        self.next_stripe = itertools.count()
+        self.thread_stripe = threading.local()
+        self.spill_path = spill_path
+        self.spill_lock = threading.Lock()
+        self.spill_writer: pq.ParquetWriter | None = None
+        self.spill_finished = False
+        self.stop_reporting = threading.Event()
+        self.reporter: threading.Thread | None = None
+        if report_interval:
+            self.reporter = threading.Thread(
+                target=self._report, args=(report_interval,), daemon=True
+            )
+            self.reporter.start()
+
+    def add(self, action: str, measurement: Measurement) -> None:
+        stripe = getattr(self.thread_stripe, "stripe", None)
+        if stripe is None:
+            # Thread idents are aligned addresses, so they cannot be used to
+            # spread the threads across the stripes.
+            stripe = self.thread_stripe.stripe = self.stripes[
+                next(self.next_stripe) % HISTOGRAM_STRIPES
+            ]
+        spill = None
+        with stripe.lock:
+            histograms = stripe.actions.get(action)
+            if histograms is None:
+                histograms = stripe.actions[action] = _ActionHistograms(self.window)
+            duration = round(measurement.duration * 1_000_000)
+            histograms.total.record(duration)
+            offset = measurement.timestamp - self.start_time
+            index = int(offset // histograms.window)
+            if (
+                index not in histograms.windows
+                and len(histograms.windows) >= self.max_windows
+            ):
+                histograms.compact()
+                index = int(offset // histograms.window)
+            window = histograms.windows.get(index)
+            if window is None:
+                window = histograms.windows[index] = HdrHistogram(
+                    HISTOGRAM_HIGHEST, significant_digits=2
+                )
+            window.record(duration)
+            histograms.last_timestamp = max(
+                histograms.last_timestamp, measurement.timestamp
+            )
+            if self.spill_path:
+                stripe.spill.append(
+                    (action, measurement.timestamp, measurement.duration * 1000)
+                )
+                if len(stripe.spill) >= SPILL_BATCH_SIZE:
+                    spill, stripe.spill = stripe.spill, []
+        if spill:
+            self._write_spill(spill)
+
+    def _write_spill(self, spill: list[tuple[str, float, float]]) -> None:
+        actions, timestamps, durations = zip(*spill)
+        table = pa.table(
+            {
+                "action": pa.array(actions, pa.string()),
+                "timestamp": pa.array(timestamps, pa.float64()),
+                "duration": pa.array(durations, pa.float64()),
+            }
+        )
+        with self.spill_lock:
+            assert not self.spill_finished, "Measurement added after reading"
+            if self.spill_writer is None:
+                assert self.spill_path
+                self.spill_writer = pq.ParquetWriter(self.spill_path, table.schema)
+            self.spill_writer.write_table(table)
+
+    def _finish_spill(self) -> None:
+        """Write out the remaining measurements, so that the file can be read."""
+        if self.spill_finished:
+            return
+        for stripe in self.stripes:
+            with stripe.lock:
+                spill, stripe.spill = stripe.spill, []
+            if spill:
+                self._write_spill(spill)
+        with self.spill_lock:
+            if self.spill_writer is not None:
+                self.spill_writer.close()
+            self.spill_finished = True
+
+    def _histograms(self, action: str) -> list[_ActionHistograms]:
+        result = []
+        for stripe in self.stripes:
+            with stripe.lock:
+                histograms = stripe.actions.get(action)
+                if histograms is not None:
+                    copy = _ActionHistograms(histograms.window)
+                    copy.total = histograms.total.copy()
+                    copy.windows = {
+                        index: window.copy()
+                        for index, window in histograms.windows.items()
+                    }
+                    copy.last_timestamp = histograms.last_timestamp
+                    result.append(copy)
+        return result
+
+    def histogram(self, action: str) -> HdrHistogram:
+        """All durations of the action in microseconds."""
+        result = HdrHistogram(HISTOGRAM_HIGHEST, significant_digits=3)
+        for histograms in self._histograms(action):
+            result.add(histograms.total)
+        return result
+
+    def timeline(self, action: str) -> list[tuple[float, float, HdrHistogram]]:
+        """The start and end timestamps of the time windows, and the durations
+        of the action in microseconds in each of them."""
+        stripes = self._histograms(action)
+        if not stripes:
+            return []
+        window = max(histograms.window for histograms in stripes)
+        merged: dict[int, HdrHistogram] = {}
+        for histograms in stripes:
+            factor = round(window / histograms.window)
+            for index, histogram in histograms.windows.items():
+                if index // factor in merged:
+                    merged[index // factor].add(histogram)
+                else:
+                    merged[index // factor] = histogram
+        return [
+            (
+                self.start_time + index * window,
+                self.start_time + (index + 1) * window,
+                merged[index],
+            )
+            for index in sorted(merged)
+        ]
+
+    def last_timestamp(self, action: str) -> float:
+        return max(
+            (histograms.last_timestamp for histograms in self._histograms(action)),
+            default=self.start_time,
+        )
+
+    def _report(self, interval: float) -> None:
+        while not self.stop_reporting.wait(interval):
+            for action in self.actions():
+                timeline = self.timeline(action)
+                # The last window is still being filled
+                if len(timeline) < 2:
+                    continue
+                start, end, histogram = timeline[-2]
+                print(
+                    f"{action[:60]}: {histogram.count / (end - start):.2f} qps, "
+                    f"p50: {histogram.percentile(50) / 1000:.2f}ms, "
+                    f"p99: {histogram.percentile(99) / 1000:.2f}ms, "
+                    f"p99.9: {histogram.percentile(99.9) / 1000:.2f}ms"
+                )
+
+    def actions(self) -> list[str]:
+        result: dict[str, None] = {}
+        for stripe in self.stripes:
+            with stripe.lock:
+                result.update(dict.fromkeys(stripe.actions))
+        return list(result)
+
+    def close(self) -> None:
+        self.stop_reporting.set()
+        if self.reporter is not None:
+            self.reporter.join()
+        self._finish_spill()
+
+    def get_data(
+        self, action: str, start_time: float, end_time: float
+    ) -> tuple[list[float], list[float]]:
+        if self.spill_path:
+            self._finish_spill()
+            if self.spill_writer is None:
+                return ([], [])
+            table = pq.read_table(
+                self.spill_path,
+                columns=["timestamp", "duration"],
+                filters=[
+                    ("action", "=", action),
+                    ("timestamp", ">=", start_time),
+                    ("timestamp", "<=", end_time),
+                ],
+            )
+            return (
+                [t - start_time for t in table["timestamp"].to_pylist()],
+                table["duration"].to_pylist(),
+            )
+
+        # Without the raw measurements, return each distinct duration seen
+        # within a time window once, at the window's center
+        times: list[float] = []
+        durations: list[float] = []
+        for start, end, histogram in self.timeline(action):
+            if end < start_time or start > end_time:
+                continue
+            values, _ = histogram.values()
+            times.extend([(start + end) / 2 - start_time] * len(values))
+            durations.extend((values / 1000).tolist())
+        return (times, durations)
+
+
 @dataclass
 class State:
     measurements: MeasurementsStore
     load_phase_duration: int | None
     periodic_dists: dict[str, int]
+    schedule_lag: defaultdict[str, ScheduleLag] = field(
+        default_factory=lambda: defaultdict(ScheduleLag)
+    )
+
+    def report_schedule_lag(self) -> None:
+        for action, lag in self.schedule_lag.items():
+            if lag.fell_behind():
+                print(
+                    f"WARNING: Client fell behind schedule for {action}: "
+                    f"{lag.late} of {lag.count} arrivals started more than "
+                    f"{MAX_SCHEDULE_LAG * 1000:.0f} ms late (max {lag.max * 1000:.0f} ms), "
+                    "the measured latencies include delays in the client"
+                )
+        self.schedule_lag.clear()
+
+
+def _ignore_query_error(query: str, e: Exception) -> bool:
+    """Whether the failed query is considered done, raises otherwise."""
+    if "deadlock detected" in str(e):
+        print(f"Deadlock detected, retrying: {query}")
+        return False
+    elif (
+        "timed out before ingesting the source's visible frontier when real-time-recency query issued"
+        in str(e)
+    ):
+        print("RTR timeout, ignoring")
+        return True
+    else:
+        raise e
 
 
 def execute_query(cur: psycopg.Cursor, query: str) -> None:
@@ -161,16 +493,18 @@ def execute_query(cur: psycopg.Cursor, query: str) -> None:
             cur.execute(query.encode())
             break
         except Exception as e:
-            if "deadlock detected" in str(e):
-                print(f"Deadlock detected, retrying: {query}")
-            elif (
-                "timed out before ingesting the source's visible frontier when real-time-recency query issued"
-                in str(e)
-            ):
-                print("RTR timeout, ignoring")
+            if _ignore_query_error(query, e):
+                break
+
+
+async def execute_query_async(cur: psycopg.AsyncCursor, query: str) -> None:
+    while True:
+        try:
+            await cur.execute(query.encode())
+            break
+        except Exception as e:
+            if _ignore_query_error(query, e):
                 break
-            else:
-                raise
 
 
 class Action:
@@ -187,6 +521,26 @@ class Action:
     def _run(self, conns: queue.Queue):
         raise NotImplementedError
 
+    async def run_async(
+        self,
+        start_time: float,
+        conns: asyncio.Queue,
+        state: State,
+    ):
+        await self._run_async(conns)
+        duration = time.time() - start_time
+        state.measurements.add(str(self), Measurement(duration, start_time))
+
+    async def _run_async(self, conns: asyncio.Queue):
+        """Actions without native async support run in a worker thread."""
+        await asyncio.to_thread(self._run, queue.Queue())
+
+    async def setup_async(self) -> None:
+        pass
+
+    async def teardown_async(self) -> None:
+        pass
+
 
 class TdAction(Action):
     def __init__(self, td: str, c: Composition):
@@ -220,6 +574,15 @@ class StandaloneQuery(Action):
             execute_query(cur, self.query)
         conn.close()
 
+    async def _run_async(self, conns: asyncio.Queue):
+        conn = await self.conn_info.connect_async()
+        await conn.set_autocommit(True)
+        async with conn.cursor() as cur:
+            if not self.strict_serializable:
+                await cur.execute("SET TRANSACTION_ISOLATION TO 'SERIALIZABLE'")
+            await execute_query_async(cur, self.query)
+        await conn.close()
+
     def __str__(self) -> str:
         return f"{self.query} (standalone)"
 
@@ -247,6 +610,22 @@ class ReuseConnQuery(Action):
     def _run(self, conns: queue.Queue):
         execute_query(self.cur, self.query)
 
+    async def setup_async(self) -> None:
+        self.async_conn = await self.conn_info.connect_async()
+        await self.async_conn.set_autocommit(True)
+        await self.async_conn.execute(
+            f"SET TRANSACTION_ISOLATION TO '{'STRICT SERIALIZABLE' if self.strict_serializable else 'SERIALIZABLE'}'"
+        )
+
+    async def _run_async(self, conns: asyncio.Queue):
+        # Concurrent queries are serialized by the connection, just like the
+        # threads sharing the synchronous connection are.
+        async with self.async_conn.cursor() as cur:
+            await execute_query_async(cur, self.query)
+
+    async def teardown_async(self) -> None:
+        await self.async_conn.close()
+
     def __str__(self) -> str:
         return f"{self.query} (reuse connection)"
 
@@ -269,6 +648,21 @@ class PooledQuery(Action):
         conns.task_done()
         conns.put(conn)
 
+    async def _run_async(self, conns: asyncio.Queue):
+        conn = await conns.get()
+        try:
+            async with conn.cursor() as cur:
+                await execute_query_async(cur, self.query)
+        except psycopg.OperationalError as e:
+            print(f"Connection failed on query '{self.query}', reconnecting: {e}")
+            await conn.close()
+            conn = await self.conn_info.connect_async()
+            await conn.set_autocommit(True)
+            async with conn.cursor() as cur:
+                await execute_query_async(cur, self.query)
+        finally:
+            conns.put_nowait(conn)
+
     def __str__(self) -> str:
         return f"{self.query} (pooled)"
 
@@ -280,11 +674,19 @@ def sleep_until(timestamp: float) -> None:
 
 
 class Distribution:
-    def generate(
+    def schedule(
         self, duration: int, action_name: str, state: State
     ) -> Iterator[float]:
+        """The scheduled start times of the actions, without waiting for them."""
         raise NotImplementedError
 
+    def generate(
+        self, duration: int, action_name: str, state: State
+    ) -> Iterator[float]:
+        for next_time in self.schedule(duration, action_name, state):
+            sleep_until(next_time)
+            yield next_time
+
 
 class Periodic(Distribution):
     """Run the action in each thread in one second, spread apart by the 1/per_second"""
@@ -292,7 +694,7 @@ class Periodic(Distribution):
     def __init__(self, per_second: float):
         self.per_second = per_second
 
-    def generate(
+    def schedule(
         self, duration: int, action_name: str, state: State
     ) -> Iterator[float]:
         per_second = state.periodic_dists.get(action_name) or self.per_second
@@ -300,7 +702,6 @@ class Periodic(Distribution):
         for i in range(int(duration * per_second)):
             yield next_time
             next_time += 1 / per_second
-            sleep_until(next_time)
 
 
 class Gaussian(Distribution):
@@ -310,15 +711,14 @@ class Gaussian(Distribution):
         self.mean = mean
         self.stddev = stddev
 
-    def generate(
+    def schedule(
         self, duration: int, action_name: str, state: State
     ) -> Iterator[float]:
         end_time = time.time() + duration
         next_time = time.time()
-        while time.time() < end_time:
+        while next_time < end_time:
             yield next_time
             next_time += max(0, random.gauss(self.mean, self.stddev))
-            sleep_until(next_time)
 
 
 class PhaseAction:
@@ -334,6 +734,14 @@ class PhaseAction:
     ) -> None:
         raise NotImplementedError
 
+    async def run_async(
+        self,
+        duration: int,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        raise NotImplementedError
+
 
 class OpenLoop(PhaseAction):
     def __init__(
@@ -350,8 +758,38 @@ class OpenLoop(PhaseAction):
         conns: queue.Queue,
         state: State,
     ) -> None:
+        schedule_lag = state.schedule_lag[str(self.action)]
+
+        def job(start_time: float) -> None:
+            schedule_lag.add(time.time() - start_time)
+            self.action.run(start_time, conns, state)
+
         for start_time in self.dist.generate(duration, str(self.action), state):
-            jobs.put(lambda: self.action.run(start_time, conns, state))
+            jobs.put(lambda start_time=start_time: job(start_time))
+
+    async def run_async(
+        self,
+        duration: int,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        schedule_lag = state.schedule_lag[str(self.action)]
+
+        async def job(start_time: float) -> None:
+            schedule_lag.add(time.time() - start_time)
+            await self.action.run_async(start_time, conns, state)
+
+        tasks: set[asyncio.Task] = set()
+        for start_time in self.dist.schedule(duration, str(self.action), state):
+            time_to_sleep = start_time - time.time()
+            if time_to_sleep > 0:
+                # Sleep for at least a tick, so that the arrivals due in the
+                # meantime are started in one go.
+                await asyncio.sleep(max(time_to_sleep, SCHEDULER_TICK))
+            task = asyncio.create_task(job(start_time))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
 
 
 class ClosedLoop(PhaseAction):
@@ -370,6 +808,16 @@ class ClosedLoop(PhaseAction):
         while time.time() < end_time:
             self.action.run(time.time(), conns, state)
 
+    async def run_async(
+        self,
+        duration: int,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        end_time = time.time() + duration
+        while time.time() < end_time:
+            await self.action.run_async(time.time(), conns, state)
+
 
 class Phase:
     def run(
@@ -381,6 +829,14 @@ class Phase:
     ) -> None:
         raise NotImplementedError
 
+    async def run_async(
+        self,
+        c: Composition,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        raise NotImplementedError
+
 
 class TdPhase(Phase):
     def __init__(self, td: str):
@@ -395,6 +851,14 @@ class TdPhase(Phase):
     ) -> None:
         c.testdrive(self.td, quiet=True)
 
+    async def run_async(
+        self,
+        c: Composition,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        await asyncio.to_thread(c.testdrive, self.td, quiet=True)
+
 
 class LoadPhase(Phase):
     duration: int
@@ -424,6 +888,23 @@ class LoadPhase(Phase):
             thread.start()
         for thread in threads:
             thread.join()
+        state.report_schedule_lag()
+
+    async def run_async(
+        self,
+        c: Composition,
+        conns: asyncio.Queue,
+        state: State,
+    ) -> None:
+        duration = state.load_phase_duration or self.duration
+        print(f"Load phase for {duration}s")
+        await asyncio.gather(
+            *[
+                phase_action.run_async(duration, conns, state)
+                for phase_action in self.phase_actions
+            ]
+        )
+        state.report_schedule_lag()
 
 
 def run_job(jobs: queue.Queue) -> None:
@@ -449,6 +930,8 @@ class Scenario:
     jobs: queue.Queue
     conns: queue.Queue
     thread_pool: list[threading.Thread]
+    conn_info: PgConnInfo
+    async_engine: bool
     version: str = "1.0.0"
 
     def __init__(self, c: Composition, conn_infos: dict[str, PgConnInfo]):
@@ -474,8 +957,24 @@ class Scenario:
         self.jobs = queue.Queue()
         self.conns = queue.Queue()
 
-    def setup(self, c: Composition, conn_infos: dict[str, PgConnInfo]) -> None:
+    def setup(
+        self,
+        c: Composition,
+        conn_infos: dict[str, PgConnInfo],
+        async_engine: bool = False,
+    ) -> None:
+        """Prepare running the scenario.
+
+        With `async_engine`, all actions are driven from a single asyncio event
+        loop instead of a thread per job, and the connection pool is set up
+        when the scenario is run.
+        """
         conn_info = conn_infos["materialized"]
+        self.conn_info = conn_info
+        self.async_engine = async_engine
+        if async_engine:
+            self.thread_pool = []
+            return
         self.thread_pool = [
             threading.Thread(target=run_job, args=(self.jobs,))
             for i in range(self.thread_pool_size)
@@ -493,9 +992,35 @@ class Scenario:
         c: Composition,
         state: State,
     ) -> None:
+        if self.async_engine:
+            asyncio.run(self._run_async(c, state))
+            return
         for phase in self.phases:
             phase.run(c, self.jobs, self.conns, state)
 
+    async def _run_async(self, c: Composition, state: State) -> None:
+        # The same action can be used by multiple phases
+        actions = {
+            id(phase_action.action): phase_action.action
+            for phase in self.phases
+            if isinstance(phase, LoadPhase)
+            for phase_action in phase.phase_actions
+        }.values()
+        conns: asyncio.Queue = asyncio.Queue()
+        for conn in await asyncio.gather(
+            *[self.conn_info.connect_async() for i in range(self.conn_pool_size)]
+        ):
+            await conn.set_autocommit(True)
+            conns.put_nowait(conn)
+        await asyncio.gather(*[action.setup_async() for action in actions])
+        try:
+            for phase in self.phases:
+                await phase.run_async(c, conns, state)
+        finally:
+            await asyncio.gather(*[action.teardown_async() for action in actions])
+            while not conns.empty():
+                await conns.get_nowait().close()
+
     def teardown(self) -> None:
         while not self.conns.empty():
             conn = self.conns.get()
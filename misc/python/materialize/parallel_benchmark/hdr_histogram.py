@@ -0,0 +1,127 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""A High Dynamic Range histogram.
+
+Values are counted in log-linear buckets: each power of two is split into
+equally sized sub-buckets, so that every value is recorded with a bounded
+relative error while the memory used depends only on the range of values and
+the precision, not on the number of values recorded.
+"""
+
+import math
+
+import numpy as np
+
+
+class HdrHistogram:
+    """A histogram of non-negative integers.
+
+    Args:
+        highest: The highest value to track, larger values are recorded as
+            `highest`.
+        significant_digits: The number of decimal digits to which recorded
+            values are distinguishable.
+
+    >>> h = HdrHistogram(highest=3_600_000_000, significant_digits=3)
+    >>> for value in range(1, 100_001):
+    ...     h.record(value)
+    >>> h.count, h.min, h.max, h.mean()
+    (100000, 1, 100000, 50000.5)
+    >>> h.percentile(50), h.percentile(99), h.percentile(99.9)
+    (50015, 99007, 99903)
+    >>> h.percentile(100)
+    100000
+    """
+
+    def __init__(self, highest: int, significant_digits: int = 3):
+        self.highest = highest
+        self.significant_digits = significant_digits
+        largest_exact_value = 2 * 10**significant_digits
+        self.sub_bucket_half_count_magnitude = max(
+            math.ceil(math.log2(largest_exact_value)) - 1, 0
+        )
+        # Values below twice the half count are recorded exactly
+        bucket_count = max(
+            highest.bit_length() - self.sub_bucket_half_count_magnitude - 1, 0
+        )
+        self.counts = np.zeros(
+            (bucket_count + 2) << self.sub_bucket_half_count_magnitude,
+            dtype=np.int64,
+        )
+        self.count = 0
+        self.sum = 0
+        self.sum_of_squares = 0
+        self.min = highest
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(value.bit_length() - self.sub_bucket_half_count_magnitude - 1, 0)
+        return (bucket << self.sub_bucket_half_count_magnitude) + (value >> bucket)
+
+    def record(self, value: int) -> None:
+        value = min(max(value, 0), self.highest)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        self.sum_of_squares += value * value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add(self, other: "HdrHistogram") -> None:
+        """Add the values recorded by another histogram of the same shape."""
+        assert len(self.counts) == len(other.counts)
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_of_squares += other.sum_of_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "HdrHistogram":
+        result = HdrHistogram(self.highest, self.significant_digits)
+        result.add(self)
+        return result
+
+    def highest_equivalent_values(self) -> np.ndarray:
+        """The highest value counted in each of the `counts`."""
+        indices = np.arange(len(self.counts), dtype=np.int64)
+        bucket = np.maximum((indices >> self.sub_bucket_half_count_magnitude) - 1, 0)
+        sub_bucket = indices - (bucket << self.sub_bucket_half_count_magnitude)
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    def percentile(self, percentile: float) -> int:
+        """The value below or equal to which the given percentage of recorded
+        values fall, up to the histogram's precision."""
+        if self.count == 0:
+            return 0
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(int(self.highest_equivalent_values()[index]), self.max)
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def std(self) -> float:
+        """The sample standard deviation."""
+        if self.count < 2:
+            return 0.0
+        variance = (self.sum_of_squares - self.sum * self.sum / self.count) / (
+            self.count - 1
+        )
+        return math.sqrt(max(variance, 0.0))
+
+    def values(self) -> tuple[np.ndarray, np.ndarray]:
+        """The distinct recorded values, up to the histogram's precision, and
+        how often each was recorded."""
+        nonzero = np.nonzero(self.counts)[0]
+        return (
+            np.minimum(self.highest_equivalent_values()[nonzero], self.max),
+            self.counts[nonzero],
+        )
@@ -20,6 +20,13 @@ class BenchmarkConfiguration:
     max_concurrency: int
     count: int
     verbose: bool
+    client_processes: int = 1
+    open_loop_p99_slo: float | None = None
+    """If set, additionally ramp up the arrival rate of an open loop until the p99 latency in seconds exceeds this."""
+    open_loop_initial_rate: float = 10
+    open_loop_max_rate: float = 100_000
+    open_loop_step_duration: float = 10
+    """Seconds to run the open loop at each arrival rate."""
 
     def get_count_for_concurrency(self, concurrency: int) -> int:
         return floor(self.count * sqrt(concurrency))
@@ -10,11 +10,18 @@ from __future__ import annotations
 
 from collections.abc import Callable
 
+import numpy as np
 import pandas as pd
 from pandas import Series
 from pandas.core.groupby.generic import SeriesGroupBy
 
-from materialize.scalability.df import df_details_cols
+from materialize.scalability.df import (
+    df_details_cols,
+    df_operations_cols,
+    df_timeline_cols,
+)
+from materialize.scalability.df.df_operations import DfOperations
+from materialize.scalability.df.df_timeline import DfTimeline
 from materialize.scalability.df.df_wrapper_base import (
     DfWrapperBase,
     concat_df_wrapper_data,
@@ -49,6 +56,53 @@ class DfDetails(DfWrapperBase):
     def get_unique_concurrency_values(self) -> list[int]:
         return self.data[df_details_cols.CONCURRENCY].unique().tolist()
 
+    def to_operations(self) -> DfOperations:
+        """Aggregate the durations per operation type and concurrency."""
+        grouped = self.data.groupby(
+            by=[
+                df_details_cols.CONCURRENCY,
+                df_details_cols.WORKLOAD,
+                df_details_cols.OPERATION,
+            ]
+        )[df_details_cols.WALLCLOCK]
+        data = grouped.agg(
+            **{
+                df_operations_cols.COUNT: "count",
+                df_operations_cols.MEAN_DURATION: "mean",
+                df_operations_cols.P50_DURATION: "median",
+                df_operations_cols.P90_DURATION: lambda x: x.quantile(0.9),
+                df_operations_cols.P99_DURATION: lambda x: x.quantile(0.99),
+                df_operations_cols.P99_9_DURATION: lambda x: x.quantile(0.999),
+            }
+        ).reset_index()
+        return DfOperations(data)
+
+    def to_timeline(self) -> DfTimeline:
+        """Count the operations completed in each second, per concurrency."""
+        concurrency = self.data[df_details_cols.CONCURRENCY]
+        start = self.data[df_details_cols.START]
+        end = start + self.data[df_details_cols.WALLCLOCK]
+        second = np.floor(end - start.groupby(concurrency).transform("min"))
+        data = (
+            pd.DataFrame(
+                {
+                    df_timeline_cols.CONCURRENCY: concurrency,
+                    df_timeline_cols.WORKLOAD: self.data[df_details_cols.WORKLOAD],
+                    df_timeline_cols.SECOND: second.astype(int),
+                }
+            )
+            .groupby(
+                by=[
+                    df_timeline_cols.CONCURRENCY,
+                    df_timeline_cols.WORKLOAD,
+                    df_timeline_cols.SECOND,
+                ]
+            )
+            .size()
+            .reset_index(name=df_timeline_cols.TPS)
+        )
+        return DfTimeline(data)
+
     def _get_column_values(
         self,
         column_name: str,
@@ -13,3 +13,4 @@ WALLCLOCK = "wallclock"
 OPERATION = "operation"
 WORKLOAD = "workload"
 TRANSACTION_INDEX = "transaction_index"
+START = "start"
@@ -0,0 +1,42 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+from __future__ import annotations
+
+import pandas as pd
+
+from materialize.scalability.df import df_open_loop_cols
+from materialize.scalability.df.df_wrapper_base import (
+    DfWrapperBase,
+    concat_df_wrapper_data,
+)
+
+
+class DfOpenLoop(DfWrapperBase):
+    """
+    Wrapper for the results of an open loop ramp-up, one row per target rate.
+    Columns are specified in df_open_loop_cols.
+    """
+
+    def __init__(self, data: pd.DataFrame = pd.DataFrame()):
+        super().__init__(data)
+
+    def get_max_sustainable_tps(self) -> float | None:
+        if not self.has_values():
+            return None
+
+        sustainable = self.data.loc[self.data[df_open_loop_cols.SUSTAINABLE]]
+        if len(sustainable.index) == 0:
+            return None
+
+        return float(sustainable[df_open_loop_cols.TPS].max())
+
+
+def concat_df_open_loop(entries: list[DfOpenLoop]) -> DfOpenLoop:
+    return DfOpenLoop(concat_df_wrapper_data(entries))
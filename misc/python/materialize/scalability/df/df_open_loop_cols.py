@@ -0,0 +1,21 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+
+WORKLOAD = "workload"
+CONCURRENCY = "concurrency"
+TARGET_RATE = "target_rate"
+"""Operations per second scheduled by the open loop."""
+TPS = "tps"
+"""Operations per second actually completed."""
+P50_LATENCY = "p50_latency"
+P99_LATENCY = "p99_latency"
+P99_9_LATENCY = "p99_9_latency"
+SUSTAINABLE = "sustainable"
+"""Whether the target rate was achieved while meeting the p99 latency SLO."""
@@ -0,0 +1,37 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+from __future__ import annotations
+
+import pandas as pd
+
+from materialize.scalability.df import df_operations_cols
+from materialize.scalability.df.df_wrapper_base import (
+    DfWrapperBase,
+    concat_df_wrapper_data,
+)
+
+
+class DfOperations(DfWrapperBase):
+    """
+    Wrapper for the latency percentiles per operation type and concurrency.
+    Columns are specified in df_operations_cols.
+    """
+
+    def __init__(self, data: pd.DataFrame = pd.DataFrame()):
+        super().__init__(data)
+
+    def get_p99_values(self, operation: str) -> list[float]:
+        return self.data.loc[self.data[df_operations_cols.OPERATION] == operation][
+            df_operations_cols.P99_DURATION
+        ].tolist()
+
+
+def concat_df_operations(entries: list[DfOperations]) -> DfOperations:
+    return DfOperations(concat_df_wrapper_data(entries))
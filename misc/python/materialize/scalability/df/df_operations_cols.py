@@ -0,0 +1,19 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+
+CONCURRENCY = "concurrency"
+WORKLOAD = "workload"
+OPERATION = "operation"
+COUNT = "count"
+MEAN_DURATION = "mean_dur"
+P50_DURATION = "p50_dur"
+P90_DURATION = "p90_dur"
+P99_DURATION = "p99_dur"
+P99_9_DURATION = "p99_9_dur"
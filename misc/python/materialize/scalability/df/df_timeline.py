@@ -0,0 +1,42 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+from __future__ import annotations
+
+import pandas as pd
+
+from materialize.scalability.df import df_timeline_cols
+from materialize.scalability.df.df_wrapper_base import (
+    DfWrapperBase,
+    concat_df_wrapper_data,
+)
+
+
+class DfTimeline(DfWrapperBase):
+    """
+    Wrapper for the throughput per second and concurrency.
+    Columns are specified in df_timeline_cols.
+    """
+
+    def __init__(self, data: pd.DataFrame = pd.DataFrame()):
+        super().__init__(data)
+
+    def to_filtered_by_concurrency(self, concurrency: int) -> DfTimeline:
+        filtered_data = self.data.loc[
+            self.data[df_timeline_cols.CONCURRENCY] == concurrency
+        ]
+
+        return DfTimeline(filtered_data)
+
+    def get_tps_values(self) -> list[int]:
+        return self.data[df_timeline_cols.TPS].tolist()
+
+
+def concat_df_timeline(entries: list[DfTimeline]) -> DfTimeline:
+    return DfTimeline(concat_df_wrapper_data(entries))
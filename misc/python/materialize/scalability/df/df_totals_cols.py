@@ -16,3 +16,7 @@ MEAN_TX_DURATION = "mean_t_dur"
 MEDIAN_TX_DURATION = "median_t_dur"
 MIN_TX_DURATION = "min_t_dur"
 MAX_TX_DURATION = "max_t_dur"
+P90_TX_DURATION = "p90_t_dur"
+P99_TX_DURATION = "p99_t_dur"
+P99_9_TX_DURATION = "p99_9_t_dur"
+CLIENT_CPU_UTILIZATION = "client_cpu"
@@ -13,15 +13,31 @@ import time
 from concurrent import futures
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from psycopg import Cursor
 
 from materialize.scalability.config.benchmark_config import BenchmarkConfiguration
-from materialize.scalability.df import df_details_cols, df_totals_cols
+from materialize.scalability.df import (
+    df_details_cols,
+    df_open_loop_cols,
+    df_totals_cols,
+)
 from materialize.scalability.df.df_details import DfDetails, concat_df_details
+from materialize.scalability.df.df_open_loop import DfOpenLoop
+from materialize.scalability.df.df_operations import (
+    DfOperations,
+    concat_df_operations,
+)
+from materialize.scalability.df.df_timeline import DfTimeline, concat_df_timeline
 from materialize.scalability.df.df_totals import DfTotals, concat_df_totals
 from materialize.scalability.endpoint.endpoint import Endpoint
+from materialize.scalability.executor.multiprocess_load import (
+    CLIENT_SATURATION_THRESHOLD,
+    run_in_processes,
+)
 from materialize.scalability.io import paths
+from materialize.scalability.io.incremental_parquet import IncrementalParquetWriter
 from materialize.scalability.operation.scalability_operation import Operation
 from materialize.scalability.result.comparison_outcome import ComparisonOutcome
 from materialize.scalability.result.result_analyzer import ResultAnalyzer
@@ -37,6 +53,10 @@ from materialize.scalability.workload.workloads.self_test_workloads import *  #
 # number of retries in addition to the first run
 MAX_RETRIES_ON_REGRESSION = 2
 
+# an open loop is considered to keep up if it completes at least this fraction
+# of the target rate
+MIN_ACHIEVED_RATE_FRACTION = 0.9
+
 
 class BenchmarkExecutor:
     def __init__(
@@ -133,105 +153,265 @@ class BenchmarkExecutor:
         self.result.record_workload_metadata(workload)
 
         df_totals = DfTotals()
-        df_details = DfDetails()
+        df_details: list[DfDetails] = []
+        df_operations: list[DfOperations] = []
+        df_timelines: list[DfTimeline] = []
+        # The details can be large, only append the new ones after each step
+        # instead of rewriting all of them.
+        writers: dict[str, IncrementalParquetWriter] = {}
 
         concurrencies = self._get_concurrencies()
         print(f"Concurrencies: {concurrencies}")
 
-        for concurrency in concurrencies:
-            df_total, df_detail = self.run_workload_for_endpoint_with_concurrency(
-                endpoint,
-                workload,
-                concurrency,
-                self.config.get_count_for_concurrency(concurrency),
-            )
-            df_totals = concat_df_totals([df_totals, df_total])
-            df_details = concat_df_details([df_details, df_detail])
-
-            endpoint_version_name = endpoint.try_load_version()
-            pathlib.Path(paths.endpoint_dir(endpoint_version_name)).mkdir(
-                parents=True, exist_ok=True
-            )
+        try:
+            for concurrency in concurrencies:
+                df_total, df_detail = self.run_workload_for_endpoint_with_concurrency(
+                    endpoint,
+                    workload,
+                    concurrency,
+                    self.config.get_count_for_concurrency(concurrency),
+                )
+                df_operation = df_detail.to_operations()
+                df_timeline = df_detail.to_timeline()
+                print("Latencies by operation:")
+                print(df_operation.data)
+
+                df_totals = concat_df_totals([df_totals, df_total])
+                df_details.append(df_detail)
+                df_operations.append(df_operation)
+                df_timelines.append(df_timeline)
+
+                endpoint_version_name = endpoint.try_load_version()
+                pathlib.Path(paths.endpoint_dir(endpoint_version_name)).mkdir(
+                    parents=True, exist_ok=True
+                )
+
+                df_totals.to_csv(
+                    paths.df_totals_csv(endpoint_version_name, workload.name())
+                )
+
+                if not writers:
+                    writers = {
+                        "details": IncrementalParquetWriter(
+                            paths.df_details_parquet(
+                                endpoint_version_name, workload.name()
+                            )
+                        ),
+                        "operations": IncrementalParquetWriter(
+                            paths.df_operations_parquet(
+                                endpoint_version_name, workload.name()
+                            )
+                        ),
+                        "timeline": IncrementalParquetWriter(
+                            paths.df_timeline_parquet(
+                                endpoint_version_name, workload.name()
+                            )
+                        ),
+                    }
+                writers["details"].append(df_detail.data)
+                writers["operations"].append(df_operation.data)
+                writers["timeline"].append(df_timeline.data)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        result = WorkloadResult(
+            workload,
+            endpoint,
+            df_totals,
+            concat_df_details(df_details),
+            concat_df_operations(df_operations),
+            concat_df_timeline(df_timelines),
+        )
 
-            df_totals.to_csv(
-                paths.df_totals_csv(endpoint_version_name, workload.name())
-            )
-            df_details.to_csv(
-                paths.df_details_csv(endpoint_version_name, workload.name())
+        if self.config.open_loop_p99_slo is not None:
+            result.df_open_loop = self.run_open_loop_for_endpoint(
+                endpoint, workload, self.config.open_loop_p99_slo
             )
 
-        result = WorkloadResult(workload, endpoint, df_totals, df_details)
         self._record_results(result)
         return result
 
-    def run_workload_for_endpoint_with_concurrency(
+    def run_open_loop_for_endpoint(
+        self, endpoint: Endpoint, workload: Workload, p99_slo: float
+    ) -> DfOpenLoop:
+        """Increase the arrival rate until the endpoint can no longer keep up
+        or the p99 latency exceeds the SLO."""
+        assert (
+            self.config.exponent_base > 1
+        ), "open loop requires an exponent base above 1"
+        rows = []
+        rate = self.config.open_loop_initial_rate
+        while rate <= self.config.open_loop_max_rate:
+            row = self.run_workload_for_endpoint_with_rate(
+                endpoint, workload, self.config.max_concurrency, rate, p99_slo
+            )
+            rows.append(row)
+            if not row[df_open_loop_cols.SUSTAINABLE]:
+                break
+            rate *= self.config.exponent_base
+
+        df_open_loop = DfOpenLoop(pd.DataFrame(rows))
+        endpoint_version_name = endpoint.try_load_version()
+        pathlib.Path(paths.endpoint_dir(endpoint_version_name)).mkdir(
+            parents=True, exist_ok=True
+        )
+        df_open_loop.to_csv(
+            paths.df_open_loop_csv(endpoint_version_name, workload.name())
+        )
+        print(
+            f"Max. sustainable throughput of workload '{workload.name()}' at p99 <= {p99_slo * 1000:.0f} ms: {df_open_loop.get_max_sustainable_tps()}"
+        )
+        return df_open_loop
+
+    def run_workload_for_endpoint_with_rate(
         self,
         endpoint: Endpoint,
         workload: Workload,
         concurrency: int,
-        count: int,
-    ) -> tuple[DfTotals, DfDetails]:
+        rate: float,
+        p99_slo: float,
+    ) -> dict[str, Any]:
         print(
-            f"Preparing benchmark for workload '{workload.name()}' at concurrency {concurrency} ..."
+            f"Preparing open loop benchmark for workload '{workload.name()}' at {rate:.1f} operations/s ..."
         )
-        endpoint.up()
-
-        init_sqls = self.schema.init_sqls()
-
-        init_conn = endpoint.sql_connection()
-        init_conn.autocommit = True
-        init_cursor = init_conn.cursor()
-        for init_sql in init_sqls:
-            print(init_sql)
-            init_cursor.execute(init_sql.encode("utf8"))
-
-        for init_operation in workload.init_operations():
-            workload.execute_operation(
-                init_operation, init_cursor, -1, -1, self.config.verbose
-            )
+        self._prepare_endpoint(endpoint, workload)
+        operations = workload.operations()
+        count = max(round(rate * self.config.open_loop_step_duration), 1)
 
         print(
-            f"Creating a cursor pool with {concurrency} entries against endpoint: {endpoint.url()}"
+            f"Benchmarking workload '{workload.name()}' in an open loop at {rate:.1f} operations/s with {concurrency} workers ..."
+        )
+        load = run_in_processes(
+            workload,
+            operations,
+            count,
+            concurrency,
+            max(self.config.client_processes, 1),
+            lambda: self._create_cursor(endpoint),
+            self.config.verbose,
+            arrival_rate=rate,
+        )
+        latencies = pd.Series(load.wallclocks)
+        ends = load.starts + load.wallclocks
+        tps = count / (ends.max() - load.starts.min())
+        p99 = latencies.quantile(0.99)
+        sustainable = p99 <= p99_slo and tps >= rate * MIN_ACHIEVED_RATE_FRACTION
+        print(
+            f"target rate: {rate:.1f}; tps = {tps:.1f}; p99 = {p99 * 1000:.1f} ms; sustainable: {sustainable}; client_cpu = {load.client_cpu_utilization:.2f}"
         )
-        cursor_pool = self._create_cursor_pool(concurrency, endpoint)
+        if load.client_cpu_utilization > CLIENT_SATURATION_THRESHOLD:
+            print(
+                f"WARNING: The client used {load.client_cpu_utilization:.0%} of a CPU core per process,"
+                " the latencies might be caused by the client rather than the endpoint"
+            )
 
+        return {
+            df_open_loop_cols.WORKLOAD: workload.name(),
+            df_open_loop_cols.CONCURRENCY: concurrency,
+            df_open_loop_cols.TARGET_RATE: rate,
+            df_open_loop_cols.TPS: tps,
+            df_open_loop_cols.P50_LATENCY: latencies.median(),
+            df_open_loop_cols.P99_LATENCY: p99,
+            df_open_loop_cols.P99_9_LATENCY: latencies.quantile(0.999),
+            df_open_loop_cols.SUSTAINABLE: sustainable,
+        }
+
+    def run_workload_for_endpoint_with_concurrency(
+        self,
+        endpoint: Endpoint,
+        workload: Workload,
+        concurrency: int,
+        count: int,
+    ) -> tuple[DfTotals, DfDetails]:
         print(
-            f"Benchmarking workload '{workload.name()}' at concurrency {concurrency} ..."
+            f"Preparing benchmark for workload '{workload.name()}' at concurrency {concurrency} ..."
         )
+        self._prepare_endpoint(endpoint, workload)
+
         operations = workload.operations()
 
-        global next_worker_id
-        next_worker_id = 0
-        local = threading.local()
-        lock = threading.Lock()
+        if self.config.client_processes > 1:
+            print(
+                f"Benchmarking workload '{workload.name()}' at concurrency {concurrency} from {self.config.client_processes} client processes ..."
+            )
+            load = run_in_processes(
+                workload,
+                operations,
+                count,
+                concurrency,
+                self.config.client_processes,
+                lambda: self._create_cursor(endpoint),
+                self.config.verbose,
+            )
+            wallclock_total = load.wallclock_total
+            client_cpu_utilization = load.client_cpu_utilization
+            indices = np.arange(count)
+            operation_names = np.array(
+                [type(operation).__name__ for operation in operations]
+            )
+            df_detail = pd.DataFrame(
+                {
+                    df_details_cols.CONCURRENCY: concurrency,
+                    df_details_cols.START: load.starts,
+                    df_details_cols.WALLCLOCK: load.wallclocks,
+                    df_details_cols.OPERATION: operation_names[
+                        indices % len(operations)
+                    ],
+                    df_details_cols.WORKLOAD: workload.name(),
+                    df_details_cols.TRANSACTION_INDEX: indices // len(operations),
+                }
+            )
+        else:
+            print(
+                f"Creating a cursor pool with {concurrency} entries against endpoint: {endpoint.url()}"
+            )
+            cursor_pool = self._create_cursor_pool(concurrency, endpoint)
 
-        start = time.time()
-        with futures.ThreadPoolExecutor(
-            concurrency, initializer=self.initialize_worker, initargs=(local, lock)
-        ) as executor:
-            measurements = executor.map(
-                self.execute_operation,
-                [
-                    (
-                        workload,
-                        concurrency,
-                        local,
-                        cursor_pool,
-                        operations[i % len(operations)],
-                        int(i / len(operations)),
-                    )
-                    for i in range(count)
-                ],
+            print(
+                f"Benchmarking workload '{workload.name()}' at concurrency {concurrency} ..."
             )
-        wallclock_total = time.time() - start
 
-        df_detail = pd.DataFrame(measurements)
+            global next_worker_id
+            next_worker_id = 0
+            local = threading.local()
+            lock = threading.Lock()
+
+            start = time.time()
+            cpu_start = time.process_time()
+            with futures.ThreadPoolExecutor(
+                concurrency, initializer=self.initialize_worker, initargs=(local, lock)
+            ) as executor:
+                measurements = executor.map(
+                    self.execute_operation,
+                    [
+                        (
+                            workload,
+                            concurrency,
+                            local,
+                            cursor_pool,
+                            operations[i % len(operations)],
+                            int(i / len(operations)),
+                        )
+                        for i in range(count)
+                    ],
+                )
+            wallclock_total = time.time() - start
+            client_cpu_utilization = (time.process_time() - cpu_start) / wallclock_total
+
+            df_detail = pd.DataFrame(measurements)
+
         print("Best and worst individual measurements:")
         print(df_detail.sort_values(by=[df_details_cols.WALLCLOCK]))
 
         print(
-            f"concurrency: {concurrency}; wallclock_total: {wallclock_total}; tps = {count/wallclock_total}"
+            f"concurrency: {concurrency}; wallclock_total: {wallclock_total}; tps = {count/wallclock_total}; client_cpu = {client_cpu_utilization:.2f}"
         )
+        if client_cpu_utilization > CLIENT_SATURATION_THRESHOLD:
+            print(
+                f"WARNING: The client used {client_cpu_utilization:.0%} of a CPU core per process,"
+                " the throughput might be limited by the client rather than the endpoint"
+            )
 
         df_total = pd.DataFrame(
             [
@@ -253,12 +433,39 @@ class BenchmarkExecutor:
                     df_totals_cols.MAX_TX_DURATION: df_detail[
                         df_details_cols.WALLCLOCK
                     ].max(),
+                    df_totals_cols.P90_TX_DURATION: df_detail[
+                        df_details_cols.WALLCLOCK
+                    ].quantile(0.9),
+                    df_totals_cols.P99_TX_DURATION: df_detail[
+                        df_details_cols.WALLCLOCK
+                    ].quantile(0.99),
+                    df_totals_cols.P99_9_TX_DURATION: df_detail[
+                        df_details_cols.WALLCLOCK
+                    ].quantile(0.999),
+                    df_totals_cols.CLIENT_CPU_UTILIZATION: client_cpu_utilization,
                 }
             ]
         )
 
         return DfTotals(df_total), DfDetails(df_detail)
 
+    def _prepare_endpoint(self, endpoint: Endpoint, workload: Workload) -> None:
+        endpoint.up()
+
+        init_sqls = self.schema.init_sqls()
+
+        init_conn = endpoint.sql_connection()
+        init_conn.autocommit = True
+        init_cursor = init_conn.cursor()
+        for init_sql in init_sqls:
+            print(init_sql)
+            init_cursor.execute(init_sql.encode("utf8"))
+
+        for init_operation in workload.init_operations():
+            workload.execute_operation(
+                init_operation, init_cursor, -1, -1, self.config.verbose
+            )
+
     def execute_operation(
         self, args: tuple[Workload, int, threading.local, list[Cursor], Operation, int]
     ) -> dict[str, Any]:
@@ -277,6 +484,7 @@ class BenchmarkExecutor:
 
         return {
             df_details_cols.CONCURRENCY: concurrency,
+            df_details_cols.START: start,
             df_details_cols.WALLCLOCK: wallclock,
             df_details_cols.OPERATION: type(operation).__name__,
             df_details_cols.WORKLOAD: workload.name(),
@@ -315,18 +523,15 @@ class BenchmarkExecutor:
         ]
 
     def _create_cursor_pool(self, concurrency: int, endpoint: Endpoint) -> list[Cursor]:
-        connect_sqls = self.schema.connect_sqls()
-
-        cursor_pool = []
-        for i in range(concurrency):
-            conn = endpoint.sql_connection()
-            conn.autocommit = True
-            cursor = conn.cursor()
-            for connect_sql in connect_sqls:
-                cursor.execute(connect_sql.encode("utf8"))
-            cursor_pool.append(cursor)
-
-        return cursor_pool
+        return [self._create_cursor(endpoint) for i in range(concurrency)]
+
+    def _create_cursor(self, endpoint: Endpoint) -> Cursor:
+        conn = endpoint.sql_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        for connect_sql in self.schema.connect_sqls():
+            cursor.execute(connect_sql.encode("utf8"))
+        return cursor
 
     def _record_results(self, result: WorkloadResult) -> None:
         endpoint_version_info = result.endpoint.try_load_version()
@@ -0,0 +1,191 @@
+# Copyright Materialize, Inc. and contributors. All rights reserved.
+#
+# Use of this software is governed by the Business Source License
+# included in the LICENSE file at the root of this repository.
+#
+# As of the Change Date specified in that file, in accordance with
+# the Business Source License, use of this software will be governed
+# by the Apache License, Version 2.0.
+
+"""Generate the load of a workload from multiple client processes.
+
+A single Python process saturates at high concurrencies, so that the measured
+throughput reflects the client rather than the endpoint. The workers are
+therefore sharded across forked processes, each with its own connections. The
+operations are handed out through a shared counter, and each operation's
+duration is written to its own slot of a shared array, so that no results
+have to be sent back to the parent.
+"""
+
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+from psycopg import Cursor
+
+from materialize.scalability.operation.scalability_operation import Operation
+from materialize.scalability.workload.workload import Workload
+
+# A client process using more CPU time than this fraction of the wallclock time
+# is considered saturated, as the GIL restricts it to one core.
+CLIENT_SATURATION_THRESHOLD = 0.9
+
+
+@dataclass
+class LoadResult:
+    """
+    Attributes:
+        wallclock_total: The time from when all workers were connected until
+            all operations completed, in seconds.
+        starts: The start time of each operation in seconds since the epoch.
+            With an arrival rate, this is the time the operation was
+            scheduled to start at.
+        wallclocks: The duration of each operation in seconds, measured from
+            its start time.
+        client_cpu_utilization: The highest CPU time used by any client
+            process, as fraction of the wallclock time.
+    """
+
+    wallclock_total: float
+    starts: np.ndarray
+    wallclocks: np.ndarray
+    client_cpu_utilization: float
+
+
+def shard_workers(concurrency: int, process_count: int) -> list[range]:
+    """Split the worker ids into contiguous ranges, one per process.
+
+    >>> shard_workers(10, 4)
+    [range(0, 3), range(3, 6), range(6, 8), range(8, 10)]
+    >>> shard_workers(2, 4)
+    [range(0, 1), range(1, 2)]
+    """
+    process_count = min(process_count, concurrency)
+    shards = []
+    start = 0
+    for process in range(process_count):
+        size = concurrency // process_count + (
+            1 if process < concurrency % process_count else 0
+        )
+        shards.append(range(start, start + size))
+        start += size
+    return shards
+
+
+def run_in_processes(
+    workload: Workload,
+    operations: list[Operation],
+    count: int,
+    concurrency: int,
+    process_count: int,
+    create_cursor: Callable[[], Cursor],
+    verbose: bool,
+    arrival_rate: float | None = None,
+) -> LoadResult:
+    """Run `count` operations with `concurrency` workers spread across
+    `process_count` client processes.
+
+    Without an arrival rate, each worker starts its next operation as soon as
+    the previous one completed (closed loop). With an arrival rate, the
+    operations are scheduled at fixed intervals independent of how long the
+    previous ones took (open loop). A late operation still counts from its
+    scheduled time, so that latencies are not hidden when all workers are
+    busy (coordinated omission).
+    """
+    # Forking lets the child processes inherit the workload and endpoint
+    # without having to pickle them.
+    context = multiprocessing.get_context("fork")
+    shards = shard_workers(concurrency, process_count)
+    next_index = context.Value("q", 0)
+    starts = context.RawArray("d", count)
+    wallclocks = context.RawArray("d", count)
+    cpu_utilizations = context.RawArray("d", len(shards))
+    schedule_start = context.RawValue("d", 0.0)
+
+    def start_schedule() -> None:
+        schedule_start.value = time.time()
+
+    barrier = context.Barrier(len(shards) + 1, action=start_schedule)
+
+    def run_process(process: int, worker_ids: range) -> None:
+        try:
+            cursors = [create_cursor() for _ in worker_ids]
+        except:
+            barrier.abort()
+            raise
+        errors: list[BaseException] = []
+
+        def run_worker(worker_id: int, cursor: Cursor) -> None:
+            try:
+                while not errors:
+                    with next_index.get_lock():
+                        i = next_index.value
+                        next_index.value += 1
+                    if i >= count:
+                        return
+                    if arrival_rate is None:
+                        start = time.time()
+                    else:
+                        start = schedule_start.value + i / arrival_rate
+                        time_to_sleep = start - time.time()
+                        if time_to_sleep > 0:
+                            time.sleep(time_to_sleep)
+                    workload.execute_operation(
+                        operations[i % len(operations)],
+                        cursor,
+                        worker_id,
+                        i // len(operations),
+                        verbose,
+                    )
+                    starts[i] = start
+                    wallclocks[i] = time.time() - start
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=run_worker, args=(worker_id, cursor))
+            for worker_id, cursor in zip(worker_ids, cursors)
+        ]
+        barrier.wait()
+        start = time.time()
+        cpu_start = time.process_time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cpu_utilizations[process] = (time.process_time() - cpu_start) / max(
+            time.time() - start, 1e-9
+        )
+        if errors:
+            raise errors[0]
+
+    processes = [
+        context.Process(target=run_process, args=(process, worker_ids))
+        for process, worker_ids in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    start = time.time()
+    for process in processes:
+        process.join()
+    wallclock_total = time.time() - start
+
+    failed = [p.exitcode for p in processes if p.exitcode != 0]
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(processes)} client processes failed with exit codes {failed}"
+        )
+
+    return LoadResult(
+        wallclock_total=wallclock_total,
+        starts=np.frombuffer(starts, dtype=np.float64).copy(),
+        wallclocks=np.frombuffer(wallclocks, dtype=np.float64).copy(),
+        client_cpu_utilization=max(cpu_utilizations),
+    )
@@ -27,8 +27,20 @@ def workloads_csv() -> Path:
     return RESULTS_DIR / "workloads.csv"
 
 
-def df_details_csv(endpoint_name: str, workload_name: str) -> Path:
-    return RESULTS_DIR / endpoint_name / f"{workload_name}_details.csv"
+def df_details_parquet(endpoint_name: str, workload_name: str) -> Path:
+    return RESULTS_DIR / endpoint_name / f"{workload_name}_details.parquet"
+
+
+def df_operations_parquet(endpoint_name: str, workload_name: str) -> Path:
+    return RESULTS_DIR / endpoint_name / f"{workload_name}_operations.parquet"
+
+
+def df_open_loop_csv(endpoint_name: str, workload_name: str) -> Path:
+    return RESULTS_DIR / endpoint_name / f"{workload_name}_open_loop.csv"
+
+
+def df_timeline_parquet(endpoint_name: str, workload_name: str) -> Path:
+    return RESULTS_DIR / endpoint_name / f"{workload_name}_timeline.parquet"
 
 
 def regressions_csv() -> Path:
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from typing import TypeVar
 
 from materialize.scalability.df.df_details import DfDetails
+from materialize.scalability.df.df_open_loop import DfOpenLoop
 from materialize.scalability.df.df_totals import DfTotals, concat_df_totals
 from materialize.scalability.result.comparison_outcome import ComparisonOutcome
 from materialize.scalability.result.workload_result import WorkloadResult
@@ -26,6 +27,7 @@ class BenchmarkResult:
     overall_comparison_outcome: ComparisonOutcome
     df_total_by_endpoint_name_and_workload: dict[str, dict[str, DfTotals]]
     df_details_by_endpoint_name_and_workload: dict[str, dict[str, DfDetails]]
+    df_open_loop_by_endpoint_name_and_workload: dict[str, dict[str, DfOpenLoop]]
     workload_version_by_name: dict[str, WorkloadVersion]
     workload_group_by_name: dict[str, str]
 
@@ -33,6 +35,7 @@ class BenchmarkResult:
         self.overall_comparison_outcome = ComparisonOutcome()
         self.df_total_by_endpoint_name_and_workload = dict()
         self.df_details_by_endpoint_name_and_workload = dict()
+        self.df_open_loop_by_endpoint_name_and_workload = dict()
         self.workload_version_by_name = dict()
         self.workload_group_by_name = dict()
 
@@ -60,6 +63,9 @@ class BenchmarkResult:
             self.df_details_by_endpoint_name_and_workload[endpoint_version_info] = (
                 dict()
             )
+            self.df_open_loop_by_endpoint_name_and_workload[endpoint_version_info] = (
+                dict()
+            )
 
         workload_name = result.workload.name()
         if (
@@ -77,6 +83,9 @@ class BenchmarkResult:
         self.df_details_by_endpoint_name_and_workload[endpoint_version_info][
             workload_name
         ] = result.df_details
+        self.df_open_loop_by_endpoint_name_and_workload[endpoint_version_info][
+            workload_name
+        ] = result.df_open_loop
 
     def get_df_total_by_endpoint_name(self, endpoint_name: str) -> DfTotals:
         return concat_df_totals(
@@ -97,6 +106,13 @@ class BenchmarkResult:
             self.df_details_by_endpoint_name_and_workload
         )
 
+    def get_df_open_loop_by_workload_and_endpoint(
+        self,
+    ) -> dict[str, dict[str, DfOpenLoop]]:
+        return self._swap_endpoint_and_workload_grouping(
+            self.df_open_loop_by_endpoint_name_and_workload
+        )
+
     def _swap_endpoint_and_workload_grouping(
         self, result_by_endpoint_and_workload: dict[str, dict[str, T]]
     ) -> dict[str, dict[str, T]]:
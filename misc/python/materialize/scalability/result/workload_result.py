@@ -9,6 +9,9 @@
 
 
 from materialize.scalability.df.df_details import DfDetails
+from materialize.scalability.df.df_open_loop import DfOpenLoop
+from materialize.scalability.df.df_operations import DfOperations
+from materialize.scalability.df.df_timeline import DfTimeline
 from materialize.scalability.df.df_totals import DfTotals
 from materialize.scalability.endpoint.endpoint import Endpoint
 from materialize.scalability.workload.workload import Workload
@@ -21,8 +24,14 @@ class WorkloadResult:
         endpoint: Endpoint,
         df_totals: DfTotals,
         df_details: DfDetails,
+        df_operations: DfOperations = DfOperations(),
+        df_timeline: DfTimeline = DfTimeline(),
+        df_open_loop: DfOpenLoop = DfOpenLoop(),
     ):
         self.workload = workload
         self.endpoint = endpoint
         self.df_totals = df_totals
         self.df_details = df_details
+        self.df_operations = df_operations
+        self.df_timeline = df_timeline
+        self.df_open_loop = df_open_loop
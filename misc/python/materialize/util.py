@@ -176,6 +176,22 @@ class PgConnInfo:
                 cur.execute(f"SET cluster = {self.cluster}".encode())
         return conn
 
+    async def connect_async(self) -> psycopg.AsyncConnection:
+        conn = await psycopg.AsyncConnection.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            dbname=self.database,
+            sslmode="require" if self.ssl else None,
+        )
+        if self.autocommit:
+            await conn.set_autocommit(True)
+        if self.cluster:
+            async with conn.cursor() as cur:
+                await cur.execute(f"SET cluster = {self.cluster}".encode())
+        return conn
+
     def to_conn_string(self) -> str:
         return (
             f"postgres://{quote(self.user)}:{quote(self.password)}@{self.host}:{self.port}/{quote(self.database)}"
@@ -18,9 +18,13 @@ import os
 import sys
 import time
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
 from textwrap import dedent
 
-from materialize import buildkite
+from materialize import buildkite, spawn
 from materialize.docker import is_image_tag_of_release_version
 from materialize.feature_benchmark.benchmark_result_evaluator import (
     BenchmarkResultEvaluator,
@@ -81,6 +85,8 @@ from materialize.feature_benchmark.termination import (
     NormalDistributionOverlap,
     ProbForMin,
     RunAtMost,
+    SequentialComparison,
+    SequentialRatioTest,
     TerminationCondition,
 )
 from materialize.mzcompose.composition import (
@@ -120,7 +126,17 @@ def make_filter(args: argparse.Namespace) -> Filter:
         return FilterFirst()
 
 
-def make_termination_conditions(args: argparse.Namespace) -> list[TerminationCondition]:
+def make_termination_conditions(
+    args: argparse.Namespace,
+    mz_id: int,
+    comparison: SequentialComparison | None,
+) -> list[TerminationCondition]:
+    if comparison is not None:
+        return [
+            SequentialRatioTest(comparison, mz_id),
+            RunAtMost(threshold=args.max_measurements),
+        ]
+
     return [
         NormalDistributionOverlap(threshold=0.95),
         ProbForMin(threshold=0.90),
@@ -128,6 +144,21 @@ def make_termination_conditions(args: argparse.Namespace) -> list[TerminationCon
     ]
 
 
+def make_comparison(
+    args: argparse.Namespace, scenario_class: type[Scenario], seed: int
+) -> SequentialComparison | None:
+    if not args.adaptive_termination:
+        return None
+
+    return SequentialComparison(
+        threshold=scenario_class.RELATIVE_THRESHOLD[MeasurementType.WALLCLOCK],
+        statistic=make_aggregation_class().comparison_statistic(),
+        # Skip the measurement that make_filter() discards
+        skip=0 if args.max_measurements <= 5 else 1,
+        seed=seed,
+    )
+
+
 def make_aggregation_class() -> type[Aggregation]:
     return MinAggregation
 
@@ -155,8 +186,13 @@ SERVICES = [
 
 
 def run_one_scenario(
-    c: Composition, scenario_class: type[Scenario], args: argparse.Namespace
+    c: Composition,
+    scenario_class: type[Scenario],
+    args: argparse.Namespace,
+    other_c: Composition | None = None,
 ) -> BenchmarkScenarioResult:
+    """Benchmark the scenario against THIS and OTHER. If `other_c` is given,
+    OTHER runs in that composition at the same time as THIS runs in `c`."""
     scenario_name = scenario_class.__name__
     print(f"--- Now benchmarking {scenario_name} ...")
 
@@ -168,42 +204,162 @@ def run_one_scenario(
     result = BenchmarkScenarioResult(scenario_class, measurement_types)
 
     common_seed = round(time.time())
+    comparison = make_comparison(args, scenario_class, common_seed)
 
-    early_abort = False
+    if other_c is not None:
+        return run_instances_concurrently(
+            [c, other_c], scenario_class, args, common_seed, comparison, result
+        )
 
     for mz_id, instance in enumerate(["this", "other"]):
-        balancerd, tag, size, params = (
-            (args.this_balancerd, args.this_tag, args.this_size, args.this_params)
-            if instance == "this"
-            else (
-                args.other_balancerd,
-                args.other_tag,
-                args.other_size,
-                args.other_params,
+        with benchmark_instance(
+            c, mz_id, instance, scenario_class, args, common_seed, comparison
+        ) as benchmark:
+            if benchmark is None:
+                result.empty()
+                break
+
+            aggregations = benchmark.run()
+            add_aggregations(result, benchmark, aggregations)
+
+    return result
+
+
+def run_instances_concurrently(
+    compositions: list[Composition],
+    scenario_class: type[Scenario],
+    args: argparse.Namespace,
+    common_seed: int,
+    comparison: SequentialComparison | None,
+    result: BenchmarkScenarioResult,
+) -> BenchmarkScenarioResult:
+    """Bring up THIS and OTHER side by side and measure them in lockstep.
+
+    In every round, the next measurement of both instances is taken at the
+    same time, so that any drift in the performance of the host affects THIS
+    and OTHER alike. An instance that reached its termination conditions sits
+    out the remaining rounds.
+    """
+    with ExitStack() as stack, ThreadPoolExecutor(max_workers=2) as executor:
+
+        def set_up(mz_id: int) -> tuple[Benchmark, Scenario] | None:
+            benchmark = stack.enter_context(
+                benchmark_instance(
+                    compositions[mz_id],
+                    mz_id,
+                    ["this", "other"][mz_id],
+                    scenario_class,
+                    args,
+                    common_seed,
+                    comparison,
+                    shared_services=False,
+                )
             )
-        )
+            if benchmark is None:
+                return None
+            return benchmark, benchmark.setup()
 
-        tag = resolve_tag(tag, scenario_class, args.scale)
+        instances = list(executor.map(set_up, range(len(compositions))))
+        benchmarks = [instance for instance in instances if instance is not None]
+        if len(benchmarks) < len(instances):
+            result.empty()
+            return result
+
+        def run_iteration(mz_id: int, i: int) -> bool:
+            benchmark, scenario = benchmarks[mz_id]
+            return benchmark.run_iteration(scenario, i)
+
+        running = list(range(len(benchmarks)))
+        i = 0
+        while running:
+            terminated = list(executor.map(run_iteration, running, [i] * len(running)))
+            running = [mz_id for mz_id, done in zip(running, terminated) if not done]
+            i = i + 1
 
-        entrypoint_host = "balancerd" if balancerd else "materialized"
+        for benchmark, scenario in benchmarks:
+            add_aggregations(result, benchmark, benchmark.finish(scenario))
+
+    return result
 
-        c.up(Service("testdrive", idle=True))
 
-        additional_system_parameter_defaults = (
-            ADDITIONAL_BENCHMARKING_SYSTEM_PARAMETERS
-            | {
-                "max_clusters": "15",
-                "enable_unorchestrated_cluster_replicas": "true",
-                "unsafe_enable_unorchestrated_cluster_replicas": "true",
-            }
+def add_aggregations(
+    result: BenchmarkScenarioResult,
+    benchmark: Benchmark,
+    aggregations: list[Aggregation],
+) -> None:
+    scenario_version = benchmark.create_scenario_instance().version()
+    result.set_scenario_version(scenario_version)
+    for aggregation, metric in zip(aggregations, result.metrics):
+        assert (
+            aggregation.measurement_type == metric.measurement_type
+            or aggregation.measurement_type is None
+        ), f"Aggregation contains {aggregation.measurement_type} but metric contains {metric.measurement_type} as measurement type"
+        metric.append_point(
+            aggregation.aggregate(),
+            aggregation.unit(),
+            aggregation.name(),
         )
 
-        if params is not None:
-            for param in params.split(";"):
-                param_name, param_value = param.split("=")
-                additional_system_parameter_defaults[param_name] = param_value
 
-        mz_image = f"materialize/materialized:{tag}" if tag else None
+@contextmanager
+def benchmark_instance(
+    c: Composition,
+    mz_id: int,
+    instance: str,
+    scenario_class: type[Scenario],
+    args: argparse.Namespace,
+    common_seed: int,
+    comparison: SequentialComparison | None,
+    shared_services: bool = True,
+) -> Iterator[Benchmark | None]:
+    """Bring up the Mz instance under measurement and tear it down afterwards.
+    Yields None if the scenario can not run against the instance."""
+    balancerd, tag, size, params = (
+        (args.this_balancerd, args.this_tag, args.this_size, args.this_params)
+        if instance == "this"
+        else (
+            args.other_balancerd,
+            args.other_tag,
+            args.other_size,
+            args.other_params,
+        )
+    )
+
+    tag = resolve_tag(tag, scenario_class, args.scale)
+
+    entrypoint_host = "balancerd" if balancerd else "materialized"
+
+    c.up(Service("testdrive", idle=True))
+
+    additional_system_parameter_defaults = ADDITIONAL_BENCHMARKING_SYSTEM_PARAMETERS | {
+        "max_clusters": "15",
+        "enable_unorchestrated_cluster_replicas": "true",
+        "unsafe_enable_unorchestrated_cluster_replicas": "true",
+    }
+
+    if params is not None:
+        for param in params.split(";"):
+            param_name, param_value = param.split("=")
+            additional_system_parameter_defaults[param_name] = param_value
+
+    mz_image = f"materialize/materialized:{tag}" if tag else None
+    # TODO: Better azurite support detection
+    mz = create_mz_service(
+        mz_image,
+        size,
+        additional_system_parameter_defaults,
+        args.azurite and instance == "this",
+    )
+    clusterd_image = f"materialize/clusterd:{tag}" if tag else None
+    clusterd = create_clusterd_service(
+        clusterd_image, size, additional_system_parameter_defaults
+    )
+
+    if tag is not None and not c.try_pull_service_image(mz):
+        print(
+            f"Unable to find materialize image with tag {tag}, proceeding with latest instead!"
+        )
+        mz_image = "materialize/materialized:latest"
         # TODO: Better azurite support detection
         mz = create_mz_service(
             mz_image,
@@ -216,96 +372,69 @@ def run_one_scenario(
             clusterd_image, size, additional_system_parameter_defaults
         )
 
-        if tag is not None and not c.try_pull_service_image(mz):
-            print(
-                f"Unable to find materialize image with tag {tag}, proceeding with latest instead!"
-            )
-            mz_image = "materialize/materialized:latest"
-            # TODO: Better azurite support detection
-            mz = create_mz_service(
-                mz_image,
-                size,
-                additional_system_parameter_defaults,
-                args.azurite and instance == "this",
-            )
-            clusterd_image = f"materialize/clusterd:{tag}" if tag else None
-            clusterd = create_clusterd_service(
-                clusterd_image, size, additional_system_parameter_defaults
-            )
-
-        start_overridden_mz_clusterd_and_cockroach(c, mz, clusterd, instance, balancerd)
+    start_overridden_mz_clusterd_and_cockroach(c, mz, clusterd, instance, balancerd)
 
-        with c.override(
-            Testdrive(
-                materialize_url=f"postgres://materialize@{entrypoint_host}:6875",
-                default_timeout=default_timeout,
-                materialize_params={"statement_timeout": f"'{default_timeout}'"},
-                metadata_store="cockroach",
-                external_blob_store=True,
-                blob_store_is_azure=args.azurite,
-            )
-        ):
-            c.testdrive(
-                dedent(
-                    """
-                    $[version<9000] postgres-execute connection=postgres://mz_system:materialize@${testdrive.materialize-internal-sql-addr}
-                    ALTER SYSTEM SET enable_unmanaged_cluster_replicas = true;
-
-                    $ postgres-execute connection=postgres://mz_system:materialize@${testdrive.materialize-internal-sql-addr}
-                    CREATE CLUSTER cluster_default REPLICAS (r1 (STORAGECTL ADDRESSES ['clusterd:2100'], STORAGE ADDRESSES ['clusterd:2103'], COMPUTECTL ADDRESSES ['clusterd:2101'], COMPUTE ADDRESSES ['clusterd:2102'], WORKERS 1));
-                    ALTER SYSTEM SET cluster = cluster_default;
-                    GRANT ALL PRIVILEGES ON CLUSTER cluster_default TO materialize;"""
-                ),
-            )
+    with c.override(
+        Testdrive(
+            materialize_url=f"postgres://materialize@{entrypoint_host}:6875",
+            default_timeout=default_timeout,
+            materialize_params={"statement_timeout": f"'{default_timeout}'"},
+            metadata_store="cockroach",
+            external_blob_store=True,
+            blob_store_is_azure=args.azurite,
+        )
+    ):
+        c.testdrive(
+            dedent(
+                """
+                $[version<9000] postgres-execute connection=postgres://mz_system:materialize@${testdrive.materialize-internal-sql-addr}
+                ALTER SYSTEM SET enable_unmanaged_cluster_replicas = true;
+
+                $ postgres-execute connection=postgres://mz_system:materialize@${testdrive.materialize-internal-sql-addr}
+                CREATE CLUSTER cluster_default REPLICAS (r1 (STORAGECTL ADDRESSES ['clusterd:2100'], STORAGE ADDRESSES ['clusterd:2103'], COMPUTECTL ADDRESSES ['clusterd:2101'], COMPUTE ADDRESSES ['clusterd:2102'], WORKERS 1));
+                ALTER SYSTEM SET cluster = cluster_default;
+                GRANT ALL PRIVILEGES ON CLUSTER cluster_default TO materialize;"""
+            ),
+        )
 
-            executor = Docker(
-                composition=c, seed=common_seed, materialized=mz, clusterd=clusterd
-            )
-            mz_version = MzVersion.parse_mz(c.query_mz_version())
+        executor = Docker(
+            composition=c,
+            seed=common_seed,
+            materialized=mz,
+            clusterd=clusterd,
+            native_sql_service=entrypoint_host if args.native_sql else None,
+            default_timeout=default_timeout,
+        )
+        mz_version = MzVersion.parse_mz(c.query_mz_version())
 
-            benchmark = Benchmark(
-                mz_id=mz_id,
-                mz_version=mz_version,
-                scenario_cls=scenario_class,
-                scale=args.scale,
-                executor=executor,
-                filter=make_filter(args),
-                termination_conditions=make_termination_conditions(args),
-                aggregation_class=make_aggregation_class(),
-                measure_memory=args.measure_memory,
-                default_size=size,
-                seed=common_seed,
-            )
+        benchmark = Benchmark(
+            mz_id=mz_id,
+            mz_version=mz_version,
+            scenario_cls=scenario_class,
+            scale=args.scale,
+            executor=executor,
+            filter=make_filter(args),
+            termination_conditions=make_termination_conditions(args, mz_id, comparison),
+            aggregation_class=make_aggregation_class(),
+            measure_memory=args.measure_memory,
+            default_size=size,
+            seed=common_seed,
+            shared_services=shared_services,
+            memory_sampling_interval=args.memory_sampling_interval,
+        )
 
+        try:
             if not scenario_class.can_run(mz_version):
                 print(
                     f"Skipping scenario {scenario_class} not supported in version {mz_version}"
                 )
-                early_abort = True
+                yield None
             else:
-                aggregations = benchmark.run()
-                scenario_version = benchmark.create_scenario_instance().version()
-                result.set_scenario_version(scenario_version)
-                for aggregation, metric in zip(aggregations, result.metrics):
-                    assert (
-                        aggregation.measurement_type == metric.measurement_type
-                        or aggregation.measurement_type is None
-                    ), f"Aggregation contains {aggregation.measurement_type} but metric contains {metric.measurement_type} as measurement type"
-                    metric.append_point(
-                        aggregation.aggregate(),
-                        aggregation.unit(),
-                        aggregation.name(),
-                    )
-
-        c.kill("cockroach", "materialized", "clusterd", "testdrive")
-        c.rm("cockroach", "materialized", "clusterd", "testdrive")
-        c.rm_volumes("mzdata")
-
-        if early_abort:
-            result.empty()
-            break
-
-    return result
+                yield benchmark
+        finally:
+            c.kill("cockroach", "materialized", "clusterd", "testdrive")
+            c.rm("cockroach", "materialized", "clusterd", "testdrive")
+            c.rm_volumes("mzdata")
 
 
 resolved_tags: dict[tuple[str, frozenset[tuple[str, MzVersion]]], str] = {}
@@ -324,6 +453,45 @@ def resolve_tag(tag: str, scenario_class: type[Scenario], scale: str | None) ->
     return tag
 
 
+MIN_CPUS_FOR_CONCURRENT_INSTANCES = 16
+
+
+def split_cpus() -> tuple[str, str] | None:
+    """Split the CPUs available to Docker by physical core into two equal
+    cpusets, so that THIS and OTHER don't share cores or hyperthreads, or
+    return None if there are too few of them to benchmark two instances at
+    once or their topology is unknown."""
+    # The topology is read from this host, which has to be the one Docker
+    # runs on.
+    ncpu = int(spawn.capture(["docker", "info", "--format", "{{.NCPU}}"]))
+    if ncpu != os.cpu_count() or not hasattr(os, "sched_getaffinity"):
+        return None
+
+    cores: dict[tuple[int, int], list[int]] = {}
+    try:
+        for cpu in sorted(os.sched_getaffinity(0)):
+            topology = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+            core = (
+                int((topology / "physical_package_id").read_text()),
+                int((topology / "core_id").read_text()),
+            )
+            cores.setdefault(core, []).append(cpu)
+    except (OSError, ValueError):
+        return None
+
+    # Only use cores with all their hyperthreads available, so that both
+    # halves have the same number of CPUs
+    threads = max(len(cpus) for cpus in cores.values())
+    full_cores = [cpus for _, cpus in sorted(cores.items()) if len(cpus) == threads]
+    half = len(full_cores) // 2
+    if 2 * half * threads < MIN_CPUS_FOR_CONCURRENT_INSTANCES:
+        return None
+    return (
+        ",".join(str(cpu) for cpus in full_cores[:half] for cpu in cpus),
+        ",".join(str(cpu) for cpus in full_cores[half : 2 * half] for cpu in cpus),
+    )
+
+
 def create_mz_service(
     mz_image: str | None,
     default_size: int,
@@ -395,6 +563,14 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         help="Measure memory usage",
     )
 
+    parser.add_argument(
+        "--memory-sampling-interval",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help="Sample memory usage at this interval while the benchmark runs, and report its peak",
+    )
+
     parser.add_argument(
         "--this-tag",
         metavar="TAG",
@@ -466,6 +642,13 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         help="Limit the number of measurements to N.",
     )
 
+    parser.add_argument(
+        "--adaptive-termination",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Stop measuring as soon as a bootstrap confidence interval of the THIS/OTHER ratio decides whether there is a regression",
+    )
+
     parser.add_argument(
         "--runs-per-scenario",
         metavar="N",
@@ -495,6 +678,20 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         "--azurite", action="store_true", help="Use Azurite as blob store instead of S3"
     )
 
+    parser.add_argument(
+        "--concurrent-instances",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Benchmark THIS and OTHER at the same time in separate Docker Compose projects, each pinned to half of the CPUs",
+    )
+
+    parser.add_argument(
+        "--native-sql",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Run fragments consisting only of SQL queries over a long-lived connection instead of spawning testdrive for each",
+    )
+
     args = parser.parse_args()
 
     print(
@@ -535,7 +732,26 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
     else:
         dependencies += ["zookeeper", "kafka", "schema-registry"]
 
-    c.up(*dependencies)
+    this_c, other_c = c, None
+    if args.concurrent_instances:
+        cpusets = split_cpus()
+        if cpusets is None:
+            print(
+                f"Fewer than {MIN_CPUS_FOR_CONCURRENT_INSTANCES} CPUs available, benchmarking THIS and OTHER one after the other"
+            )
+        else:
+            print(f"Benchmarking THIS on CPUs {cpusets[0]}, OTHER on CPUs {cpusets[1]}")
+            # The instances get their own auxiliary services, as scenarios
+            # modify their state (e.g. Kafka topics, Postgres tables).
+            this_c, other_c = (
+                c.sibling(f"{c.project_name or c.name}-{instance}", cpuset=cpuset)
+                for instance, cpuset in zip(["this", "other"], cpusets)
+            )
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(lambda c: c.up(*dependencies), [this_c, other_c]))
+
+    if other_c is None:
+        c.up(*dependencies)
 
     scenario_classes_scheduled_to_run: list[type[Scenario]] = buildkite.shard_list(
         selected_scenarios, lambda scenario_cls: scenario_cls.__name__
@@ -563,7 +779,9 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
 
         for scenario_class in scenario_classes_scheduled_to_run:
             try:
-                scenario_result = run_one_scenario(c, scenario_class, args)
+                scenario_result = run_one_scenario(
+                    this_c, scenario_class, args, other_c
+                )
             except RuntimeError as e:
                 if (
                     "No image found for commit hash" in str(e)
@@ -583,6 +801,10 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         print(f"+++ Benchmark Report for run {run_number}:")
         print(report)
 
+    if other_c is not None:
+        this_c.down()
+        other_c.down()
+
     benchmark_result_selector = BestBenchmarkResultSelector()
     selected_report_by_scenario_name = (
         benchmark_result_selector.choose_report_per_scenario(reports)
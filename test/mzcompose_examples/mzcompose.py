@@ -7,6 +7,8 @@
 # the Business Source License, use of this software will be governed
 # by the Apache License, Version 2.0.
 
+import time
+
 from materialize.mzcompose.composition import Composition
 from materialize.mzcompose.services.kafka import Kafka
 from materialize.mzcompose.services.materialized import Materialized
@@ -44,11 +46,12 @@ SERVICES = [
 def workflow_default(c: Composition) -> None:
     """All mzcompose files should contain a default workflow
 
-    This workflow just runs all the other ones
+    This workflow just runs all the other ones, except for the
+    sql-connection-latency benchmark
     """
 
     def process(name: str) -> None:
-        if name == "default":
+        if name in ("default", "sql-connection-latency"):
             return
         with c.test_case(name):
             c.workflow(name)
@@ -82,3 +85,25 @@ def workflow_minio(c: Composition) -> None:
 
     with c.override(mz):
         c.up("materialized")
+
+
+def workflow_sql_connection_latency(c: Composition) -> None:
+    """Compare the latency of opening SQL connections with and without the
+    cached port lookup of the composition"""
+    c.up("mz_2_workers")
+
+    def measure(invalidate: bool, n: int = 100) -> float:
+        start_time = time.monotonic()
+        for _ in range(n):
+            if invalidate:
+                c.invalidate_published_ports()
+            c.sql_connection("mz_2_workers").close()
+        return (time.monotonic() - start_time) / n
+
+    uncached = measure(invalidate=True)
+    cached = measure(invalidate=False)
+    print(
+        f"Connection setup: {uncached * 1000:.1f}ms uncached, {cached * 1000:.1f}ms cached"
+    )
+
+    c.kill("mz_2_workers")
@@ -49,6 +49,7 @@ from materialize.mzcompose.test_result import (
 )
 from materialize.parallel_benchmark.framework import (
     DB_FILE,
+    HistogramStore,
     LoadPhase,
     MeasurementsStore,
     MemoryStore,
@@ -237,6 +238,35 @@ class Statistics:
                 self.p99_999999,
                 self.slope,
             ) = cursor.fetchone()
+        elif isinstance(m, HistogramStore):
+            h = m.histogram(action)
+            self.queries = h.count
+            self.qps = h.count / (m.last_timestamp(action) - start_time)
+            self.max = h.max / 1000
+            self.min = h.min / 1000
+            self.avg = h.mean() / 1000
+            self.p50 = h.percentile(50) / 1000
+            self.p95 = h.percentile(95) / 1000
+            self.p99 = h.percentile(99) / 1000
+            self.p99_9 = h.percentile(99.9) / 1000
+            self.p99_99 = h.percentile(99.99) / 1000
+            self.p99_999 = h.percentile(99.999) / 1000
+            self.p99_9999 = h.percentile(99.9999) / 1000
+            self.p99_99999 = h.percentile(99.99999) / 1000
+            self.p99_999999 = h.percentile(99.999999) / 1000
+            self.std = h.std() / 1000
+            # Least squares fit of the windows' mean durations, weighted by
+            # their number of queries
+            weights, times, durations = [], [], []
+            for window_start, window_end, window in m.timeline(action):
+                weights.append(window.count)
+                times.append((window_start + window_end) / 2 - start_time)
+                durations.append(window.mean() / 1000)
+            self.slope = (
+                float(numpy.polyfit(times, durations, 1, w=numpy.sqrt(weights))[0])
+                if len(times) > 1
+                else 0.0
+            )
         else:
             raise ValueError(
                 f"Unknown measurements store (for action {action}): {type(m)}"
@@ -324,7 +354,7 @@ def report(
                     )
 
     plot_paths: list[str] = []
-    num_plots = 1 if isinstance(measurements, MemoryStore) else 24
+    num_plots = 24 if isinstance(measurements, SQLiteStore) else 1
     for i in range(num_plots):
         plt.figure(figsize=(10, 6))
         for action in measurements.actions():
@@ -367,6 +397,24 @@ def report(
             plt.plot(uniqu_durations, 1 - counts / counts.max(), label=key)
         plt.legend(loc="best")
 
+        plot_path = f"plots/{scenario_name}_{suffix}_ccdf.png"
+        plt.savefig(MZ_ROOT / plot_path, dpi=300)
+        upload_plots([plot_path], scenario_name, "ccdf")
+        plt.close()
+    elif isinstance(measurements, HistogramStore):
+        # Plot CCDF, up to the histogram's precision
+        plt.grid(True, which="both")
+        plt.xscale("log")
+        plt.yscale("log")
+        plt.ylabel("CCDF")
+        plt.xlabel("latency [ms]")
+        plt.title(f"{scenario_name} against {mz_string}")
+        for action in measurements.actions():
+            values, counts = measurements.histogram(action).values()
+            counts = numpy.cumsum(counts)
+            plt.plot(values / 1000, 1 - counts / counts.max(), label=action)
+        plt.legend(loc="best")
+
         plot_path = f"plots/{scenario_name}_{suffix}_ccdf.png"
         plt.savefig(MZ_ROOT / plot_path, dpi=300)
         upload_plots([plot_path], scenario_name, "ccdf")
@@ -511,15 +559,27 @@ def run_once(
 
             scenario_name = scenario_class.name()
             print(f"--- Running scenario {scenario_name}")
+            measurements: MeasurementsStore
+            if sqlite_store:
+                measurements = SQLiteStore(scenario_name)
+            elif args.histogram_store:
+                measurements = HistogramStore(
+                    spill_path=(
+                        Path(f"parallel-benchmark-{scenario_name}-{suffix}.parquet")
+                        if args.spill_samples
+                        else None
+                    ),
+                    report_interval=args.live_stats_interval,
+                )
+            else:
+                measurements = MemoryStore()
             state = State(
-                measurements=(
-                    SQLiteStore(scenario_name) if sqlite_store else MemoryStore()
-                ),
+                measurements=measurements,
                 load_phase_duration=args.load_phase_duration,
                 periodic_dists={pd[0]: int(pd[1]) for pd in args.periodic_dist or []},
             )
             scenario = scenario_class(c, conn_infos)
-            scenario.setup(c, conn_infos)
+            scenario.setup(c, conn_infos, async_engine=args.async_engine)
             start_time = time.time()
             Path(MZ_ROOT / "plots").mkdir(parents=True, exist_ok=True)
             try:
@@ -800,6 +860,26 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         action="store_true",
         help="Store results in SQLite instead of in memory",
     )
+    parser.add_argument(
+        "--histogram-store",
+        action="store_true",
+        help="Aggregate results in HDR histograms instead of keeping every measurement in memory",
+    )
+    parser.add_argument(
+        "--spill-samples",
+        action="store_true",
+        help="With --histogram-store, additionally write all measurements to a Parquet file",
+    )
+    parser.add_argument(
+        "--live-stats-interval",
+        type=float,
+        help="With --histogram-store, print throughput and latency percentiles at this interval in seconds",
+    )
+    parser.add_argument(
+        "--async-engine",
+        action="store_true",
+        help="Drive the load from a single asyncio event loop instead of a thread per job",
+    )
     parser.add_argument(
         "--azurite", action="store_true", help="Use Azurite as blob store instead of S3"
     )
@@ -67,7 +67,7 @@ def load_data_from_filesystem(
 
     for i, endpoint_name in enumerate(endpoint_names):
         totals_data_path = paths.df_totals_csv(endpoint_name, workload_name)
-        details_data_path = paths.df_details_csv(endpoint_name, workload_name)
+        details_data_path = paths.df_details_parquet(endpoint_name, workload_name)
 
         if not os.path.exists(totals_data_path):
             print(
@@ -81,7 +81,7 @@ def load_data_from_filesystem(
             pd.read_csv(totals_data_path)
         )
         df_details_by_endpoint_name[endpoint_name] = DfDetails(
-            pd.read_csv(details_data_path)
+            pd.read_parquet(details_data_path)
         )
 
     return df_totals_by_endpoint_name, df_details_by_endpoint_name
@@ -204,6 +204,33 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
 
     parser.add_argument("--cluster-name", type=str, help="Cluster to SET CLUSTER to")
 
+    parser.add_argument(
+        "--open-loop-p99-slo",
+        type=float,
+        help="After the closed loop, ramp up the arrival rate of an open loop to find the max. throughput with a p99 latency at or below this many milliseconds",
+    )
+
+    parser.add_argument(
+        "--open-loop-initial-rate",
+        type=float,
+        default=10,
+        help="Operations per second to start the open loop ramp-up at (multiplied by --exponent-base in each step)",
+    )
+
+    parser.add_argument(
+        "--open-loop-step-duration",
+        type=float,
+        default=10,
+        help="Seconds to run the open loop at each arrival rate",
+    )
+
+    parser.add_argument(
+        "--client-processes",
+        type=int,
+        default=1,
+        help="Number of client processes to spread the workers across, so that the client does not saturate at high concurrencies",
+    )
+
     args = parser.parse_args()
     regression_against_target = args.regression_against
 
@@ -248,6 +275,14 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
         max_concurrency=args.max_concurrency,
         count=args.count,
         verbose=args.verbose,
+        client_processes=args.client_processes,
+        open_loop_p99_slo=(
+            args.open_loop_p99_slo / 1000
+            if args.open_loop_p99_slo is not None
+            else None
+        ),
+        open_loop_initial_rate=args.open_loop_initial_rate,
+        open_loop_step_duration=args.open_loop_step_duration,
     )
 
     executor = BenchmarkExecutor(
@@ -274,6 +309,9 @@ def workflow_default(c: Composition, parser: WorkflowArgumentParser) -> None:
 
     report_assessment(regression_assessment)
 
+    if args.open_loop_p99_slo is not None:
+        report_max_throughput_at_slo(benchmark_result, args.open_loop_p99_slo)
+
     is_failure = regression_assessment.has_unjustified_regressions()
     upload_results_to_test_analytics(
         c, other_endpoints, benchmark_result, not is_failure
@@ -401,6 +439,22 @@ def report_regression_result(
         print("No scalability changes were detected.")
 
 
+def report_max_throughput_at_slo(result: BenchmarkResult, p99_slo_ms: float) -> None:
+    print(f"+++ Max. sustainable throughput at p99 <= {p99_slo_ms} ms")
+
+    for (
+        workload_name,
+        df_open_loop_by_endpoint_name,
+    ) in result.get_df_open_loop_by_workload_and_endpoint().items():
+        print(f"{workload_name}:")
+        for endpoint_name, df_open_loop in df_open_loop_by_endpoint_name.items():
+            max_tps = df_open_loop.get_max_sustainable_tps()
+            print(
+                f"* {endpoint_name_to_description(endpoint_name)}: "
+                + (f"{max_tps:.1f} tps" if max_tps is not None else "SLO not met")
+            )
+
+
 def report_assessment(regression_assessment: RegressionAssessment):
     print("+++ Assessment of regressions")
 